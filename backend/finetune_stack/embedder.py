@@ -1,8 +1,12 @@
 
-from sentence_transformers import SentenceTransformer
+from backend.local_stack.embedder import use_model
 
-# Use a local embedding model, e.g., 'all-MiniLM-L6-v2'
-model = SentenceTransformer('all-MiniLM-L6-v2')
+# Shares the process-wide 'all-MiniLM-L6-v2' instance with the local stack
 
 def embed_text(text):
-    return model.encode(text)
+    with use_model() as model:
+        return model.encode(text)
+
+def embed_texts(texts, batch_size=32):
+    with use_model() as model:
+        return model.encode(list(texts), batch_size=batch_size, convert_to_numpy=True).astype('float32')
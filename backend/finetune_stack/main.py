@@ -3,7 +3,7 @@ from pathlib import Path
 
 from . import extractor
 from .rag_engine import answer_question
-from .embedder import embed_text
+from .embedder import embed_texts
 from .db import add_chunk, init_db
 
 DATA_DIR = Path(__file__).resolve().parents[2] / "data" / "ahayak"
@@ -32,8 +32,8 @@ async def upload_file(file: UploadFile):
 
         # Split into chunks
         chunks = [text[i:i+500] for i in range(0, len(text), 500)]
-        for c in chunks:
-            emb = embed_text(c)
+        embeddings = embed_texts(chunks)
+        for c, emb in zip(chunks, embeddings):
             add_chunk(filename, c, emb)
 
         return {"message": f"{filename} uploaded and processed successfully"}
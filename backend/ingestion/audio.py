@@ -1,22 +1,31 @@
 from pathlib import Path
-from typing import Optional
 
-import whisper
+from backend.services import model_loader
 
-_WHISPER_MODEL = None
+
+def _load_whisper(size: str):
+    import whisper  # pulls in torch; only imported once a transcription needs it
+
+    return whisper.load_model(size)
+
+
+def _loader(size: str):
+    return model_loader.register(f"whisper-{size}", lambda: _load_whisper(size), model="whisper", variant=size)
+
+
+# Registered up front so WARMUP_MODELS can name it.
+_loader("base")
 
 
 def _get_model(size: str = "base"):
-    global _WHISPER_MODEL
-    if _WHISPER_MODEL is None:
-        _WHISPER_MODEL = whisper.load_model(size)
-    return _WHISPER_MODEL
+    return _loader(size).get()
 
 
 def transcribe_audio(file_path: Path | str, model_size: str = "base") -> str:
     path = Path(file_path)
     if not path.exists():
         raise FileNotFoundError(f"Audio file not found: {path}")
-    model = _get_model(model_size)
-    result = model.transcribe(str(path))
+    # Pinned while transcribing so the model budget cannot evict it mid-call.
+    with _loader(model_size).use() as model:
+        result = model.transcribe(str(path))
     return result.get("text", "").strip()
@@ -1,15 +1,18 @@
 from io import BytesIO
 from pathlib import Path
 
-import pytesseract
 from PIL import Image
 
 
 def ocr_image(image_path: Path | str) -> str:
+    import pytesseract  # imports pandas; deferred to the first OCR call
+
     image = Image.open(Path(image_path))
     return pytesseract.image_to_string(image)
 
 
 def ocr_image_bytes(data: bytes, suffix: str = "png") -> str:
+    import pytesseract
+
     image = Image.open(BytesIO(data))
     return pytesseract.image_to_string(image)
@@ -3,8 +3,10 @@ from io import BytesIO
 import math
 from pathlib import Path
 import re
+from typing import TYPE_CHECKING
 
-import pdfplumber
+if TYPE_CHECKING:
+    import pdfplumber
 
 HEADER_FOOTER_THRESHOLD = 0.6
 HEADER_FOOTER_MAX_LENGTH = 120
@@ -22,6 +24,8 @@ NOISE_PATTERNS = [
 
 
 def extract_pdf_text(pdf_path: Path | str) -> str:
+    import pdfplumber  # pdfminer is slow to import; load it on the first PDF
+
     path = Path(pdf_path)
     with pdfplumber.open(path) as pdf:
         pages = _extract_pages(pdf)
@@ -29,12 +33,14 @@ def extract_pdf_text(pdf_path: Path | str) -> str:
 
 
 def extract_pdf_text_from_bytes(payload: bytes) -> str:
+    import pdfplumber
+
     with pdfplumber.open(BytesIO(payload)) as pdf:
         pages = _extract_pages(pdf)
     return _clean_document_text(pages)
 
 
-def _extract_pages(pdf: pdfplumber.PDF) -> list[str]:
+def _extract_pages(pdf: "pdfplumber.PDF") -> list[str]:
     return [page.extract_text() or "" for page in pdf.pages]
 
 
@@ -1,10 +1,11 @@
 import requests
-from bs4 import BeautifulSoup
 
 from backend.ingestion.text import chunk_text
 
 
 def fetch_url_text(url: str) -> str:
+    from bs4 import BeautifulSoup
+
     response = requests.get(url, timeout=30)
     response.raise_for_status()
     soup = BeautifulSoup(response.text, "html.parser")
@@ -1,16 +1,16 @@
 from pathlib import Path
 
-from moviepy import VideoFileClip
-
 from backend.ingestion.audio import transcribe_audio
-from backend.utils.file_utils import get_tmp_path
+from backend.utils.file_utils import unique_tmp_path
 
 
-def extract_audio_from_video(video_path: Path | str) -> Path:
+def extract_audio_from_video(video_path: Path | str, audio_path: Path | str | None = None) -> Path:
     video_path = Path(video_path)
     if not video_path.exists():
         raise FileNotFoundError(f"Video not found: {video_path}")
-    audio_path = get_tmp_path(f"{video_path.stem}_audio.wav")
+    from moviepy import VideoFileClip  # heavy; imported on first video upload
+
+    audio_path = Path(audio_path) if audio_path else unique_tmp_path(f"{video_path.stem}_audio.wav")
     clip = VideoFileClip(str(video_path))
     clip.audio.write_audiofile(audio_path.as_posix())
     clip.close()
@@ -1,15 +1,31 @@
 import pickle
+import threading
+import time
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import faiss
 import numpy as np
 import sqlite3
 
+from backend.local_stack import lexical
+from backend.utils.sanitize import sanitize_text
+
 DATA_DIR = Path(__file__).resolve().parents[2] / "data" / "sahayak_09_02"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 DB_PATH = DATA_DIR / "pdf_memory.db"
 EMBED_DIM = 384  # for 'all-MiniLM-L6-v2'
+# Embeddings are stored as raw little-endian float32 bytes; schema version 0
+# databases hold pickled ndarrays and are converted by ``migrate_embeddings``.
+EMBEDDING_DTYPE = np.dtype("<f4")
+EMBEDDING_BYTES = EMBED_DIM * EMBEDDING_DTYPE.itemsize
+# user_version 1: raw float32 embeddings; 2: sanitized text stored in ``clean_chunk``.
+SCHEMA_VERSION = 2
+_RAW_EMBEDDINGS_VERSION = 1
+_PICKLE_PREFIX = b"\x80"
+_MIGRATION_BATCH = 1000
+_initialized: set = set()
+_init_lock = threading.Lock()
 
 
 def init_db() -> None:
@@ -21,40 +37,262 @@ def init_db() -> None:
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             filename TEXT,
             text_chunk TEXT,
-            embedding BLOB
+            embedding BLOB,
+            modality TEXT,
+            created_at REAL,
+            clean_chunk TEXT
         )
         """
     )
+    _add_missing_columns(cur)
+    lexical.create_tables(cur)
+    lexical.backfill(cur)
+    conn.commit()
+    conn.close()
+    migrate(DB_PATH)
+    _initialized.add(str(DB_PATH))
+
+
+def ensure_db() -> None:
+    """Run :func:`init_db` once per database file.
+
+    The API server does this at startup; scripts and workers that skip the
+    startup hook get it on their first read or write instead.
+    """
+    if str(DB_PATH) in _initialized:
+        return
+    with _init_lock:
+        if str(DB_PATH) not in _initialized:
+            init_db()
+
+
+def _add_missing_columns(cur: sqlite3.Cursor) -> None:
+    # Columns added after the original schema; older files get them in place.
+    columns = {row[1] for row in cur.execute("PRAGMA table_info(pdfs)")}
+    for column, column_type in (("modality", "TEXT"), ("created_at", "REAL"), ("clean_chunk", "TEXT")):
+        if column not in columns:
+            cur.execute(f"ALTER TABLE pdfs ADD COLUMN {column} {column_type}")
+
+
+def migrate(db_path: Path | str | None = None) -> Dict[str, int]:
+    """Bring a database up to ``SCHEMA_VERSION``; returns rows touched per step."""
+    return {
+        "embeddings": migrate_embeddings(db_path),
+        "clean_chunks": backfill_clean_chunks(db_path),
+    }
+
+
+def encode_embedding(embedding: np.ndarray) -> bytes:
+    vector = np.asarray(embedding, dtype=EMBEDDING_DTYPE).reshape(-1)
+    if vector.size != EMBED_DIM:
+        raise ValueError(f"Expected a {EMBED_DIM}-dim embedding, got {vector.size}")
+    return vector.tobytes()
+
+
+def decode_embeddings(blobs: Sequence[bytes]) -> np.ndarray:
+    """Decode stored blobs into an ``(n, EMBED_DIM)`` float32 matrix with a single ``np.frombuffer``."""
+    if not blobs:
+        return np.zeros((0, EMBED_DIM), dtype="float32")
+    raw = b"".join(blobs)
+    if len(raw) == len(blobs) * EMBEDDING_BYTES:
+        return np.frombuffer(raw, dtype=EMBEDDING_DTYPE).reshape(len(blobs), EMBED_DIM)
+    # Not yet migrated: fall back to row-by-row decoding of legacy pickles.
+    return np.array([_decode_legacy(blob) for blob in blobs], dtype="float32")
+
+
+def _decode_legacy(blob: bytes) -> np.ndarray:
+    if blob[:1] == _PICKLE_PREFIX:
+        return np.asarray(pickle.loads(blob), dtype="float32")
+    return np.frombuffer(blob, dtype=EMBEDDING_DTYPE)
+
+
+def migrate_embeddings(db_path: Path | str | None = None) -> int:
+    """Convert pickled embedding BLOBs to raw float32 bytes in place.
+
+    Returns the number of rows rewritten. Already-migrated databases are
+    detected through ``PRAGMA user_version`` and skipped without a scan.
+    """
+    conn = sqlite3.connect(db_path or DB_PATH)
+    cur = conn.cursor()
+    (version,) = cur.execute("PRAGMA user_version").fetchone()
+    if version >= _RAW_EMBEDDINGS_VERSION:
+        conn.close()
+        return 0
+    converted = 0
+    last_id = 0
+    while True:
+        rows = cur.execute(
+            "SELECT id, embedding FROM pdfs WHERE id > ? ORDER BY id LIMIT ?",
+            (last_id, _MIGRATION_BATCH),
+        ).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        updates = [
+            (encode_embedding(pickle.loads(blob)), row_id)
+            for row_id, blob in rows
+            if blob is not None and blob[:1] == _PICKLE_PREFIX
+        ]
+        if updates:
+            cur.executemany("UPDATE pdfs SET embedding = ? WHERE id = ?", updates)
+            converted += len(updates)
+    cur.execute(f"PRAGMA user_version = {_RAW_EMBEDDINGS_VERSION}")
+    conn.commit()
+    conn.close()
+    return converted
+
+
+def backfill_clean_chunks(db_path: Path | str | None = None) -> int:
+    """Fill ``clean_chunk`` for rows written before sanitized text was stored.
+
+    Returns the number of rows updated; databases already at ``SCHEMA_VERSION``
+    are skipped without a scan.
+    """
+    conn = sqlite3.connect(db_path or DB_PATH)
+    cur = conn.cursor()
+    (version,) = cur.execute("PRAGMA user_version").fetchone()
+    if version >= SCHEMA_VERSION:
+        conn.close()
+        return 0
+    _add_missing_columns(cur)
+    updated = 0
+    last_id = 0
+    while True:
+        rows = cur.execute(
+            "SELECT id, text_chunk FROM pdfs WHERE id > ? AND clean_chunk IS NULL ORDER BY id LIMIT ?",
+            (last_id, _MIGRATION_BATCH),
+        ).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        cur.executemany(
+            "UPDATE pdfs SET clean_chunk = ? WHERE id = ?",
+            [(sanitize_text(text or ""), row_id) for row_id, text in rows],
+        )
+        updated += len(rows)
+    if version == _RAW_EMBEDDINGS_VERSION:
+        cur.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.commit()
+    conn.close()
+    return updated
+
+
+def add_chunk(filename: str, chunk_text: str, embedding: np.ndarray, modality: Optional[str] = None) -> int:
+    return add_chunks(filename, [chunk_text], [embedding], modality=modality)[0]
+
+
+def add_chunks(
+    filename: str,
+    chunk_texts: Sequence[str],
+    embeddings: np.ndarray,
+    modality: Optional[str] = None,
+    created_at: Optional[float] = None,
+) -> List[int]:
+    """Insert many chunks in one transaction and return their row ids in order.
+
+    The sanitized text served by search and the chunks' BM25 postings are
+    written in the same transaction.
+    """
+    ensure_db()
+    conn = sqlite3.connect(DB_PATH)
+    cur = conn.cursor()
+    created_at = time.time() if created_at is None else created_at
+    row_ids: List[int] = []
+    for chunk_text, embedding in zip(chunk_texts, embeddings):
+        cur.execute(
+            "INSERT INTO pdfs (filename, text_chunk, embedding, modality, created_at, clean_chunk)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (filename, chunk_text, encode_embedding(embedding), modality, created_at, sanitize_text(chunk_text)),
+        )
+        row_ids.append(int(cur.lastrowid))
+    lexical.index_rows(cur, row_ids, chunk_texts)
     conn.commit()
     conn.close()
+    return row_ids
 
 
-def add_chunk(filename: str, chunk_text: str, embedding: np.ndarray) -> None:
+def max_row_id() -> int:
+    ensure_db()
+    conn = sqlite3.connect(DB_PATH)
+    cur = conn.cursor()
+    cur.execute("SELECT MAX(id) FROM pdfs")
+    (latest,) = cur.fetchone()
+    conn.close()
+    return int(latest or 0)
+
+
+def get_embeddings_after(row_id: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Return ``(row_ids, embeddings)`` for every row with ``id > row_id``."""
+    row_ids, embeddings, _ = get_rows_after(row_id)
+    return row_ids, embeddings
+
+
+def get_rows_after(row_id: int) -> Tuple[np.ndarray, np.ndarray, Dict[str, Sequence]]:
+    """Return ``(row_ids, embeddings, metadata)`` for every row with ``id > row_id``.
+
+    ``metadata`` holds per-row ``source`` and ``modality`` lists plus a float
+    ``created_at`` array (NaN for rows written before the column existed).
+    """
+    ensure_db()
     conn = sqlite3.connect(DB_PATH)
     cur = conn.cursor()
-    emb_blob = pickle.dumps(embedding)
     cur.execute(
-        "INSERT INTO pdfs (filename, text_chunk, embedding) VALUES (?, ?, ?)",
-        (filename, chunk_text, emb_blob),
+        "SELECT id, embedding, filename, modality, created_at FROM pdfs WHERE id > ? ORDER BY id",
+        (row_id,),
     )
-    conn.commit()
+    rows = cur.fetchall()
+    conn.close()
+    row_ids = np.fromiter((row[0] for row in rows), dtype="int64", count=len(rows))
+    metadata = {
+        "source": [row[2] for row in rows],
+        "modality": [row[3] for row in rows],
+        "created_at": np.array([row[4] if row[4] is not None else np.nan for row in rows], dtype="float64"),
+    }
+    return row_ids, decode_embeddings([row[1] for row in rows]), metadata
+
+
+def get_chunks_by_ids(row_ids: Sequence[int], clean: bool = False) -> Dict[int, Tuple[str, str]]:
+    """Point-lookup ``{row_id: (filename, text)}`` for the given ids.
+
+    ``clean=True`` returns the sanitized text stored at ingest instead of the
+    raw chunk (sanitizing on the fly for rows not yet backfilled).
+    """
+    ids = [int(row_id) for row_id in row_ids]
+    if not ids:
+        return {}
+    ensure_db()
+    conn = sqlite3.connect(DB_PATH)
+    cur = conn.cursor()
+    placeholders = ",".join("?" for _ in ids)
+    column = "clean_chunk" if clean else "text_chunk"
+    cur.execute(f"SELECT id, filename, {column}, text_chunk FROM pdfs WHERE id IN ({placeholders})", ids)
+    rows = cur.fetchall()
     conn.close()
+    return {
+        int(row_id): (filename, text if text is not None else sanitize_text(raw or ""))
+        for row_id, filename, text, raw in rows
+    }
+
+
+def lexical_search(query: str, top_k: int, filters: Optional[Dict] = None) -> List[Tuple[int, float]]:
+    """BM25 ``[(row_id, score)]`` for ``query``, best first."""
+    ensure_db()
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        return lexical.search(conn.cursor(), query, top_k, filters=filters)
+    finally:
+        conn.close()
 
 
 def get_all_chunks() -> Tuple[List[str], np.ndarray]:
+    ensure_db()
     conn = sqlite3.connect(DB_PATH)
     cur = conn.cursor()
     cur.execute("SELECT text_chunk, embedding FROM pdfs")
     rows = cur.fetchall()
-    texts: List[str] = []
-    embeddings: List[np.ndarray] = []
-    for text_chunk, emb in rows:
-        texts.append(text_chunk)
-        embeddings.append(pickle.loads(emb))
     conn.close()
-    if embeddings:
-        return texts, np.array(embeddings, dtype="float32")
-    return texts, np.zeros((0, EMBED_DIM), dtype="float32")
+    texts: List[str] = [text_chunk for text_chunk, _ in rows]
+    return texts, decode_embeddings([emb for _, emb in rows])
 
 
 def build_faiss_index() -> Tuple[faiss.IndexFlatL2, List[str]]:
@@ -63,4 +301,3 @@ def build_faiss_index() -> Tuple[faiss.IndexFlatL2, List[str]]:
     if len(embeddings):
         index.add(embeddings)
     return index, texts
-
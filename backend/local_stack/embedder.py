@@ -1,19 +1,79 @@
-from sentence_transformers import SentenceTransformer
 import numpy as np
 
-# Lazy loading - model loaded ONLY on first use
-_model = None
+from backend.services import model_loader
+
+from .batcher import EmbeddingBatcher
+from .embedding_cache import embedding_cache
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+
+def _load_model():
+    # Imported here: sentence-transformers pulls in torch and transformers (seconds at startup)
+    from sentence_transformers import SentenceTransformer
+
+    print("🔄 Loading embedding model (first time only)...")
+    model = SentenceTransformer(MODEL_NAME)
+    print("✓ Model loaded successfully")
+    return model
+
+# Lazy loading - model loaded on first use or by the startup warmup
+_loader = model_loader.register("embedder", _load_model, model=MODEL_NAME, variant="sentence-transformers")
 
 def get_model():
-    """Get or initialize the embedding model (lazy loading)"""
-    global _model
-    if _model is None:
-        print("🔄 Loading embedding model (first time only)...")
-        _model = SentenceTransformer('all-MiniLM-L6-v2')
-        print("✓ Model loaded successfully")
-    return _model
+    """Get or initialize the embedding model (raises ModelUnavailable while a failed load backs off)"""
+    return _loader.get()
+
+def use_model():
+    """Context manager holding the embedding model pinned against eviction while encoding"""
+    return _loader.use()
 
 def embed_text(text):
-    """Generate embeddings for text using sentence-transformers"""
-    model = get_model()
-    return model.encode(text)
+    """Generate embeddings for text using sentence-transformers (served from the cache when possible)"""
+    (cached,) = embedding_cache.get_many(MODEL_NAME, [text])
+    if cached is not None:
+        return cached
+    with use_model() as model:
+        embedding = model.encode(text)
+    embedding_cache.put_many(MODEL_NAME, [text], [embedding])
+    return embedding
+
+def embed_texts(texts, batch_size=32):
+    """Embed many texts in length-sorted batches; returns an (n, dim) float32 matrix in input order"""
+    texts = list(texts)
+    cached = embedding_cache.get_many(MODEL_NAME, texts)
+    missing = list(dict.fromkeys(text for text, vector in zip(texts, cached) if vector is None))
+    computed = dict(zip(missing, _encode_batched(missing, batch_size)))
+    if computed:
+        embedding_cache.put_many(MODEL_NAME, list(computed), list(computed.values()))
+    if not texts:
+        with use_model() as model:
+            return np.zeros((0, model.get_sentence_embedding_dimension()), dtype="float32")
+    return np.stack([
+        vector if vector is not None else computed[text]
+        for text, vector in zip(texts, cached)
+    ]).astype("float32", copy=False)
+
+def embed_query(text):
+    """Embed a single query, sharing one forward pass with concurrent callers"""
+    (cached,) = embedding_cache.get_many(MODEL_NAME, [text])
+    if cached is not None:
+        return cached
+    return query_batcher.embed(text)
+
+def _encode_batched(texts, batch_size):
+    if not texts:
+        return []
+    # Longest first so each batch pads to similar lengths
+    order = np.argsort([-len(text) for text in texts], kind="stable")
+    with use_model() as model:
+        encoded = model.encode(
+            [texts[i] for i in order],
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+    embeddings = np.empty((len(texts), encoded.shape[1]), dtype="float32")
+    embeddings[order] = encoded
+    return embeddings
+
+query_batcher = EmbeddingBatcher(embed_texts)
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("sahayak.embedding_cache")
+
+DEFAULT_DISK_PATH = Path(__file__).resolve().parents[2] / "data" / "sahayak_09_02" / "embedding_cache.db"
+MEMORY_ENTRIES = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+DISK_ENTRIES = int(os.getenv("EMBEDDING_CACHE_DISK_SIZE", "500000"))
+DISK_PATH = os.getenv("EMBEDDING_CACHE_PATH", str(DEFAULT_DISK_PATH))
+
+_TRIM_EVERY = 1000
+
+CacheKey = Tuple[str, bytes]
+
+
+class EmbeddingCache:
+    """Two-tier cache of embeddings keyed by ``(model name, sha256(text))``.
+
+    A bounded in-memory LRU sits in front of an optional SQLite table that
+    survives restarts. Set ``disk_path`` to ``None`` (or ``EMBEDDING_CACHE_PATH``
+    to an empty string) to keep the cache in memory only.
+
+    The disk tier is trimmed least recently used first. Its recency counts
+    writes and the lookups that reach it, i.e. memory misses. Lookups return
+    fresh arrays, so callers may modify them in place.
+    """
+
+    def __init__(
+        self,
+        memory_entries: int = MEMORY_ENTRIES,
+        disk_path: Path | str | None = DISK_PATH or None,
+        disk_entries: int = DISK_ENTRIES,
+    ) -> None:
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self._memory: "OrderedDict[CacheKey, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._writes_since_trim = 0
+        self._tick = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if disk_path:
+            self._open_disk(Path(disk_path))
+
+    @staticmethod
+    def key(model_name: str, text: str) -> CacheKey:
+        return model_name, hashlib.sha256(text.encode("utf-8")).digest()
+
+    def get_many(self, model_name: str, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        keys = [self.key(model_name, text) for text in texts]
+        found: List[Optional[np.ndarray]] = [None] * len(keys)
+        pending: Dict[CacheKey, List[int]] = {}
+        with self._lock:
+            for position, key in enumerate(keys):
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    found[position] = vector.copy()
+                else:
+                    pending.setdefault(key, []).append(position)
+            if pending and self._conn is not None:
+                for key, vector in self._read_disk(model_name, list(pending)).items():
+                    self._remember(key, vector)
+                    positions = pending.pop(key)
+                    self.disk_hits += len(positions)
+                    for position in positions:
+                        found[position] = vector.copy()
+            self.misses += sum(len(positions) for positions in pending.values())
+        return found
+
+    def put_many(self, model_name: str, texts: Sequence[str], embeddings: Sequence[np.ndarray]) -> None:
+        rows = []
+        with self._lock:
+            for text, embedding in zip(texts, embeddings):
+                key = self.key(model_name, text)
+                vector = np.array(embedding, dtype="float32")
+                self._remember(key, vector)
+                rows.append((model_name, key[1], vector.tobytes()))
+            if self._conn is not None and rows:
+                self._write_disk(rows)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_entries": len(self._memory),
+            "memory_capacity": self.memory_entries,
+            "disk_enabled": self._conn is not None,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM embeddings")
+                self._conn.commit()
+
+    def _remember(self, key: CacheKey, vector: np.ndarray) -> None:
+        vector.setflags(write=False)
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _open_disk(self, path: Path) -> None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(path, check_same_thread=False)
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    text_hash BLOB NOT NULL,
+                    embedding BLOB NOT NULL,
+                    last_used INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (model, text_hash)
+                )
+                """
+            )
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(embeddings)")}
+            if "last_used" not in existing:
+                conn.execute("ALTER TABLE embeddings ADD COLUMN last_used INTEGER NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+            conn.commit()
+            self._tick = conn.execute("SELECT COALESCE(MAX(last_used), 0) FROM embeddings").fetchone()[0]
+            self._conn = conn
+        except sqlite3.Error as exc:
+            logger.warning("Embedding cache disk tier disabled (%s): %s", path, exc)
+            self._conn = None
+
+    def _read_disk(self, model_name: str, keys: List[CacheKey]) -> Dict[CacheKey, np.ndarray]:
+        found: Dict[CacheKey, np.ndarray] = {}
+        # Stay well below SQLite's bound-parameter limit.
+        for start in range(0, len(keys), 500):
+            batch = [digest for _, digest in keys[start : start + 500]]
+            placeholders = ",".join("?" for _ in batch)
+            rows = self._conn.execute(
+                f"SELECT text_hash, embedding FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                [model_name, *batch],
+            ).fetchall()
+            for digest, blob in rows:
+                found[(model_name, bytes(digest))] = np.frombuffer(blob, dtype="float32").copy()
+        if found:
+            self._touch_disk(model_name, [digest for _, digest in found])
+        return found
+
+    def _touch_disk(self, model_name: str, digests: List[bytes]) -> None:
+        self._tick += 1
+        try:
+            for start in range(0, len(digests), 500):
+                batch = digests[start : start + 500]
+                placeholders = ",".join("?" for _ in batch)
+                self._conn.execute(
+                    f"UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash IN ({placeholders})",
+                    [self._tick, model_name, *batch],
+                )
+            self._conn.commit()
+        except sqlite3.Error as exc:
+            logger.warning("Embedding cache recency update failed: %s", exc)
+
+    def _write_disk(self, rows: List[Tuple[str, bytes, bytes]]) -> None:
+        self._tick += 1
+        try:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, embedding, last_used) VALUES (?, ?, ?, ?)",
+                [(*row, self._tick) for row in rows],
+            )
+            self._writes_since_trim += len(rows)
+            if self._writes_since_trim >= _TRIM_EVERY:
+                self._trim_disk()
+                self._writes_since_trim = 0
+            self._conn.commit()
+        except sqlite3.Error as exc:
+            logger.warning("Embedding cache write failed: %s", exc)
+
+    def _trim_disk(self) -> None:
+        # Keep the disk_entries most recently used rows.
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE rowid IN "
+            "(SELECT rowid FROM embeddings ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.disk_entries,),
+        )
+
+
+embedding_cache = EmbeddingCache()
@@ -1,23 +1,30 @@
-import fitz
-import pytesseract
 from PIL import Image
 import io
 import requests
 import youtube_transcript_api
-from bs4 import BeautifulSoup
 
 def extract_pdf(file_bytes):
-    doc = fitz.open(stream=file_bytes, filetype="pdf")
+    """Text of a PDF given as bytes or as a path."""
+    import fitz  # PyMuPDF is slow to import; load it on the first PDF
+
+    if isinstance(file_bytes, (bytes, bytearray)):
+        doc = fitz.open(stream=file_bytes, filetype="pdf")
+    else:
+        doc = fitz.open(str(file_bytes))
     text = ""
     for page in doc:
         text += page.get_text()
     return text
 
 def extract_image(file_bytes):
-    image = Image.open(io.BytesIO(file_bytes))
+    import pytesseract  # imports pandas; deferred to the first OCR call
+
+    image = Image.open(io.BytesIO(file_bytes) if isinstance(file_bytes, (bytes, bytearray)) else file_bytes)
     return pytesseract.image_to_string(image)
     
 def extract_url(url):
+    from bs4 import BeautifulSoup
+
     html = requests.get(url).text
     soup = BeautifulSoup(html, "html.parser")
     return soup.get_text()
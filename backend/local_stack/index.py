@@ -0,0 +1,369 @@
+from __future__ import annotations
+
+import logging
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, List, Sequence, Tuple
+
+import faiss
+import numpy as np
+
+from backend.local_stack import db as local_db
+
+logger = logging.getLogger("sahayak.local_index")
+
+POLL_INTERVAL_SECONDS = float(os.getenv("LOCAL_INDEX_POLL_SECONDS", "0.5"))
+INDEX_TYPE = os.getenv("LOCAL_INDEX_TYPE", "flat").lower()
+TRAIN_THRESHOLD = int(os.getenv("LOCAL_INDEX_TRAIN_THRESHOLD", "20000"))
+IVF_NLIST = int(os.getenv("LOCAL_INDEX_NLIST", "0"))  # 0 = derive from corpus size
+IVF_NPROBE = int(os.getenv("LOCAL_INDEX_NPROBE", "16"))
+PQ_M = int(os.getenv("LOCAL_INDEX_PQ_M", "48"))
+HNSW_M = int(os.getenv("LOCAL_INDEX_HNSW_M", "32"))
+HNSW_EF_SEARCH = int(os.getenv("LOCAL_INDEX_EF_SEARCH", "64"))
+# Retrain IVF indexes once the corpus is this many times the size they were trained on (0 = never).
+RETRAIN_GROWTH = float(os.getenv("LOCAL_INDEX_RETRAIN_GROWTH", "4"))
+
+INDEX_TYPES = ("flat", "hnsw", "ivf_flat", "ivf_pq")
+# FAISS warns below ~39 training points per IVF list and gains nothing above 256.
+_MIN_POINTS_PER_LIST = 39
+_MAX_POINTS_PER_LIST = 256
+
+
+def default_nlist(n_vectors: int) -> int:
+    if IVF_NLIST > 0:
+        return IVF_NLIST
+    return max(1, min(int(4 * math.sqrt(n_vectors)), n_vectors // _MIN_POINTS_PER_LIST))
+
+
+def build_index(index_type: str, vectors: np.ndarray, dim: int = local_db.EMBED_DIM, nlist: int | None = None) -> faiss.Index:
+    """Build (and train, where needed) a FAISS index of ``index_type`` over ``vectors``."""
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type {index_type!r}; expected one of {', '.join(INDEX_TYPES)}")
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    if index_type == "flat":
+        index: faiss.Index = faiss.IndexFlatL2(dim)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, HNSW_M)
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+    else:
+        nlist = nlist or default_nlist(len(vectors))
+        quantizer = faiss.IndexFlatL2(dim)
+        if index_type == "ivf_flat":
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist)
+        else:
+            index = faiss.IndexIVFPQ(quantizer, dim, nlist, PQ_M, 8)
+        index.nprobe = min(IVF_NPROBE, nlist)
+        training = vectors
+        max_training = nlist * _MAX_POINTS_PER_LIST
+        if len(training) > max_training:
+            picks = np.random.default_rng(0).choice(len(training), max_training, replace=False)
+            training = vectors[np.sort(picks)]
+        index.train(training)
+    if len(vectors):
+        index.add(vectors)
+    return index
+
+
+def search_parameters(
+    index: faiss.Index,
+    nprobe: int | None = None,
+    ef_search: int | None = None,
+    selector: faiss.IDSelector | None = None,
+):
+    """Per-request search parameters for ``index``; ``None`` keeps the index defaults."""
+    if isinstance(index, faiss.IndexHNSW) and (ef_search or selector is not None):
+        params = faiss.SearchParametersHNSW(efSearch=int(ef_search or index.hnsw.efSearch))
+    elif isinstance(index, faiss.IndexIVF) and (nprobe or selector is not None):
+        params = faiss.SearchParametersIVF(nprobe=int(nprobe or index.nprobe))
+    elif selector is not None:
+        params = faiss.SearchParameters()
+    else:
+        return None
+    if selector is not None:
+        params.sel = selector
+    return params
+
+
+class LocalIndex:
+    """Process-resident FAISS index over the local ``pdfs`` table.
+
+    Vectors are loaded once, appended as chunks are added, and rows written by
+    other processes are picked up by polling the table's max rowid, so a query
+    never rescans SQLite.
+
+    The index starts as exact ``IndexFlatL2``; when ``index_type`` names an
+    approximate structure (HNSW, IVF-Flat, IVF-PQ) it is built and trained
+    automatically once the corpus reaches ``train_threshold`` vectors. IVF
+    indexes are retrained with a larger ``nlist`` each time the corpus grows
+    ``retrain_growth`` times past the size they were trained on. Builds run on
+    a background thread from the raw vectors in SQLite. Searches keep using
+    the current index until the new one is swapped in, together with the
+    vectors appended while it was built.
+
+    Source, modality and ingest time are mirrored per vector in NumPy columns
+    so metadata filters run as a FAISS ``IDSelector`` pre-filter.
+    """
+
+    def __init__(
+        self,
+        dim: int = local_db.EMBED_DIM,
+        poll_interval: float = POLL_INTERVAL_SECONDS,
+        index_type: str = INDEX_TYPE,
+        train_threshold: int = TRAIN_THRESHOLD,
+        retrain_growth: float = RETRAIN_GROWTH,
+    ) -> None:
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown index type {index_type!r}; expected one of {', '.join(INDEX_TYPES)}")
+        self.dim = dim
+        self.poll_interval = poll_interval
+        self.index_type = index_type
+        self.train_threshold = train_threshold
+        self.retrain_growth = retrain_growth
+        self._lock = threading.RLock()
+        self._index: faiss.Index = faiss.IndexFlatL2(dim)
+        self._active_type = "flat"
+        self._row_ids = np.zeros(0, dtype="int64")
+        self._columns = _MetadataColumns()
+        self._last_row_id = 0
+        self._last_poll = 0.0
+        self._generation = 0
+        self._resets = 0
+        self._rebuild_at = train_threshold
+        self._rebuild_thread: threading.Thread | None = None
+        # Vectors appended while a rebuild runs, added to the new index before the swap.
+        self._pending: List[np.ndarray] | None = None
+        self._trained_size = 0
+        self._nlist: int | None = None
+
+    @property
+    def ntotal(self) -> int:
+        return int(self._index.ntotal)
+
+    @property
+    def generation(self) -> int:
+        """Counter bumped every time vectors are appended or the index is reset."""
+        return self._generation
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "configured_type": self.index_type,
+            "active_type": self._active_type,
+            "ntotal": self.ntotal,
+            "train_threshold": self.train_threshold,
+            "trained_size": self._trained_size,
+            "nlist": self._nlist,
+            "rebuilding": self._rebuild_thread is not None,
+            "last_row_id": self._last_row_id,
+        }
+
+    def wait_for_rebuild(self, timeout: float | None = None) -> None:
+        """Block until a background build, if one is running, has been swapped in."""
+        thread = self._rebuild_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._index = faiss.IndexFlatL2(self.dim)
+            self._active_type = "flat"
+            self._row_ids = np.zeros(0, dtype="int64")
+            self._columns = _MetadataColumns()
+            self._last_row_id = 0
+            self._last_poll = 0.0
+            self._generation += 1
+            # A build still running for the old contents is discarded when it finishes.
+            self._resets += 1
+            self._rebuild_at = self.train_threshold
+            self._rebuild_thread = None
+            self._pending = None
+            self._trained_size = 0
+            self._nlist = None
+
+    def refresh(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_poll < self.poll_interval:
+            return
+        self._last_poll = now
+        latest = local_db.max_row_id()
+        if latest == self._last_row_id:
+            return
+        with self._lock:
+            if latest < self._last_row_id:
+                logger.info("Local store shrank (max rowid %s < %s); reloading index", latest, self._last_row_id)
+                self.reset()
+                self._last_poll = now
+            row_ids, embeddings, metadata = local_db.get_rows_after(self._last_row_id)
+            self._append(row_ids, embeddings, metadata)
+
+    def add_chunk(self, filename: str, text: str, embedding: np.ndarray, modality: str | None = None) -> int:
+        return self.add_chunks(filename, [text], [embedding], modality=modality)[0]
+
+    def add_chunks(
+        self,
+        filename: str,
+        texts: Sequence[str],
+        embeddings: np.ndarray,
+        modality: str | None = None,
+    ) -> List[int]:
+        created_at = time.time()
+        row_ids = local_db.add_chunks(filename, texts, embeddings, modality=modality, created_at=created_at)
+        if not row_ids:
+            return row_ids
+        with self._lock:
+            contiguous = row_ids[0] == self._last_row_id + 1 and row_ids[-1] - row_ids[0] == len(row_ids) - 1
+            if contiguous:
+                vectors = np.asarray(embeddings, dtype="float32").reshape(len(row_ids), self.dim)
+                metadata = {
+                    "source": [filename] * len(row_ids),
+                    "modality": [modality] * len(row_ids),
+                    "created_at": np.full(len(row_ids), created_at, dtype="float64"),
+                }
+                self._append(np.array(row_ids, dtype="int64"), vectors, metadata)
+            else:
+                # Another writer got in between; pull everything we have not seen.
+                self.refresh(force=True)
+        return row_ids
+
+    def search(
+        self,
+        query_vectors: np.ndarray,
+        top_k: int,
+        nprobe: int | None = None,
+        ef_search: int | None = None,
+        filters: Dict[str, Any] | None = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(distances, row_ids)`` arrays of shape ``(n_queries, k)``; missing slots are ``-1``.
+
+        ``nprobe`` (IVF) and ``ef_search`` (HNSW) override the index defaults
+        for this call only and are ignored by the exact index. ``filters`` may
+        hold ``source``/``modality`` (a value or list of values) and
+        ``created_after``/``created_before`` epoch seconds.
+        """
+        self.refresh()
+        queries = np.ascontiguousarray(np.atleast_2d(np.asarray(query_vectors, dtype="float32")))
+        with self._lock:
+            candidates = self.ntotal
+            selector = None
+            mask = self._columns.mask(filters, self.ntotal)
+            if mask is not None:
+                candidates = int(mask.sum())
+                if candidates < self.ntotal:
+                    bitmap = np.packbits(mask, bitorder="little")
+                    selector = faiss.IDSelectorBitmap(len(bitmap), faiss.swig_ptr(bitmap))
+            k = min(top_k, candidates)
+            if k <= 0:
+                empty = np.zeros((len(queries), 0))
+                return empty.astype("float32"), empty.astype("int64")
+            params = search_parameters(self._index, nprobe=nprobe, ef_search=ef_search, selector=selector)
+            distances, positions = self._index.search(queries, k, params=params)
+            row_ids = np.where(positions >= 0, self._row_ids[positions], -1)
+        return distances, row_ids
+
+    def _append(self, row_ids: np.ndarray, embeddings: np.ndarray, metadata: Dict[str, Sequence]) -> None:
+        if not len(row_ids):
+            return
+        vectors = np.ascontiguousarray(embeddings, dtype="float32")
+        self._index.add(vectors)
+        if self._pending is not None:
+            self._pending.append(vectors)
+        self._row_ids = np.concatenate([self._row_ids, row_ids.astype("int64")])
+        self._columns.extend(metadata)
+        self._last_row_id = int(row_ids[-1])
+        self._generation += 1
+        self._maybe_rebuild()
+
+    def _maybe_rebuild(self) -> None:
+        """Start a background build once the corpus reaches the next rebuild size; call with the lock held."""
+        if self.index_type == "flat" or self._rebuild_thread is not None or self.ntotal < self._rebuild_at:
+            return
+        self._pending = []
+        self._rebuild_thread = threading.Thread(
+            target=self._rebuild,
+            args=(self._row_ids.copy(), self._resets),
+            name="local-index-rebuild",
+            daemon=True,
+        )
+        self._rebuild_thread.start()
+
+    def _rebuild(self, row_ids: np.ndarray, resets: int) -> None:
+        started = time.perf_counter()
+        index = None
+        try:
+            # Train on the stored vectors: reconstructing them from an IVF-PQ index would be lossy.
+            stored_ids, embeddings, _ = local_db.get_rows_after(0)
+            positions = np.searchsorted(stored_ids, row_ids)
+            if positions.size and (positions[-1] >= len(stored_ids) or (stored_ids[positions] != row_ids).any()):
+                raise RuntimeError("indexed rows are missing from the store")
+            nlist = default_nlist(len(row_ids)) if self.index_type.startswith("ivf") else None
+            index = build_index(self.index_type, embeddings[positions], self.dim, nlist=nlist)
+        except Exception:
+            logger.exception("Rebuilding the local %s index over %d vectors failed", self.index_type, len(row_ids))
+        with self._lock:
+            if resets != self._resets:
+                return
+            self._rebuild_thread = None
+            pending, self._pending = self._pending or [], None
+            if index is None:
+                # Try again once the corpus has doubled rather than on every append.
+                self._rebuild_at = 2 * len(row_ids)
+                return
+            for vectors in pending:
+                index.add(vectors)
+            self._index = index
+            self._active_type = self.index_type
+            self._trained_size = len(row_ids)
+            self._nlist = nlist
+            if nlist is None or IVF_NLIST > 0 or self.retrain_growth <= 1:
+                self._rebuild_at = math.inf
+            else:
+                self._rebuild_at = math.ceil(self.retrain_growth * len(row_ids))
+            self._generation += 1
+            logger.info(
+                "Built local %s index (nlist=%s) over %d vectors in %.2fs",
+                self.index_type,
+                nlist,
+                len(row_ids),
+                time.perf_counter() - started,
+            )
+            self._maybe_rebuild()
+
+
+class _MetadataColumns:
+    """Per-vector filter columns: dictionary-encoded strings plus ingest time."""
+
+    _CATEGORICAL = ("source", "modality")
+
+    def __init__(self) -> None:
+        self._vocab: Dict[str, Dict[str, int]] = {name: {} for name in self._CATEGORICAL}
+        self._codes: Dict[str, np.ndarray] = {name: np.zeros(0, dtype="int32") for name in self._CATEGORICAL}
+        self._created_at = np.zeros(0, dtype="float64")
+
+    def extend(self, metadata: Dict[str, Sequence]) -> None:
+        for name in self._CATEGORICAL:
+            vocab = self._vocab[name]
+            codes = [vocab.setdefault(value, len(vocab)) if value is not None else -1 for value in metadata[name]]
+            self._codes[name] = np.concatenate([self._codes[name], np.asarray(codes, dtype="int32")])
+        self._created_at = np.concatenate([self._created_at, np.asarray(metadata["created_at"], dtype="float64")])
+
+    def mask(self, filters: Dict[str, Any] | None, size: int) -> np.ndarray | None:
+        if not filters:
+            return None
+        mask = np.ones(size, dtype=bool)
+        for name in self._CATEGORICAL:
+            wanted = filters.get(name)
+            if wanted is None:
+                continue
+            values = [wanted] if isinstance(wanted, str) else list(wanted)
+            codes = [self._vocab[name][value] for value in values if value in self._vocab[name]]
+            mask &= np.isin(self._codes[name], codes)
+        # NaN timestamps (legacy rows) never satisfy a date bound.
+        if filters.get("created_after") is not None:
+            mask &= self._created_at >= float(filters["created_after"])
+        if filters.get("created_before") is not None:
+            mask &= self._created_at <= float(filters["created_before"])
+        return mask
+
+
+local_index = LocalIndex()
@@ -0,0 +1,98 @@
+"""Compare local FAISS index types by recall@k against exact search and latency.
+
+Usage::
+
+    python -m backend.local_stack.index_bench --types flat hnsw ivf_flat ivf_pq --k 10
+    python -m backend.local_stack.index_bench --synthetic 200000 --nprobe 8 16 32 --ef-search 32 64 128
+
+Vectors come from the local store unless ``--synthetic N`` is given. Queries
+are perturbed copies of stored vectors, so every query has true neighbours.
+"""
+
+import argparse
+import time
+from typing import Dict, List
+
+import faiss
+import numpy as np
+
+from . import db as local_db
+from .index import INDEX_TYPES, build_index, search_parameters
+
+
+def load_vectors(synthetic: int, dim: int) -> np.ndarray:
+    if synthetic:
+        rng = np.random.default_rng(0)
+        vectors = rng.standard_normal((synthetic, dim), dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    local_db.init_db()
+    _, vectors = local_db.get_embeddings_after(0)
+    return np.ascontiguousarray(vectors, dtype="float32")
+
+
+def make_queries(vectors: np.ndarray, count: int, noise: float = 0.05) -> np.ndarray:
+    rng = np.random.default_rng(1)
+    picks = rng.choice(len(vectors), size=min(count, len(vectors)), replace=False)
+    queries = vectors[picks] + noise * rng.standard_normal((len(picks), vectors.shape[1]), dtype=np.float32)
+    return np.ascontiguousarray(queries, dtype="float32")
+
+
+def measure(index: faiss.Index, queries: np.ndarray, truth: np.ndarray, k: int, params) -> Dict[str, float]:
+    latencies: List[float] = []
+    found = np.empty((len(queries), k), dtype="int64")
+    for row, query in enumerate(queries):
+        started = time.perf_counter()
+        _, labels = index.search(query.reshape(1, -1), k, params=params)
+        latencies.append((time.perf_counter() - started) * 1000.0)
+        found[row] = labels[0]
+    recall = np.mean([len(set(found[i]) & set(truth[i])) / k for i in range(len(queries))])
+    return {
+        "recall": float(recall),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--types", nargs="+", choices=INDEX_TYPES, default=list(INDEX_TYPES))
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--synthetic", type=int, default=0, help="benchmark N random vectors instead of the local store")
+    parser.add_argument("--nlist", type=int, default=None)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[16, 64, 256])
+    args = parser.parse_args()
+
+    vectors = load_vectors(args.synthetic, local_db.EMBED_DIM)
+    if len(vectors) <= args.k:
+        parser.error(f"need more than k={args.k} vectors, found {len(vectors)}")
+    queries = make_queries(vectors, args.queries)
+    exact = build_index("flat", vectors)
+    _, truth = exact.search(queries, args.k)
+    print(f"{len(vectors)} vectors, {len(queries)} queries, k={args.k}\n")
+    print(f"{'index':<10} {'setting':<14} {'recall@k':>9} {'p50 ms':>9} {'p99 ms':>9} {'build s':>9}")
+
+    for index_type in args.types:
+        started = time.perf_counter()
+        index = build_index(index_type, vectors, nlist=args.nlist)
+        build_seconds = time.perf_counter() - started
+        if index_type == "hnsw":
+            settings = [(f"efSearch={ef}", search_parameters(index, ef_search=ef)) for ef in args.ef_search]
+        elif index_type.startswith("ivf"):
+            nlist = faiss.extract_index_ivf(index).nlist
+            settings = [
+                (f"nprobe={probe}", search_parameters(index, nprobe=probe)) for probe in args.nprobe if probe <= nlist
+            ]
+        else:
+            settings = [("exact", None)]
+        for label, params in settings:
+            result = measure(index, queries, truth, args.k, params)
+            print(
+                f"{index_type:<10} {label:<14} {result['recall']:>9.3f} "
+                f"{result['p50_ms']:>9.3f} {result['p99_ms']:>9.3f} {build_seconds:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
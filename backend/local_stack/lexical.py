@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import math
+import os
+import re
+import sqlite3
+from collections import Counter
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+BM25_K1 = float(os.getenv("BM25_K1", "1.2"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+_BACKFILL_BATCH = 1000
+
+_TOKEN_RE = re.compile(r"[a-z0-9_]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or that the this to was were will with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens; ``snake_case`` identifiers also yield their parts."""
+    tokens: List[str] = []
+    for token in _TOKEN_RE.findall((text or "").lower()):
+        token = token.strip("_")
+        terms = [token, *(part for part in token.split("_") if part)] if "_" in token else [token]
+        for term in terms:
+            if term and term not in _STOPWORDS and (len(term) > 1 or term.isdigit()):
+                tokens.append(term)
+    return tokens
+
+
+def create_tables(cur: sqlite3.Cursor) -> None:
+    # Postings are clustered on (term, doc_id), so a term lookup is a B-tree
+    # range scan over that term's documents only.
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS lexical_postings (
+            term TEXT NOT NULL,
+            doc_id INTEGER NOT NULL,
+            tf INTEGER NOT NULL,
+            PRIMARY KEY (term, doc_id)
+        ) WITHOUT ROWID
+        """
+    )
+    cur.execute("CREATE TABLE IF NOT EXISTS lexical_docs (doc_id INTEGER PRIMARY KEY, length INTEGER NOT NULL)")
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS lexical_stats (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            documents INTEGER NOT NULL,
+            total_length INTEGER NOT NULL
+        )
+        """
+    )
+    cur.execute("INSERT OR IGNORE INTO lexical_stats (id, documents, total_length) VALUES (1, 0, 0)")
+
+
+def index_rows(cur: sqlite3.Cursor, row_ids: Sequence[int], texts: Sequence[str]) -> None:
+    """Add postings for freshly inserted ``pdfs`` rows inside the caller's transaction.
+
+    ``pdfs`` rows are never rewritten, so rows that are already indexed (a
+    rerun backfill, a retried batch) are skipped; adding them again would
+    inflate the document count and average length that BM25 relies on.
+    """
+    indexed = _indexed_doc_ids(cur, row_ids)
+    doc_rows = []
+    postings = []
+    total_length = 0
+    for row_id, text in zip(row_ids, texts):
+        if int(row_id) in indexed:
+            continue
+        indexed.add(int(row_id))
+        counts = Counter(tokenize(text))
+        length = sum(counts.values())
+        total_length += length
+        doc_rows.append((int(row_id), length))
+        postings.extend((term, int(row_id), tf) for term, tf in counts.items())
+    if not doc_rows:
+        return
+    cur.executemany("INSERT OR REPLACE INTO lexical_docs (doc_id, length) VALUES (?, ?)", doc_rows)
+    cur.executemany("INSERT OR REPLACE INTO lexical_postings (term, doc_id, tf) VALUES (?, ?, ?)", postings)
+    cur.execute(
+        "UPDATE lexical_stats SET documents = documents + ?, total_length = total_length + ? WHERE id = 1",
+        (len(doc_rows), total_length),
+    )
+
+
+def _indexed_doc_ids(cur: sqlite3.Cursor, row_ids: Sequence[int]) -> set:
+    found = set()
+    ids = [int(row_id) for row_id in row_ids]
+    # Stay well below SQLite's bound-parameter limit.
+    for start in range(0, len(ids), 500):
+        batch = ids[start : start + 500]
+        placeholders = ",".join("?" for _ in batch)
+        found.update(
+            row[0] for row in cur.execute(f"SELECT doc_id FROM lexical_docs WHERE doc_id IN ({placeholders})", batch)
+        )
+    return found
+
+
+def backfill(cur: sqlite3.Cursor) -> int:
+    """Index ``pdfs`` rows written before the lexical tables existed; returns the row count."""
+    (last_id,) = cur.execute("SELECT COALESCE(MAX(doc_id), 0) FROM lexical_docs").fetchone()
+    indexed = 0
+    while True:
+        rows = cur.execute(
+            "SELECT id, text_chunk FROM pdfs WHERE id > ? ORDER BY id LIMIT ?",
+            (last_id, _BACKFILL_BATCH),
+        ).fetchall()
+        if not rows:
+            return indexed
+        index_rows(cur, [row[0] for row in rows], [row[1] or "" for row in rows])
+        last_id = rows[-1][0]
+        indexed += len(rows)
+
+
+def search(
+    cur: sqlite3.Cursor,
+    query: str,
+    top_k: int,
+    filters: Dict[str, Any] | None = None,
+    k1: float = BM25_K1,
+    b: float = BM25_B,
+) -> List[Tuple[int, float]]:
+    """Okapi BM25 over the postings of the query terms; returns ``[(row_id, score)]`` best first.
+
+    Only the postings of terms that occur in ``query`` are read, so the cost
+    follows their document frequency rather than the corpus size. ``filters``
+    takes the same keys as :meth:`LocalIndex.search`.
+    """
+    terms = sorted(set(tokenize(query)))
+    if not terms or top_k <= 0:
+        return []
+    documents, total_length = cur.execute(
+        "SELECT documents, total_length FROM lexical_stats WHERE id = 1"
+    ).fetchone()
+    if not documents:
+        return []
+    placeholders = ",".join("?" for _ in terms)
+    frequencies = dict(
+        cur.execute(
+            f"SELECT term, COUNT(*) FROM lexical_postings WHERE term IN ({placeholders}) GROUP BY term",
+            terms,
+        ).fetchall()
+    )
+    if not frequencies:
+        return []
+    idf = {
+        term: math.log(1 + (documents - df + 0.5) / (df + 0.5))
+        for term, df in frequencies.items()
+    }
+    sql = (
+        "SELECT p.term, p.doc_id, p.tf, d.length FROM lexical_postings p "
+        "JOIN lexical_docs d ON d.doc_id = p.doc_id"
+    )
+    conditions, params = _filter_conditions(filters)
+    if conditions:
+        sql += " JOIN pdfs ON pdfs.id = p.doc_id"
+    sql += f" WHERE p.term IN ({placeholders})" + "".join(f" AND {condition}" for condition in conditions)
+    rows = cur.execute(sql, [*terms, *params]).fetchall()
+    if not rows:
+        return []
+    weights = np.fromiter((idf[row[0]] for row in rows), dtype="float64", count=len(rows))
+    doc_ids = np.fromiter((row[1] for row in rows), dtype="int64", count=len(rows))
+    tf = np.fromiter((row[2] for row in rows), dtype="float64", count=len(rows))
+    lengths = np.fromiter((row[3] for row in rows), dtype="float64", count=len(rows))
+    average_length = total_length / documents
+    contributions = weights * tf * (k1 + 1) / (tf + k1 * (1 - b + b * lengths / average_length))
+    unique_ids, positions = np.unique(doc_ids, return_inverse=True)
+    scores = np.bincount(positions, weights=contributions)
+    k = min(top_k, len(scores))
+    best = np.argpartition(-scores, k - 1)[:k]
+    best = best[np.argsort(-scores[best], kind="stable")]
+    return [(int(unique_ids[i]), float(scores[i])) for i in best]
+
+
+def _filter_conditions(filters: Dict[str, Any] | None) -> Tuple[List[str], List[Any]]:
+    conditions: List[str] = []
+    params: List[Any] = []
+    if not filters:
+        return conditions, params
+    for key, column in (("source", "pdfs.filename"), ("modality", "pdfs.modality")):
+        wanted = filters.get(key)
+        if wanted is None:
+            continue
+        values = [wanted] if isinstance(wanted, str) else list(wanted)
+        if not values:
+            conditions.append("0")
+            continue
+        conditions.append(f"{column} IN ({','.join('?' for _ in values)})")
+        params.extend(values)
+    if filters.get("created_after") is not None:
+        conditions.append("pdfs.created_at >= ?")
+        params.append(float(filters["created_after"]))
+    if filters.get("created_before") is not None:
+        conditions.append("pdfs.created_at <= ?")
+        params.append(float(filters["created_before"]))
+    return conditions, params
@@ -5,8 +5,9 @@ import os
 
 from . import extractor
 from .rag_engine import answer_question
-from .embedder import embed_text
-from .db import add_chunk, init_db
+from .embedder import embed_texts
+from .db import init_db
+from .index import local_index
 
 BASE_DIR = Path(__file__).resolve().parents[2]
 PDF_FOLDER = BASE_DIR / "data" / "sahayak_09_02" / "pdf_storage"
@@ -53,9 +54,11 @@ async def upload_file(file: UploadFile = File(...)):
         # Extract text based on file type
         if filename.lower().endswith(".pdf"):
             text = extractor.extract_pdf(content)
+            modality = "pdf"
             print(f"  ✓ Extracted {len(text)} characters from PDF")
         elif filename.lower().endswith((".png", ".jpg", ".jpeg")):
             text = extractor.extract_image(content)
+            modality = "image"
             print(f"  ✓ OCR extracted {len(text)} characters from image")
         else:
             return {"error": "Unsupported file type. Please upload PDF or image (PNG/JPG)"}
@@ -72,9 +75,8 @@ async def upload_file(file: UploadFile = File(...)):
         print(f"  ✓ Split into {len(chunks)} chunks")
         
         # Generate embeddings and store in the local vector DB
-        for idx, chunk in enumerate(chunks):
-            emb = embed_text(chunk)
-            add_chunk(filename, chunk, emb)
+        embeddings = embed_texts(chunks)
+        local_index.add_chunks(filename, chunks, embeddings, modality=modality)
         
         print(f"  ✓ Stored {len(chunks)} chunks in the local vector DB\n")
         
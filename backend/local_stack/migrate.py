@@ -0,0 +1,43 @@
+"""Migrate a local ``pdf_memory.db`` to the current schema.
+
+Converts pickled embeddings to raw float32 bytes and backfills the sanitized
+``clean_chunk`` column. ``--qdrant`` also adds sanitized payload copies to
+points in the configured Qdrant collection.
+
+Usage::
+
+    python -m backend.local_stack.migrate [--qdrant] [path/to/pdf_memory.db ...]
+"""
+
+import argparse
+from pathlib import Path
+
+from .db import DB_PATH, migrate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("databases", nargs="*", type=Path, default=[DB_PATH])
+    parser.add_argument("--qdrant", action="store_true", help="backfill sanitized payloads in Qdrant too")
+    args = parser.parse_args()
+    for db_path in args.databases:
+        if not db_path.exists():
+            print(f"✗ {db_path}: not found")
+            continue
+        counts = migrate(db_path)
+        print(
+            f"✓ {db_path}: converted {counts['embeddings']} embeddings, "
+            f"sanitized {counts['clean_chunks']} chunks"
+        )
+    if args.qdrant:
+        from backend.vector_store import qdrant_store
+
+        qdrant_store.connect()
+        if not qdrant_store.is_available:
+            print(f"✗ Qdrant at {qdrant_store.url}: not reachable")
+            return
+        print(f"✓ Qdrant {qdrant_store.collection_name}: sanitized {qdrant_store.backfill_clean_payloads()} points")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,18 @@
 from .embedder import embed_text
-from .db import build_faiss_index
-import numpy as np
+from .db import get_chunks_by_ids
+from .index import local_index
 
 def answer_question(question, top_k=5):
     try:
         query_vec = embed_text(question)
-        index, texts = build_faiss_index()
+        _, row_ids = local_index.search(query_vec, top_k)
 
-        if index.ntotal == 0:
+        if local_index.ntotal == 0:
             return "No documents uploaded yet. Please upload PDF/image files first."
 
-        distances, indices = index.search(np.array([query_vec], dtype="float32"), top_k)
-        retrieved_chunks = [texts[i] for i in indices[0] if i < len(texts)]
+        ranked_ids = [int(row_id) for row_id in row_ids[0] if row_id >= 0]
+        chunks = get_chunks_by_ids(ranked_ids)
+        retrieved_chunks = [chunks[row_id][1] for row_id in ranked_ids if row_id in chunks]
         retrieved_chunks = [chunk for chunk in retrieved_chunks if chunk and chunk.strip()]
 
         if not retrieved_chunks:
@@ -1,17 +1,28 @@
+from contextlib import asynccontextmanager
 from pathlib import Path
 from dotenv import load_dotenv
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
+from backend import startup
 from backend.routers import admin, finetune, ingestion, local_mode, search, summarize
+from backend.services import model_loader
+from backend.utils.file_utils import MAX_UPLOAD_BYTES
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 load_dotenv(BASE_DIR / ".env")
 
 APP_TITLE = "Sahayak AI Platform"
 
-app = FastAPI(title=APP_TITLE)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Qdrant and the models come up in the background; /ready reports when the models are done.
+    startup.run()
+    yield
+    startup.shutdown()
+
+app = FastAPI(title=APP_TITLE, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -21,6 +32,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Room for the multipart boundaries and form fields around the file itself.
+_MAX_REQUEST_BYTES = MAX_UPLOAD_BYTES + 2**20
+
+@app.middleware("http")
+async def limit_request_size(request: Request, call_next):
+    """Refuse oversized uploads from their Content-Length, before the body is received."""
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > _MAX_REQUEST_BYTES:
+        return JSONResponse(
+            status_code=413,
+            content={"detail": f"Request is larger than the {MAX_UPLOAD_BYTES / 2**20:.0f} MB upload limit"},
+        )
+    return await call_next(request)
+
 @app.get("/")
 def root():
     return {
@@ -39,6 +64,12 @@ def root():
 def health():
     return {"status": "healthy"}
 
+@app.get("/ready")
+def ready():
+    """Liveness is /health; this returns 503 until the warmup models have loaded."""
+    readiness = model_loader.readiness()
+    return JSONResponse(status_code=200 if readiness["ready"] else 503, content=readiness)
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     return JSONResponse(status_code=500, content={"detail": str(exc)})
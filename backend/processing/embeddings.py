@@ -1,14 +1,8 @@
-from sentence_transformers import SentenceTransformer
-
-model = SentenceTransformer('all-MiniLM-L6-v2')
-
-from sentence_transformers import SentenceTransformer
-
-model = SentenceTransformer('all-MiniLM-L6-v2')
+from backend.local_stack.embedder import get_model, use_model
 
 def get_embedding(text: str):
-    return model.encode(text)
-    return model.encode(text)
+    with use_model() as model:
+        return model.encode(text)
 # backend/processing/embeddings.py
 
 from sentence_transformers import SentenceTransformer
@@ -17,32 +11,65 @@ import torch
 import torchaudio
 from transformers import Wav2Vec2ForCTC, Wav2Vec2Processor
 
+from backend.services import model_loader
+
+AUDIO_MODEL = "facebook/wav2vec2-base-960h"
+
 class EmbeddingProcessor:
     def __init__(self):
-        # Text embedding model
-        self.text_model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
+        # Models come from the shared registry and load on first use
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self._image_loader = model_loader.register(
+            "clip-ViT-B-32", lambda: SentenceTransformer('clip-ViT-B-32'), variant="sentence-transformers"
+        )
+        self._audio_loader = model_loader.register(
+            AUDIO_MODEL,
+            lambda: (
+                Wav2Vec2Processor.from_pretrained(AUDIO_MODEL),
+                Wav2Vec2ForCTC.from_pretrained(AUDIO_MODEL).to(self.device),
+            ),
+            variant="ctc",
+            device=self.device,
+        )
+
+    @property
+    def text_model(self):
+        # Text embedding model (shared with the local stack)
+        return get_model()
+
+    @property
+    def image_model(self):
         # Image embedding model (CLIP)
-        self.image_model = SentenceTransformer('clip-ViT-B-32')
+        return self._image_loader.get()
+
+    @property
+    def audio_processor(self):
+        return self._audio_loader.get()[0]
+
+    @property
+    def audio_model(self):
         # Audio transcription model
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.audio_processor = Wav2Vec2Processor.from_pretrained("facebook/wav2vec2-base-960h")
-        self.audio_model = Wav2Vec2ForCTC.from_pretrained("facebook/wav2vec2-base-960h").to(self.device)
+        return self._audio_loader.get()[1]
 
     def embed_text(self, text: str):
-        return self.text_model.encode(text).tolist()
+        with use_model() as model:
+            return model.encode(text).tolist()
 
     def embed_image(self, image_path: str):
         image = Image.open(image_path).convert('RGB')
-        return self.image_model.encode([image])[0].tolist()
+        with self._image_loader.use() as model:
+            return model.encode([image])[0].tolist()
 
     def transcribe_audio(self, audio_path: str):
         waveform, sample_rate = torchaudio.load(audio_path)
         waveform = waveform.squeeze(0)
-        inputs = self.audio_processor(waveform, sampling_rate=sample_rate, return_tensors="pt", padding=True).input_values.to(self.device)
-        with torch.no_grad():
-            logits = self.audio_model(inputs).logits
-        predicted_ids = torch.argmax(logits, dim=-1)
-        transcription = self.audio_processor.batch_decode(predicted_ids)[0]
+        # Pinned for the whole call so the memory budget cannot evict it mid-inference
+        with self._audio_loader.use() as (processor, model):
+            inputs = processor(waveform, sampling_rate=sample_rate, return_tensors="pt", padding=True).input_values.to(self.device)
+            with torch.no_grad():
+                logits = model(inputs).logits
+            predicted_ids = torch.argmax(logits, dim=-1)
+            transcription = processor.batch_decode(predicted_ids)[0]
         return transcription
 
     def embed_audio(self, audio_path: str):
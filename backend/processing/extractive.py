@@ -0,0 +1,97 @@
+"""Extractive summarization over sentence embeddings.
+
+Sentences are embedded once, scored against the document (centroid) or
+against each other (TextRank), and the best ones are returned in their
+original order. Everything after the embedding call is a handful of NumPy
+matrix operations, so a summary costs about as much as embedding its
+sentences, and those embeddings are usually already cached.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from typing import Callable, List, Sequence
+
+import numpy as np
+
+METHODS = ("centroid", "textrank")
+METHOD = os.getenv("EXTRACTIVE_METHOD", "textrank")
+SENTENCES = int(os.getenv("EXTRACTIVE_SENTENCES", "3"))
+MAX_SENTENCES = int(os.getenv("EXTRACTIVE_MAX_SENTENCES", "128"))
+
+# Sentences this similar to one already picked add nothing new.
+_REDUNDANCY = 0.9
+_DAMPING = 0.85
+_ITERATIONS = 50
+_TOLERANCE = 1e-6
+_SENTENCE_RE = re.compile(r"[^.!?\n]+(?:[.!?]+|$)")
+_MIN_WORDS = 3
+
+
+def split_sentences(text: str) -> List[str]:
+    """Sentences of ``text`` with at least a few words; fragments and headings are dropped."""
+    sentences = (match.group(0).strip() for match in _SENTENCE_RE.finditer(text or ""))
+    return [sentence for sentence in sentences if len(sentence.split()) >= _MIN_WORDS]
+
+
+def rank(embeddings: np.ndarray, method: str = METHOD) -> np.ndarray:
+    """Importance score per row of ``embeddings`` (higher is more central)."""
+    if method not in METHODS:
+        raise ValueError(f"Unknown extractive method {method!r}; expected one of {', '.join(METHODS)}")
+    vectors = np.asarray(embeddings, dtype="float32")
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors / np.where(norms == 0, 1, norms)
+    if method == "centroid":
+        return vectors @ vectors.mean(axis=0)
+    # TextRank: PageRank over the cosine-similarity graph, by power iteration.
+    similarity = np.clip(vectors @ vectors.T, 0, None)
+    np.fill_diagonal(similarity, 0)
+    count = len(vectors)
+    out_weight = similarity.sum(axis=1, keepdims=True)
+    # A sentence unlike all others would leak rank; spread its weight evenly instead.
+    transition = np.divide(
+        similarity, out_weight, out=np.full_like(similarity, 1 / count), where=out_weight > 0
+    )
+    scores = np.full(count, 1 / count, dtype="float32")
+    for _ in range(_ITERATIONS):
+        updated = (1 - _DAMPING) / count + _DAMPING * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < _TOLERANCE:
+            return updated
+        scores = updated
+    return scores
+
+
+def select(embeddings: np.ndarray, scores: np.ndarray, count: int) -> List[int]:
+    """Indices of the ``count`` best-scored rows, skipping near-duplicates, in document order."""
+    vectors = np.asarray(embeddings, dtype="float32")
+    vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    chosen: List[int] = []
+    for index in np.argsort(-scores, kind="stable"):
+        if len(chosen) == count:
+            break
+        if chosen and float(np.max(vectors[chosen] @ vectors[index])) >= _REDUNDANCY:
+            continue
+        chosen.append(int(index))
+    return sorted(chosen)
+
+
+def summarize(
+    text: str,
+    embed: Callable[[Sequence[str]], np.ndarray],
+    sentences: int = SENTENCES,
+    method: str = METHOD,
+    max_sentences: int = MAX_SENTENCES,
+) -> str:
+    """Pick the ``sentences`` most representative sentences of ``text``.
+
+    ``embed`` maps a list of strings to an ``(n, dim)`` matrix. Only the
+    first ``max_sentences`` sentences are considered, which bounds both the
+    embedding cost and the quadratic TextRank graph.
+    """
+    candidates = split_sentences(text)[:max_sentences]
+    if len(candidates) <= sentences:
+        return " ".join(candidates) if candidates else (text or "").strip()
+    embeddings = embed(candidates)
+    chosen = select(embeddings, rank(embeddings, method), sentences)
+    return " ".join(candidates[index] for index in chosen)
@@ -0,0 +1,94 @@
+"""Hierarchical (map-reduce) summarization over a Hugging Face summarization pipeline.
+
+Long inputs are split on token boundaries into windows the model can read,
+each window is summarized in batched pipeline calls (map), and the joined
+partial summaries are summarized again until they fit a single window
+(reduce). A latency budget caps how many reduce rounds run.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Any, Callable, List, Sequence
+
+CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "0"))  # 0 = model limit
+BATCH_SIZE = int(os.getenv("SUMMARY_BATCH_SIZE", "8"))
+BUDGET_SECONDS = float(os.getenv("SUMMARY_BUDGET_SECONDS", "30"))
+
+# BART-style models cap inputs at 1024 positions; keep room for special tokens.
+_MAX_WINDOW = 1024
+_SPECIAL_TOKENS = 2
+
+
+def window_tokens(tokenizer: Any, chunk_tokens: int = CHUNK_TOKENS) -> int:
+    limit = min(int(getattr(tokenizer, "model_max_length", _MAX_WINDOW) or _MAX_WINDOW), _MAX_WINDOW)
+    window = limit - _SPECIAL_TOKENS
+    return min(chunk_tokens, window) if chunk_tokens > 0 else window
+
+
+def split_on_tokens(tokenizer: Any, text: str, max_tokens: int) -> List[str]:
+    """Split ``text`` into pieces of at most ``max_tokens`` model tokens."""
+    token_ids = tokenizer(text, add_special_tokens=False)["input_ids"]
+    pieces = []
+    for start in range(0, len(token_ids), max_tokens):
+        piece = tokenizer.decode(token_ids[start : start + max_tokens], skip_special_tokens=True).strip()
+        if piece:
+            pieces.append(piece)
+    return pieces
+
+
+def summarize_batch(
+    summarizer: Any,
+    texts: Sequence[str],
+    max_length: int,
+    min_length: int,
+    batch_size: int = BATCH_SIZE,
+) -> List[str]:
+    """One pipeline call over ``texts``; the pipeline groups them into ``batch_size`` forward passes."""
+    if not texts:
+        return []
+    results = summarizer(
+        list(texts),
+        max_length=max_length,
+        min_length=min(min_length, max_length),
+        do_sample=False,
+        truncation=True,
+        batch_size=batch_size,
+    )
+    return [result["summary_text"].strip() for result in results]
+
+
+def summarize(
+    summarizer: Any,
+    text: str,
+    max_length: int = 160,
+    min_length: int = 60,
+    chunk_tokens: int = CHUNK_TOKENS,
+    batch_size: int = BATCH_SIZE,
+    budget_seconds: float | None = BUDGET_SECONDS,
+    clock: Callable[[], float] = time.perf_counter,
+) -> str:
+    """Summarize all of ``text``, however long.
+
+    Input that fits one window costs a single call. Otherwise every window is
+    summarized (the map step always covers the whole input) and reduce rounds
+    follow while ``budget_seconds`` lasts; once it is spent the partial
+    summaries are returned joined instead of being reduced further.
+    """
+    deadline = clock() + budget_seconds if budget_seconds else None
+    window = window_tokens(summarizer.tokenizer, chunk_tokens)
+    pieces = split_on_tokens(summarizer.tokenizer, text, window)
+    while len(pieces) > 1:
+        partials = summarize_batch(summarizer, pieces, max_length, min_length, batch_size=batch_size)
+        joined = "\n".join(partials)
+        if deadline is not None and clock() >= deadline:
+            return joined
+        reduced = split_on_tokens(summarizer.tokenizer, joined, window)
+        if len(reduced) >= len(pieces):
+            # Summaries are not getting shorter than their inputs; stop rather than loop.
+            return joined
+        pieces = reduced
+    if not pieces:
+        return ""
+    return summarize_batch(summarizer, pieces, max_length, min_length, batch_size=1)[0]
@@ -1,23 +1,29 @@
 from transformers import pipeline
 
-summarizer = pipeline('summarization')
+from backend.services import model_loader
 
-from transformers import pipeline
+BART_MODEL = "facebook/bart-large-cnn"
 
-summarizer = pipeline('summarization')
+# Loaded on first use through the shared registry
+_default_summarizer = model_loader.register(
+    "summarization", lambda: pipeline('summarization'), variant="pipeline-default"
+)
+_bart_summarizer = model_loader.register(
+    "summarizer", lambda: pipeline("summarization", model=BART_MODEL), model=BART_MODEL, variant="summarization"
+)
 
 def summarize_text(text: str) -> str:
-    summary = summarizer(text, max_length=150, min_length=30, do_sample=False)
-    return summary[0]['summary_text']
-    summary = summarizer(text, max_length=150, min_length=30, do_sample=False)
+    with _default_summarizer.use() as summarizer:
+        summary = summarizer(text, max_length=150, min_length=30, do_sample=False)
     return summary[0]['summary_text']# backend/processing/summarization.py
 
-from transformers import pipeline
+from backend.processing import map_reduce
 
 class Summarizer:
-    def __init__(self):
-        # Load HuggingFace summarization pipeline
-        self.summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
+    @property
+    def summarizer(self):
+        # HuggingFace summarization pipeline, shared with the API's summarizer
+        return _bart_summarizer.get()
 
     def summarize_text(self, text, max_length=150, min_length=50):
         """
@@ -28,12 +34,35 @@ class Summarizer:
         if len(text.strip()) == 0:
             return ""
 
-        summary = self.summarizer(text, max_length=max_length, min_length=min_length, do_sample=False)
+        with _bart_summarizer.use() as summarizer:
+            summary = summarizer(text, max_length=max_length, min_length=min_length, do_sample=False)
         return summary[0]['summary_text']
 
-    def summarize_chunks(self, chunks, max_length=150, min_length=50):
-        """Summarize a list of text chunks"""
-        summaries = []
-        for chunk in chunks:
-            summaries.append(self.summarize_text(chunk, max_length=max_length, min_length=min_length))
+    def summarize_chunks(self, chunks, max_length=150, min_length=50, batch_size=map_reduce.BATCH_SIZE):
+        """Summarize a list of text chunks in batched pipeline calls"""
+        summaries = [""] * len(chunks)
+        positions = [i for i, chunk in enumerate(chunks) if chunk.strip()]
+        with _bart_summarizer.use() as summarizer:
+            batch = map_reduce.summarize_batch(
+                summarizer,
+                [chunks[i] for i in positions],
+                max_length=max_length,
+                min_length=min_length,
+                batch_size=batch_size,
+            )
+        for position, summary in zip(positions, batch):
+            summaries[position] = summary
         return summaries
+
+    def summarize_long(self, text, max_length=150, min_length=50, budget_seconds=map_reduce.BUDGET_SECONDS):
+        """Summarize text of any length with map-reduce over token windows"""
+        if len(text.strip()) == 0:
+            return ""
+        with _bart_summarizer.use() as summarizer:
+            return map_reduce.summarize(
+                summarizer,
+                text,
+                max_length=max_length,
+                min_length=min_length,
+                budget_seconds=budget_seconds,
+            )
@@ -1,19 +1,17 @@
 from transformers import pipeline
 
-classifier = pipeline('zero-shot-classification')
+from backend.services import model_loader
 
-from transformers import pipeline
-
-classifier = pipeline('zero-shot-classification')
+# Loaded on first use through the shared registry
+_classifier = model_loader.register(
+    "zero-shot-classification", lambda: pipeline('zero-shot-classification'), variant="pipeline-default"
+)
 
 def tag_text(text: str, candidate_labels=None):
     if candidate_labels is None:
         candidate_labels = ['news', 'sports', 'finance', 'technology', 'health']
-    result = classifier(text, candidate_labels)
-    return result['labels']
-    if candidate_labels is None:
-        candidate_labels = ['news', 'sports', 'finance', 'technology', 'health']
-    result = classifier(text, candidate_labels)
+    with _classifier.use() as classifier:
+        result = classifier(text, candidate_labels)
     return result['labels']# backend/processing/tagging.py
 
 from sklearn.feature_extraction.text import TfidfVectorizer
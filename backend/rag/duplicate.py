@@ -34,12 +34,11 @@ class DuplicateDetector:
             return []
         query_vec = local_embedder.embed_text(new_text)
         candidates = vector_service.search_vectors(new_text, top_k=top_k, target=self.target)
+        candidates = [candidate for candidate in candidates if candidate.get("content")]
+        candidate_vecs = local_embedder.embed_texts([candidate["content"] for candidate in candidates])
         duplicates: List[Dict[str, str]] = []
-        for candidate in candidates:
-            content = candidate.get("content", "")
-            if not content:
-                continue
-            candidate_vec = local_embedder.embed_text(content)
+        for candidate, candidate_vec in zip(candidates, candidate_vecs):
+            content = candidate["content"]
             similarity = self._cosine(query_vec, candidate_vec)
             if similarity >= self.threshold:
                 duplicates.append({
@@ -1,29 +1,39 @@
-from sentence_transformers import SentenceTransformer
-
-model = SentenceTransformer('all-MiniLM-L6-v2')
-
-from sentence_transformers import SentenceTransformer
-
-model = SentenceTransformer('all-MiniLM-L6-v2')
+from backend.local_stack.embedder import use_model
 
 def embed_query(text: str):
-    return model.encode(text)
-    return model.encode(text)
+    with use_model() as model:
+        return model.encode(text)
 import uuid
 from transformers import AutoTokenizer, AutoModel
 import torch
 
+from backend.services import model_loader
+
+def _load_encoder(model_name):
+    model = AutoModel.from_pretrained(model_name)
+    model.eval()
+    return AutoTokenizer.from_pretrained(model_name), model
+
 class Embedder:
     def __init__(self, model_name="BAAI/bge-m3"):
-        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-        self.model = AutoModel.from_pretrained(model_name)
-        self.model.eval()
+        self._loader = model_loader.register(
+            model_name, lambda: _load_encoder(model_name), variant="automodel"
+        )
+
+    @property
+    def tokenizer(self):
+        return self._loader.get()[0]
+
+    @property
+    def model(self):
+        return self._loader.get()[1]
 
     def embed_text(self, text: str) -> list[float]:
-        inputs = self.tokenizer(text, return_tensors="pt", truncation=True, max_length=512)
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-            embedding = outputs.last_hidden_state.mean(dim=1).squeeze().cpu().numpy()
+        with self._loader.use() as (tokenizer, model):
+            inputs = tokenizer(text, return_tensors="pt", truncation=True, max_length=512)
+            with torch.no_grad():
+                outputs = model(**inputs)
+                embedding = outputs.last_hidden_state.mean(dim=1).squeeze().cpu().numpy()
         return embedding.tolist()
 
     def generate_id(self) -> str:
@@ -6,14 +6,16 @@ def rewrite_query(query: str) -> str:
     return query
 # backend/rag/query_rewrite.py
 
-from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 
+from backend.local_stack.embedder import get_model, use_model
+
 class QueryRewriter:
-    def __init__(self):
-        # Small embedding model to compute query similarity
-        self.model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
+    @property
+    def model(self):
+        # Small embedding model to compute query similarity (the shared MiniLM instance)
+        return get_model()
 
     def expand_query(self, query, related_phrases=None, top_k=3):
         """
@@ -26,8 +28,9 @@ class QueryRewriter:
             return query  # no expansion
 
         # Compute embeddings
-        query_vec = self.model.encode([query])[0]
-        phrases_vec = self.model.encode(related_phrases)
+        with use_model() as model:
+            query_vec = model.encode([query])[0]
+            phrases_vec = model.encode(related_phrases)
 
         # Compute similarity and pick top_k
         sims = cosine_similarity([query_vec], phrases_vec)[0]
@@ -1,5 +1,12 @@
 from fastapi import APIRouter
 
+from backend.local_stack.embedder import query_batcher
+from backend.local_stack.embedding_cache import embedding_cache
+from backend.local_stack.index import local_index
+from backend.services import executors, ingest_jobs, model_loader
+from backend.services.result_cache import query_cache, semantic_cache
+from backend.services.vector_service import single_flight
+from backend.utils.file_utils import temp_files
 from backend.vector_store import qdrant_store
 
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -13,3 +20,20 @@ def health():
 @router.get("/uploads")
 def uploaded_files():
     return {"files": qdrant_store.recent_payloads()}
+
+
+@router.get("/metrics")
+def cache_metrics():
+    return {
+        "embedding_cache": embedding_cache.stats(),
+        "query_batcher": query_batcher.stats(),
+        "local_index": local_index.status(),
+        "query_cache": query_cache.stats(),
+        "semantic_cache": semantic_cache.stats(),
+        "single_flight": single_flight.stats(),
+        "models": model_loader.status(),
+        "model_memory": model_loader.registry.memory(),
+        "ingest_executors": executors.stats(),
+        "ingest_jobs": ingest_jobs.queue.stats(),
+        "temp_files": temp_files.stats(),
+    }
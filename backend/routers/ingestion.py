@@ -1,74 +1,134 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi.responses import JSONResponse
 
 from backend.ingestion.audio import transcribe_audio
-from backend.ingestion.image import ocr_image_bytes
-from backend.ingestion.pdf import extract_pdf_text_from_bytes
+from backend.ingestion.image import ocr_image
+from backend.ingestion.pdf import extract_pdf_text
 from backend.ingestion.text import ingest_text as normalize_text
 from backend.ingestion.url import chunk_url
-from backend.ingestion.video import transcribe_video
-from backend.services import vector_service
-from backend.utils.file_utils import get_tmp_path, write_bytes
+from backend.ingestion.video import extract_audio_from_video
+from backend.services import executors, ingest_jobs, vector_service
+from backend.utils.file_utils import StoredUpload, UploadTooLarge, stream_upload, temp_files
 
 router = APIRouter(tags=["multimodal-ingestion"])
 
 
-async def _persist_upload(file: UploadFile) -> str:
-    payload = await file.read()
-    tmp_path = get_tmp_path(file.filename or "upload.bin")
-    write_bytes(tmp_path, payload)
-    return str(tmp_path), payload
+async def _receive(file: UploadFile) -> StoredUpload:
+    try:
+        return await temp_files.receive(file)
+    except UploadTooLarge as exc:
+        raise HTTPException(status_code=413, detail=str(exc)) from exc
+
+
+@asynccontextmanager
+async def _persist_upload(file: UploadFile) -> AsyncIterator[StoredUpload]:
+    """Stream the upload to its own temp file and delete it when the request is done."""
+    upload = await _receive(file)
+    try:
+        yield upload
+    finally:
+        temp_files.release(upload.path)
+
+
+async def _queue_upload(kind: str, file: UploadFile, target: str) -> JSONResponse:
+    # Written straight into the job's directory: moving it there later could mean copying across filesystems.
+    job_id, path = ingest_jobs.queue.reserve(file.filename or "upload.bin")
+    try:
+        upload = await stream_upload(file, path, max_bytes=temp_files.max_bytes)
+        ingest_jobs.queue.submit(kind, source=file.filename, target=target, upload=upload.path, job_id=job_id)
+    except UploadTooLarge as exc:
+        ingest_jobs.queue.discard(job_id)
+        raise HTTPException(status_code=413, detail=str(exc)) from exc
+    except BaseException:
+        ingest_jobs.queue.discard(job_id)
+        raise
+    return _accepted(job_id, sha256=upload.sha256)
+
+
+def _accepted(job_id: str, **extra) -> JSONResponse:
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job_id, "status": ingest_jobs.QUEUED, "status_url": f"/ingest/jobs/{job_id}", **extra},
+    )
+
+
+@router.get("/jobs/{job_id}")
+def ingest_job_status(job_id: str):
+    job = ingest_jobs.queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown ingestion job")
+    return job
 
 
 @router.post("/audio")
-async def ingest_audio_endpoint(file: UploadFile = File(...), target: str = "auto"):
-    temp_path, _ = await _persist_upload(file)
-    transcript = transcribe_audio(temp_path)
+async def ingest_audio_endpoint(file: UploadFile = File(...), target: str = "auto", background: bool = False):
+    if background:
+        return await _queue_upload("audio", file, target)
+    async with _persist_upload(file) as upload:
+        transcript = await executors.run_model(transcribe_audio, upload.path)
     metadata = {"source": file.filename, "modality": "audio"}
-    records = vector_service.ingest_text(transcript, metadata=metadata, target=target)
-    return {"transcription": transcript, "records": records}
+    records = await executors.run_model(vector_service.ingest_text, transcript, metadata=metadata, target=target)
+    return {"transcription": transcript, "sha256": upload.sha256, "records": records}
 
 
 @router.post("/video")
-async def ingest_video_endpoint(file: UploadFile = File(...), target: str = "auto"):
-    temp_path, _ = await _persist_upload(file)
-    transcript = transcribe_video(temp_path)
+async def ingest_video_endpoint(file: UploadFile = File(...), target: str = "auto", background: bool = False):
+    if background:
+        return await _queue_upload("video", file, target)
+    async with _persist_upload(file) as upload:
+        audio_path = temp_files.path(f"{upload.path.stem}.wav")
+        try:
+            # Decoding the soundtrack holds the GIL; Whisper then runs next to the other models.
+            await executors.run_extraction(extract_audio_from_video, upload.path, audio_path)
+            transcript = await executors.run_model(transcribe_audio, audio_path)
+        finally:
+            temp_files.release(audio_path)
     metadata = {"source": file.filename, "modality": "video"}
-    records = vector_service.ingest_text(transcript, metadata=metadata, target=target)
-    return {"transcription": transcript, "records": records}
+    records = await executors.run_model(vector_service.ingest_text, transcript, metadata=metadata, target=target)
+    return {"transcription": transcript, "sha256": upload.sha256, "records": records}
 
 
 @router.post("/image")
-async def ingest_image_endpoint(file: UploadFile = File(...), target: str = "auto"):
-    _, payload = await _persist_upload(file)
-    text = ocr_image_bytes(payload)
+async def ingest_image_endpoint(file: UploadFile = File(...), target: str = "auto", background: bool = False):
+    if background:
+        return await _queue_upload("image", file, target)
+    async with _persist_upload(file) as upload:
+        text = await executors.run_extraction(ocr_image, upload.path)
     metadata = {"source": file.filename, "modality": "image"}
-    records = vector_service.ingest_text(text, metadata=metadata, target=target)
-    return {"ocr_text": text, "records": records}
+    records = await executors.run_model(vector_service.ingest_text, text, metadata=metadata, target=target)
+    return {"ocr_text": text, "sha256": upload.sha256, "records": records}
 
 
 @router.post("/pdf")
-async def ingest_pdf_endpoint(file: UploadFile = File(...), target: str = "auto"):
-    _, payload = await _persist_upload(file)
-    text = extract_pdf_text_from_bytes(payload)
+async def ingest_pdf_endpoint(file: UploadFile = File(...), target: str = "auto", background: bool = False):
+    if background:
+        return await _queue_upload("pdf", file, target)
+    async with _persist_upload(file) as upload:
+        text = await executors.run_extraction(extract_pdf_text, upload.path)
     if not text.strip():
         raise HTTPException(status_code=400, detail="No text extracted from PDF")
     metadata = {"source": file.filename, "modality": "pdf"}
-    records = vector_service.ingest_text(text, metadata=metadata, target=target)
-    return {"text_length": len(text), "records": records}
+    records = await executors.run_model(vector_service.ingest_text, text, metadata=metadata, target=target)
+    return {"text_length": len(text), "sha256": upload.sha256, "records": records}
 
 
 @router.post("/text")
-async def ingest_text_endpoint(text: str = Form(...), target: str = "auto"):
+async def ingest_text_endpoint(text: str = Form(...), target: str = "auto", background: bool = False):
+    if background:
+        return _accepted(ingest_jobs.queue.submit("text", source="manual", target=target, text=normalize_text(text)))
     metadata = {"source": "manual", "modality": "text"}
-    records = vector_service.ingest_text(normalize_text(text), metadata=metadata, target=target)
+    records = await executors.run_model(vector_service.ingest_text, normalize_text(text), metadata=metadata, target=target)
     return {"records": records}
 
 
 @router.post("/url")
-async def ingest_url_endpoint(url: str = Form(...), target: str = "auto"):
-    chunks = chunk_url(url)
+async def ingest_url_endpoint(url: str = Form(...), target: str = "auto", background: bool = False):
+    if background:
+        return _accepted(ingest_jobs.queue.submit("url", source=url, target=target, url=url))
+    chunks = await executors.run_model(chunk_url, url)
     metadata = {"source": url, "modality": "url"}
-    ingested = []
-    for chunk in chunks:
-        ingested.extend(vector_service.ingest_text(chunk, metadata=metadata, target=target))
+    ingested = await executors.run_model(vector_service.ingest_segments, chunks, metadata=metadata, target=target)
     return {"chunks": len(chunks), "records": ingested}
@@ -1,31 +1,38 @@
 from pathlib import Path
 from typing import Dict
 
-from fastapi import APIRouter, File, UploadFile
+from fastapi import APIRouter, File, HTTPException, UploadFile
 
 from backend.local_stack import extractor, rag_engine
-from backend.local_stack.db import add_chunk, init_db
-from backend.local_stack.embedder import embed_text
+from backend.local_stack.embedder import embed_texts
+from backend.local_stack.index import local_index
+from backend.services import executors
+from backend.utils.file_utils import UploadTooLarge, stream_upload, unique_tmp_path
 
 BASE_DIR = Path(__file__).resolve().parents[2]
 PDF_FOLDER = BASE_DIR / "data" / "sahayak_09_02" / "pdf_storage"
 PDF_FOLDER.mkdir(parents=True, exist_ok=True)
 
-init_db()
 router = APIRouter(prefix="/local", tags=["local-rag"])
 
 
 @router.post("/upload")
 async def upload_to_local_store(file: UploadFile = File(...)) -> Dict[str, str]:
-    payload = await file.read()
-    filename = file.filename or "document"
+    filename = Path(file.filename or "document").name
     path = PDF_FOLDER / filename
-    path.write_bytes(payload)
+    try:
+        # Stream next to the destination, then swap it in so a failed upload never leaves half a file.
+        upload = await stream_upload(file, unique_tmp_path(filename, PDF_FOLDER))
+    except UploadTooLarge as exc:
+        raise HTTPException(status_code=413, detail=str(exc)) from exc
+    upload.path.replace(path)
 
     if filename.lower().endswith(".pdf"):
-        text = extractor.extract_pdf(payload)
+        text = await executors.run_extraction(extractor.extract_pdf, path)
+        modality = "pdf"
     elif filename.lower().endswith((".png", ".jpg", ".jpeg")):
-        text = extractor.extract_image(payload)
+        text = await executors.run_extraction(extractor.extract_image, path)
+        modality = "image"
     else:
         return {"error": "Unsupported file type"}
 
@@ -39,8 +46,8 @@ async def upload_to_local_store(file: UploadFile = File(...)) -> Dict[str, str]:
         chunk = text[idx : idx + chunk_size].strip()
         if chunk:
             chunks.append(chunk)
-            embedding = embed_text(chunk)
-            add_chunk(filename, chunk, embedding)
+    embeddings = await executors.run_model(embed_texts, chunks)
+    await executors.run_model(local_index.add_chunks, filename, chunks, embeddings, modality=modality)
 
     return {"status": "ok", "chunks_written": str(len(chunks))}
 
@@ -1,15 +1,140 @@
-from fastapi import APIRouter, Form
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import APIRouter, Form, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 
 from backend.services import vector_service
 
 router = APIRouter(tags=["rag"])
 
+MAX_BATCH_QUERIES = int(os.getenv("SEARCH_BATCH_MAX_QUERIES", "256"))
+
+
+class BatchSearchRequest(BaseModel):
+    queries: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_QUERIES, description="Questions to search for")
+    top_k: int = 5
+    target: str = "auto"
+    nprobe: Optional[int] = None
+    ef_search: Optional[int] = None
+    source: Optional[str] = None
+    modality: Optional[str] = None
+    date_from: Optional[str] = None
+    date_to: Optional[str] = None
+
+
+def _filters(source: Optional[str], modality: Optional[str], date_from: Optional[str], date_to: Optional[str]):
+    try:
+        return vector_service.build_filters(source=source, modality=modality, date_from=date_from, date_to=date_to)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid date filter: {exc}") from exc
+
 
 @router.post("/vector")
-def vector_search(query: str = Form(...), top_k: int = 5, target: str = "auto"):
-    return {"results": vector_service.search_vectors(query, top_k=top_k, target=target)}
+def vector_search(
+    query: str = Form(...),
+    top_k: int = 5,
+    target: str = "auto",
+    nprobe: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    source: Optional[str] = None,
+    modality: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    mode: str = "vector",
+):
+    filters = _filters(source, modality, date_from, date_to)
+    try:
+        return vector_service.search_vectors_report(
+            query,
+            top_k=top_k,
+            target=target,
+            nprobe=nprobe,
+            ef_search=ef_search,
+            filters=filters,
+            mode=mode,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@router.post("/vector/batch")
+def vector_search_batch(request: BatchSearchRequest):
+    filters = _filters(request.source, request.modality, request.date_from, request.date_to)
+    return {
+        "results": vector_service.search_vectors_batch(
+            request.queries,
+            top_k=request.top_k,
+            target=request.target,
+            nprobe=request.nprobe,
+            ef_search=request.ef_search,
+            filters=filters,
+        )
+    }
 
 
 @router.post("/rag")
-def rag_search(query: str = Form(...), top_k: int = 5, target: str = "auto"):
-    return vector_service.rag_answer(query, top_k=top_k, target=target)
+def rag_search(
+    query: str = Form(...),
+    top_k: int = 5,
+    target: str = "auto",
+    nprobe: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    source: Optional[str] = None,
+    modality: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    quality: str = vector_service.DEFAULT_QUALITY,
+):
+    filters = _filters(source, modality, date_from, date_to)
+    try:
+        return vector_service.rag_answer(
+            query,
+            top_k=top_k,
+            target=target,
+            nprobe=nprobe,
+            ef_search=ef_search,
+            filters=filters,
+            quality=quality,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@router.post("/rag/stream")
+def rag_search_stream(
+    query: str = Form(...),
+    top_k: int = 5,
+    target: str = "auto",
+    nprobe: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    source: Optional[str] = None,
+    modality: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+):
+    """Server-Sent Events variant of ``/rag``: ``sources``, then ``token`` events, then ``done``."""
+    events = vector_service.stream_rag_answer(
+        query,
+        top_k=top_k,
+        target=target,
+        nprobe=nprobe,
+        ef_search=ef_search,
+        filters=_filters(source, modality, date_from, date_to),
+    )
+    return StreamingResponse(
+        _server_sent_events(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _server_sent_events(events: Iterator[Tuple[str, Dict[str, Any]]]) -> Iterator[str]:
+    try:
+        for event, data in events:
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    except Exception as exc:
+        # Headers are already sent, so failures are reported in-band.
+        yield f"event: error\ndata: {json.dumps({'detail': str(exc)})}\n\n"
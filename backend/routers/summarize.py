@@ -1,4 +1,6 @@
-from fastapi import APIRouter, Form
+from typing import Optional
+
+from fastapi import APIRouter, Form, HTTPException
 
 from backend.services import vector_service
 
@@ -6,5 +8,16 @@ router = APIRouter(tags=["summaries"])
 
 
 @router.post("/text")
-def summarize_text_endpoint(text: str = Form(...)):
-    return {"summary": vector_service.summarize_text(text)}
+def summarize_text_endpoint(
+    text: str = Form(...),
+    max_length: int = 160,
+    quality: str = vector_service.DEFAULT_QUALITY,
+    budget_seconds: Optional[float] = None,
+):
+    try:
+        summary = vector_service.summarize_text(
+            text, max_length=max_length, quality=quality, budget_seconds=budget_seconds
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return {"summary": summary}
@@ -0,0 +1,142 @@
+"""Bounded executors for blocking ingestion work awaited from async routes.
+
+Model inference (Whisper, the embedder) runs on a thread pool: the models
+live in this process's shared registry, and torch releases the GIL while it
+computes. Pure-Python extraction (pdfplumber, OCR, moviepy) holds the GIL,
+so it runs in a process pool instead. Either way the event loop stays free
+to serve searches and health checks while uploads are processed, and the
+pool sizes cap how much ingestion runs at once.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+THREAD_WORKERS = int(os.getenv("INGEST_THREAD_WORKERS", "2"))
+# 0 runs extraction on the thread pool instead (e.g. where processes cannot be spawned).
+PROCESS_WORKERS = int(os.getenv("INGEST_PROCESS_WORKERS", "2"))
+PROCESS_START_METHOD = os.getenv("INGEST_PROCESS_START_METHOD", "spawn")
+
+
+class BoundedExecutor:
+    """Lazily created executor that counts queued and running tasks."""
+
+    def __init__(self, name: str, factory: Callable[[], Executor], workers: int) -> None:
+        self.name = name
+        self.workers = workers
+        self._factory = factory
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+
+    def _get(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._factory()
+            return self._executor
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Await ``fn`` on the pool from async code."""
+        loop = asyncio.get_running_loop()
+        return await self._track(loop.run_in_executor(self._get(), functools.partial(fn, *args, **kwargs)))
+
+    def call(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run ``fn`` on the pool and block until it finishes (for worker threads)."""
+        future = self._get().submit(fn, *args, **kwargs)
+        with self._lock:
+            self.pending += 1
+        try:
+            result = future.result()
+        except BaseException as exc:
+            self._failed(exc)
+            raise
+        finally:
+            with self._lock:
+                self.pending -= 1
+        with self._lock:
+            self.completed += 1
+        return result
+
+    async def _track(self, awaitable: Awaitable[T]) -> T:
+        with self._lock:
+            self.pending += 1
+        try:
+            result = await awaitable
+        except BaseException as exc:
+            self._failed(exc)
+            raise
+        finally:
+            with self._lock:
+                self.pending -= 1
+        with self._lock:
+            self.completed += 1
+        return result
+
+    def _failed(self, exc: BaseException) -> None:
+        with self._lock:
+            self.failed += 1
+        if isinstance(exc, BrokenExecutor):
+            # A worker process died (e.g. OOM-killed); start a fresh pool on the next call.
+            self.shutdown()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "started": self._executor is not None,
+            "pending": self.pending,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+
+model_pool = BoundedExecutor(
+    "model",
+    lambda: ThreadPoolExecutor(max_workers=max(THREAD_WORKERS, 1), thread_name_prefix="ingest-model"),
+    max(THREAD_WORKERS, 1),
+)
+extract_pool = (
+    BoundedExecutor(
+        "extract",
+        lambda: ProcessPoolExecutor(
+            max_workers=PROCESS_WORKERS, mp_context=multiprocessing.get_context(PROCESS_START_METHOD)
+        ),
+        PROCESS_WORKERS,
+    )
+    if PROCESS_WORKERS > 0
+    else model_pool
+)
+
+
+async def run_model(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Await ``fn`` on the model thread pool (inference, embedding, store writes)."""
+    return await model_pool.run(fn, *args, **kwargs)
+
+
+async def run_extraction(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Await ``fn`` in the extraction process pool; ``fn`` and its arguments must be picklable."""
+    return await extract_pool.run(fn, *args, **kwargs)
+
+
+def shutdown() -> None:
+    extract_pool.shutdown()
+    model_pool.shutdown()
+
+
+def stats() -> Dict[str, Dict[str, Any]]:
+    return {"model": model_pool.stats(), "extract": extract_pool.stats()}
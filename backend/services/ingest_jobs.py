@@ -0,0 +1,447 @@
+"""Background ingestion jobs with their state kept in SQLite.
+
+A job runs a fixed pipeline of stages for its kind (e.g. video:
+``extract_audio`` -> ``transcribe`` -> ``index``). After every stage, and
+after every indexed batch of chunks, the job row records what is done and
+the intermediate outputs (audio path, extracted text). A restarted server
+puts interrupted jobs back in the queue, and they continue from the last
+finished step instead of starting over. A batch that was written just before
+a crash may be indexed twice; nothing is lost.
+
+Several server processes (``uvicorn --workers N``) can share one queue. A job
+is claimed with a conditional UPDATE, so only one process gets it, and the
+owner renews a lease (``heartbeat``) while it runs. Only jobs whose lease
+has expired are taken back from a process, which means that process died.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+logger = logging.getLogger("sahayak.ingest_jobs")
+
+_DATA_DIR = Path(__file__).resolve().parents[2] / "data" / "sahayak_09_02"
+DB_PATH = os.getenv("INGEST_JOBS_DB", str(_DATA_DIR / "ingest_jobs.db"))
+# Uploaded files wait here (one directory per job) until their job finishes.
+FILES_DIR = os.getenv("INGEST_JOBS_DIR", str(_DATA_DIR / "ingest_jobs"))
+WORKERS = int(os.getenv("INGEST_JOB_WORKERS", "1"))
+BATCH_SIZE = int(os.getenv("INGEST_JOB_BATCH", "64"))
+# A job interrupted this many times (e.g. it keeps crashing the server) is failed instead of resumed.
+MAX_ATTEMPTS = int(os.getenv("INGEST_JOB_MAX_ATTEMPTS", "3"))
+# A running job whose owner has not renewed its lease for this long is taken over.
+LEASE_SECONDS = float(os.getenv("INGEST_JOB_LEASE_SECONDS", "60"))
+POLL_SECONDS = 1.0
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_COLUMNS = {"owner": "TEXT", "heartbeat": "REAL"}
+
+STAGES: Dict[str, Tuple[str, ...]] = {
+    "audio": ("transcribe", "index"),
+    "video": ("extract_audio", "transcribe", "index"),
+    "image": ("extract", "index"),
+    "pdf": ("extract", "index"),
+    "url": ("fetch", "index"),
+    "text": ("index",),
+}
+
+
+class LeaseLost(RuntimeError):
+    """The job was taken over by another process after this one's lease expired."""
+
+
+class IngestJobQueue:
+    """SQLite-backed job queue drained by a small pool of worker threads."""
+
+    def __init__(
+        self,
+        db_path: Path | str = DB_PATH,
+        files_dir: Path | str = FILES_DIR,
+        workers: int = WORKERS,
+        batch_size: int = BATCH_SIZE,
+        max_attempts: int = MAX_ATTEMPTS,
+        lease_seconds: float = LEASE_SECONDS,
+    ) -> None:
+        self.db_path = Path(db_path)
+        self.files_dir = Path(files_dir)
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        # Identifies this queue's claims across the processes sharing the database.
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def reserve(self, filename: str) -> Tuple[str, Path]:
+        """A new job id and the path its upload should be written to, inside the job's directory.
+
+        Async routes stream uploads straight to this path, so queueing the
+        job never copies the file. Pass the id to :meth:`submit` afterwards,
+        or :meth:`discard` it if the upload fails.
+        """
+        job_id = uuid.uuid4().hex
+        job_dir = self.files_dir / job_id
+        job_dir.mkdir(parents=True, exist_ok=True)
+        return job_id, job_dir / (Path(filename).name or "upload.bin")
+
+    def discard(self, job_id: str) -> None:
+        """Remove the directory of a reserved job that was never submitted."""
+        self._discard_files(job_id)
+
+    def submit(
+        self,
+        kind: str,
+        source: str,
+        target: str = "auto",
+        upload: Path | str | None = None,
+        text: str | None = None,
+        url: str | None = None,
+        job_id: str | None = None,
+    ) -> str:
+        """Queue a job and return its id.
+
+        An ``upload`` outside the job's directory is moved there first; that
+        may copy it across filesystems, so async callers should write it to
+        the path from :meth:`reserve` instead.
+        """
+        if kind not in STAGES:
+            raise ValueError(f"Unknown job kind {kind!r}; expected one of {', '.join(STAGES)}")
+        job_id = job_id or uuid.uuid4().hex
+        artifacts: Dict[str, Any] = {}
+        if upload is not None:
+            job_dir = self.files_dir / job_id
+            input_path = Path(upload)
+            if input_path.parent != job_dir:
+                job_dir.mkdir(parents=True, exist_ok=True)
+                input_path = job_dir / input_path.name
+                shutil.move(str(upload), input_path)
+            artifacts["input_path"] = str(input_path)
+        if text is not None:
+            artifacts["text"] = text
+        if url is not None:
+            artifacts["url"] = url
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT INTO ingest_jobs (id, kind, source, target, status, stage_index, progress, artifacts,"
+                " attempts, created_at, updated_at) VALUES (?, ?, ?, ?, ?, 0, 0, ?, 0, ?, ?)",
+                (job_id, kind, source, target, QUEUED, json.dumps(artifacts), now, now),
+            )
+            conn.commit()
+        self._wake.set()
+        return job_id
+
+    def get(self, job_id: str) -> Dict[str, Any] | None:
+        with self._lock:
+            row = self._connection().execute("SELECT * FROM ingest_jobs WHERE id = ?", (job_id,)).fetchone()
+        return _describe(row) if row else None
+
+    def start(self) -> None:
+        """Requeue jobs whose owner died, then start the workers and the lease heartbeat."""
+        self.recover()
+        self._stop.clear()
+        if not self._threads:
+            thread = threading.Thread(target=self._renew_leases, name="ingest-job-lease", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+        while len(self._threads) < self.workers + 1:
+            thread = threading.Thread(
+                target=self._work, name=f"ingest-job-{len(self._threads) - 1}", daemon=True
+            )
+            self._threads.append(thread)
+            thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    def recover(self) -> int:
+        """Requeue ``running`` jobs whose lease expired (or fail them after ``max_attempts``); returns how many."""
+        now = time.time()
+        expired = now - self.lease_seconds
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "UPDATE ingest_jobs SET status = ?, owner = NULL, error = ?, updated_at = ?"
+                " WHERE status = ? AND COALESCE(heartbeat, 0) <= ? AND attempts >= ?",
+                (FAILED, f"interrupted {self.max_attempts} times", now, RUNNING, expired, self.max_attempts),
+            )
+            resumed = conn.execute(
+                "UPDATE ingest_jobs SET status = ?, owner = NULL, updated_at = ?"
+                " WHERE status = ? AND COALESCE(heartbeat, 0) <= ?",
+                (QUEUED, now, RUNNING, expired),
+            ).rowcount
+            conn.commit()
+        if resumed:
+            logger.info("Resuming %d interrupted ingestion job(s)", resumed)
+        return resumed
+
+    def run_next(self) -> bool:
+        """Claim and run one queued job on the calling thread; returns False if the queue is empty."""
+        row = self._claim()
+        if row is None:
+            return False
+        self._run(row)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(
+                self._connection().execute("SELECT status, COUNT(*) FROM ingest_jobs GROUP BY status").fetchall()
+            )
+        return {"workers": max(len(self._threads) - 1, 0), **{status: counts.get(status, 0) for status in (QUEUED, RUNNING, DONE, FAILED)}}
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            # Other server processes may hold the write lock briefly; wait rather than fail.
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS ingest_jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    source TEXT,
+                    target TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    stage_index INTEGER NOT NULL,
+                    progress REAL NOT NULL,
+                    artifacts TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL,
+                    owner TEXT,
+                    heartbeat REAL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            existing = {row["name"] for row in conn.execute("PRAGMA table_info(ingest_jobs)")}
+            for column, kind in _COLUMNS.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE ingest_jobs ADD COLUMN {column} {kind}")
+            conn.execute("CREATE INDEX IF NOT EXISTS ingest_jobs_queue ON ingest_jobs (status, created_at)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _claim(self) -> sqlite3.Row | None:
+        with self._lock:
+            conn = self._connection()
+            while True:
+                row = conn.execute(
+                    "SELECT id FROM ingest_jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+                ).fetchone()
+                if row is None:
+                    return None
+                now = time.time()
+                # Conditional on the status, so a job another process claimed first is skipped.
+                claimed = conn.execute(
+                    "UPDATE ingest_jobs SET status = ?, owner = ?, heartbeat = ?, attempts = attempts + 1,"
+                    " updated_at = ? WHERE id = ? AND status = ?",
+                    (RUNNING, self.owner, now, now, row["id"], QUEUED),
+                ).rowcount
+                conn.commit()
+                if claimed:
+                    return conn.execute("SELECT * FROM ingest_jobs WHERE id = ?", (row["id"],)).fetchone()
+
+    def _save(self, job_id: str, **fields: Any) -> None:
+        """Update a job this queue owns; raises :class:`LeaseLost` if another process took it over."""
+        for key in ("artifacts", "result"):
+            if key in fields:
+                fields[key] = json.dumps(fields[key])
+        fields["updated_at"] = fields["heartbeat"] = time.time()
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with self._lock:
+            conn = self._connection()
+            updated = conn.execute(
+                f"UPDATE ingest_jobs SET {assignments} WHERE id = ? AND owner = ?",
+                (*fields.values(), job_id, self.owner),
+            ).rowcount
+            conn.commit()
+        if not updated:
+            raise LeaseLost(f"Ingestion job {job_id} is now owned by another process")
+
+    def _work(self) -> None:
+        last_recovery = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                if time.monotonic() - last_recovery >= self.lease_seconds:
+                    # Picks up jobs left behind by a sibling process that died.
+                    self.recover()
+                    last_recovery = time.monotonic()
+                if self.run_next():
+                    continue
+            except Exception:
+                logger.exception("Ingestion worker error")
+            self._wake.wait(POLL_SECONDS)
+            self._wake.clear()
+
+    def _renew_leases(self) -> None:
+        while not self._stop.wait(self.lease_seconds / 3):
+            try:
+                with self._lock:
+                    conn = self._connection()
+                    conn.execute(
+                        "UPDATE ingest_jobs SET heartbeat = ? WHERE owner = ? AND status = ?",
+                        (time.time(), self.owner, RUNNING),
+                    )
+                    conn.commit()
+            except sqlite3.Error:
+                logger.exception("Renewing ingestion job leases failed")
+
+    def _run(self, row: sqlite3.Row) -> None:
+        job_id, kind = row["id"], row["kind"]
+        stages = STAGES[kind]
+        artifacts = json.loads(row["artifacts"])
+        stage_index = row["stage_index"]
+        try:
+            while stage_index < len(stages):
+                stage = stages[stage_index]
+                report = self._progress_reporter(job_id, stage_index, len(stages))
+                artifacts = _STAGE_HANDLERS[stage](self, job_id, row, artifacts, report)
+                stage_index += 1
+                self._save(
+                    job_id, stage_index=stage_index, progress=stage_index / len(stages), artifacts=artifacts
+                )
+        except LeaseLost:
+            logger.warning("Ingestion job %s was taken over by another process; abandoning it here", job_id)
+            return
+        except Exception as exc:
+            logger.warning("Ingestion job %s failed in %s: %s", job_id, stages[stage_index], exc)
+            self._finish(job_id, status=FAILED, error=str(exc) or type(exc).__name__)
+            return
+        result = {
+            "text_length": len(artifacts.get("text", "")),
+            "chunks": artifacts.get("chunks", 0),
+            "records": artifacts.get("records", {}),
+        }
+        self._finish(job_id, status=DONE, progress=1.0, result=result, error=None)
+
+    def _finish(self, job_id: str, **fields: Any) -> None:
+        try:
+            self._save(job_id, owner=None, **fields)
+        except LeaseLost:
+            logger.warning("Ingestion job %s was taken over by another process; abandoning it here", job_id)
+            return
+        self._discard_files(job_id)
+
+    def _progress_reporter(self, job_id: str, stage_index: int, stage_count: int) -> Callable[[float, Dict], None]:
+        def report(fraction: float, artifacts: Dict[str, Any]) -> None:
+            self._save(job_id, progress=(stage_index + fraction) / stage_count, artifacts=artifacts)
+
+        return report
+
+    def _discard_files(self, job_id: str) -> None:
+        shutil.rmtree(self.files_dir / job_id, ignore_errors=True)
+
+    def _index(self, job_id: str, row: sqlite3.Row, artifacts: Dict[str, Any], report) -> Dict[str, Any]:
+        from backend.ingestion.text import chunk_text
+        from backend.services import executors, vector_service
+
+        text = artifacts.get("text", "")
+        segments = chunk_text(text) or ([text] if text.strip() else [])
+        metadata = {"source": row["source"], "modality": row["kind"]}
+        records = dict(artifacts.get("records", {}))
+        indexed = artifacts.get("indexed", 0)
+        for start in range(indexed, len(segments), self.batch_size):
+            batch = segments[start : start + self.batch_size]
+            for record in executors.model_pool.call(
+                vector_service.ingest_segments, batch, metadata=metadata, target=row["target"]
+            ):
+                backend = record.get("backend", "unknown")
+                records[backend] = records.get(backend, 0) + 1
+            artifacts = {**artifacts, "indexed": start + len(batch), "records": records}
+            report((start + len(batch)) / len(segments), artifacts)
+        return {**artifacts, "chunks": len(segments), "records": records}
+
+
+def _extract_audio(queue: IngestJobQueue, job_id: str, row, artifacts: Dict[str, Any], report) -> Dict[str, Any]:
+    from backend.ingestion.video import extract_audio_from_video
+    from backend.services import executors
+
+    audio_path = queue.files_dir / job_id / "audio.wav"
+    executors.extract_pool.call(extract_audio_from_video, artifacts["input_path"], audio_path)
+    return {**artifacts, "audio_path": str(audio_path)}
+
+
+def _transcribe(queue: IngestJobQueue, job_id: str, row, artifacts: Dict[str, Any], report) -> Dict[str, Any]:
+    from backend.ingestion.audio import transcribe_audio
+    from backend.services import executors
+
+    path = artifacts.get("audio_path") or artifacts["input_path"]
+    return {**artifacts, "text": executors.model_pool.call(transcribe_audio, path)}
+
+
+def _extract(queue: IngestJobQueue, job_id: str, row, artifacts: Dict[str, Any], report) -> Dict[str, Any]:
+    from backend.ingestion.image import ocr_image
+    from backend.ingestion.pdf import extract_pdf_text
+    from backend.services import executors
+
+    extract = extract_pdf_text if row["kind"] == "pdf" else ocr_image
+    text = executors.extract_pool.call(extract, artifacts["input_path"])
+    if not text.strip():
+        raise ValueError(f"No text extracted from {row['kind']}")
+    return {**artifacts, "text": text}
+
+
+def _fetch(queue: IngestJobQueue, job_id: str, row, artifacts: Dict[str, Any], report) -> Dict[str, Any]:
+    from backend.ingestion.url import fetch_url_text
+    from backend.services import executors
+
+    return {**artifacts, "text": executors.model_pool.call(fetch_url_text, artifacts["url"])}
+
+
+_STAGE_HANDLERS: Dict[str, Callable[..., Dict[str, Any]]] = {
+    "extract_audio": _extract_audio,
+    "transcribe": _transcribe,
+    "extract": _extract,
+    "fetch": _fetch,
+    "index": lambda queue, job_id, row, artifacts, report: queue._index(job_id, row, artifacts, report),
+}
+
+
+def _describe(row: sqlite3.Row) -> Dict[str, Any]:
+    stages = STAGES[row["kind"]]
+    stage_index = row["stage_index"]
+    return {
+        "id": row["id"],
+        "kind": row["kind"],
+        "source": row["source"],
+        "target": row["target"],
+        "status": row["status"],
+        "stage": stages[stage_index] if stage_index < len(stages) else None,
+        "stages": list(stages),
+        "progress": round(row["progress"], 4),
+        "attempts": row["attempts"],
+        "error": row["error"],
+        "result": json.loads(row["result"]) if row["result"] else None,
+        "created_at": row["created_at"],
+        "updated_at": row["updated_at"],
+    }
+
+
+queue = IngestJobQueue()
@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import gc
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Generic, Iterable, Iterator, List, Tuple, TypeVar
+
+logger = logging.getLogger("sahayak.models")
+
+T = TypeVar("T")
+ModelKey = Tuple[str, str, str]  # (model, variant, device)
+
+# Models loaded by the startup warmup thread, by registered name.
+WARMUP_MODELS = [name.strip() for name in os.getenv("WARMUP_MODELS", "embedder,summarizer").split(",") if name.strip()]
+RETRY_SECONDS = float(os.getenv("MODEL_RETRY_SECONDS", "30"))
+RETRY_MAX_SECONDS = float(os.getenv("MODEL_RETRY_MAX_SECONDS", "600"))
+# Resident weights allowed across all models; idle models are unloaded LRU-first beyond it. 0 = unlimited.
+MEMORY_BUDGET_MB = float(os.getenv("MODEL_MEMORY_BUDGET_MB", "0"))
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+# Unloaded by the memory budget after a successful load; the next use loads it again.
+EVICTED = "evicted"
+
+
+class ModelUnavailable(RuntimeError):
+    """Raised without retrying while a failed model is backing off."""
+
+
+class ModelLoader(Generic[T]):
+    """Load a model once and share it; remember failures with exponential backoff.
+
+    Concurrent first callers wait for a single load rather than starting
+    their own. A failed load is not retried until ``retry_seconds`` has
+    passed (doubling per consecutive failure, up to ``max_retry_seconds``);
+    calls in between raise :class:`ModelUnavailable` straight away, so a
+    broken model costs nothing per request. Callers that hold the model for
+    inference should use :meth:`use` (or :meth:`acquire` /
+    :meth:`release`), which pins it against eviction: a model evicted while
+    a caller still holds it would stay in memory and be loaded a second time.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        load: Callable[[], T],
+        retry_seconds: float = RETRY_SECONDS,
+        max_retry_seconds: float = RETRY_MAX_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        key: ModelKey | None = None,
+        on_load: Callable[["ModelLoader"], None] | None = None,
+    ) -> None:
+        self.name = name
+        self.key = key or (name, "default", "auto")
+        self._load = load
+        self.retry_seconds = retry_seconds
+        self.max_retry_seconds = max_retry_seconds
+        self._clock = clock
+        self._on_load = on_load
+        self._lock = threading.Lock()
+        self._model: T | None = None
+        self.state = PENDING
+        self.failures = 0
+        self.error: str | None = None
+        self.load_seconds: float | None = None
+        self.size_bytes = 0
+        self.refs = 0
+        self.loads = 0
+        self.last_used = 0.0
+        self._retry_at = 0.0
+
+    @property
+    def is_ready(self) -> bool:
+        return self.state == READY
+
+    def get(self) -> T:
+        self.last_used = time.monotonic()
+        model = self._model
+        if model is not None:
+            return model
+        with self._lock:
+            if self._model is not None:
+                return self._model
+            if self.state == FAILED and self._clock() < self._retry_at:
+                raise ModelUnavailable(
+                    f"{self.name} failed to load ({self.error}); retrying in {self._retry_at - self._clock():.0f}s"
+                )
+            self.state = LOADING
+            started = time.perf_counter()
+            try:
+                model = self._load()
+            except Exception as exc:
+                self.failures += 1
+                self.error = str(exc) or type(exc).__name__
+                delay = min(self.retry_seconds * 2 ** (self.failures - 1), self.max_retry_seconds)
+                self._retry_at = self._clock() + delay
+                self.state = FAILED
+                logger.warning("Loading %s failed (attempt %d, next in %.0fs): %s", self.name, self.failures, delay, exc)
+                raise
+            self.load_seconds = time.perf_counter() - started
+            self.size_bytes = model_bytes(model)
+            self._model = model
+            self.state = READY
+            self.error = None
+            self.loads += 1
+            logger.info("Loaded %s in %.1fs (%.0f MB)", self.name, self.load_seconds, self.size_bytes / 2**20)
+        if self._on_load is not None:
+            self._on_load(self)
+        return model
+
+    def acquire(self) -> T:
+        """Return the model pinned against eviction; every call must be paired with :meth:`release`."""
+        with self._lock:
+            self.refs += 1
+        try:
+            return self.get()
+        except BaseException:
+            self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            self.refs -= 1
+        self.last_used = time.monotonic()
+
+    @contextmanager
+    def use(self) -> Iterator[T]:
+        """Hold the model for the duration of the block; pinned models are never evicted."""
+        model = self.acquire()
+        try:
+            yield model
+        finally:
+            self.release()
+
+    def unload(self) -> bool:
+        """Drop the loaded model unless it is in use; the next :meth:`get` loads it again."""
+        with self._lock:
+            if self._model is None or self.refs:
+                return False
+            self._model = None
+            self.state = EVICTED
+            self.size_bytes = 0
+            return True
+
+    def status(self) -> Dict[str, Any]:
+        status: Dict[str, Any] = {"state": self.state, "failures": self.failures}
+        if self.load_seconds is not None:
+            status["load_seconds"] = round(self.load_seconds, 3)
+        if self.state == READY:
+            status["size_mb"] = round(self.size_bytes / 2**20, 1)
+            status["refs"] = self.refs
+        if self.state == FAILED:
+            status["error"] = self.error
+            status["retry_in"] = round(max(self._retry_at - self._clock(), 0.0), 1)
+        return status
+
+
+def model_bytes(model: Any) -> int:
+    """Parameter and buffer bytes of a torch model, a pipeline, or a tuple of them (0 if unknown)."""
+    if isinstance(model, (tuple, list)):
+        return sum(model_bytes(part) for part in model)
+    module = getattr(model, "model", model)
+    try:
+        tensors = [*module.parameters(), *module.buffers()]
+        return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+    except (AttributeError, TypeError):
+        return 0
+
+
+class ModelRegistry:
+    """Process-wide set of models keyed by ``(model, variant, device)``.
+
+    Registering a key that is already known returns the existing loader, so
+    every module asking for the same model shares one copy. After each load
+    the registry unloads idle (unpinned) models, least recently used first,
+    until the resident total fits ``budget_bytes``.
+    """
+
+    def __init__(self, budget_bytes: int = int(MEMORY_BUDGET_MB * 2**20)) -> None:
+        self.budget_bytes = budget_bytes
+        self._lock = threading.Lock()
+        self._loaders: Dict[ModelKey, ModelLoader] = {}
+        self._names: Dict[str, ModelKey] = {}
+        self.evictions = 0
+
+    def register(
+        self,
+        name: str,
+        load: Callable[[], T],
+        model: str | None = None,
+        variant: str = "default",
+        device: str = "auto",
+    ) -> ModelLoader[T]:
+        key = (model or name, variant, device)
+        with self._lock:
+            loader = self._loaders.get(key)
+            if loader is None:
+                loader = self._loaders[key] = ModelLoader(name, load, key=key, on_load=self._enforce_budget)
+            self._names.setdefault(name, key)
+            return loader
+
+    def get_loader(self, name: str) -> ModelLoader | None:
+        key = self._names.get(name)
+        return self._loaders.get(key) if key else None
+
+    def resident_bytes(self) -> int:
+        return sum(loader.size_bytes for loader in list(self._loaders.values()) if loader.is_ready)
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {name: self._loaders[key].status() for name, key in sorted(self._names.items())}
+
+    def memory(self) -> Dict[str, Any]:
+        return {
+            "resident_mb": round(self.resident_bytes() / 2**20, 1),
+            "budget_mb": round(self.budget_bytes / 2**20, 1),
+            "models": sum(loader.is_ready for loader in list(self._loaders.values())),
+            "evictions": self.evictions,
+        }
+
+    def _enforce_budget(self, loaded: ModelLoader) -> None:
+        if self.budget_bytes <= 0:
+            return
+        with self._lock:
+            idle = sorted(
+                (loader for loader in self._loaders.values() if loader is not loaded and loader.is_ready),
+                key=lambda loader: loader.last_used,
+            )
+        evicted = False
+        for loader in idle:
+            if self.resident_bytes() <= self.budget_bytes:
+                break
+            if loader.unload():
+                self.evictions += 1
+                evicted = True
+                logger.info("Evicted %s to stay within the %.0f MB model budget", loader.name, self.budget_bytes / 2**20)
+        if evicted:
+            gc.collect()
+        if self.resident_bytes() > self.budget_bytes:
+            logger.warning(
+                "Models in use need %.0f MB, over the %.0f MB budget",
+                self.resident_bytes() / 2**20,
+                self.budget_bytes / 2**20,
+            )
+
+
+registry = ModelRegistry()
+_warmup_names: List[str] = []
+
+
+def register(
+    name: str,
+    load: Callable[[], T],
+    model: str | None = None,
+    variant: str = "default",
+    device: str = "auto",
+) -> ModelLoader[T]:
+    """Return the shared loader for ``(model or name, variant, device)``, creating it on first use."""
+    return registry.register(name, load, model=model, variant=variant, device=device)
+
+
+def warmup(names: Iterable[str] = WARMUP_MODELS) -> threading.Thread:
+    """Load ``names`` one after another on a daemon thread; failures are logged and backed off."""
+    names = list(names)
+    _warmup_names[:] = names
+
+    def run() -> None:
+        for name in names:
+            loader = registry.get_loader(name)
+            if loader is None:
+                logger.warning("No model registered as %r; skipping warmup", name)
+                continue
+            try:
+                loader.get()
+            except Exception:
+                pass  # Logged by the loader; requests fall back or retry after the backoff.
+
+    thread = threading.Thread(target=run, name="model-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def status() -> Dict[str, Dict[str, Any]]:
+    return registry.status()
+
+
+def readiness() -> Dict[str, Any]:
+    """``ready`` once every warmup model has loaded; other registered models are listed but optional.
+
+    A model evicted by the memory budget loaded fine and will load again on
+    its next use, so it still counts as ready.
+    """
+    models = status()
+    waiting = [name for name in _warmup_names if models.get(name, {}).get("state") not in (READY, EVICTED)]
+    return {"ready": not waiting, "waiting": waiting, "models": models}
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import copy
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+import numpy as np
+
+MAX_ENTRIES = int(os.getenv("QUERY_CACHE_SIZE", "1024"))
+TTL_SECONDS = float(os.getenv("QUERY_CACHE_TTL_SECONDS", "300"))
+SEMANTIC_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_SIZE", "2048"))
+SEMANTIC_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+
+
+def normalize_query(query: str) -> str:
+    """Case-fold and collapse whitespace so trivially different spellings share a key."""
+    normalized = unicodedata.normalize("NFKC", query or "").casefold()
+    return re.sub(r"\s+", " ", normalized).strip()
+
+
+def freeze_filters(filters: Dict[str, Any] | None) -> Tuple:
+    """Hashable, order-independent form of a search filter dict."""
+    if not filters:
+        return ()
+    frozen = []
+    for key, value in sorted(filters.items()):
+        if isinstance(value, (list, tuple, set)):
+            value = tuple(sorted(value))
+        frozen.append((key, value))
+    return tuple(frozen)
+
+
+class ResultCache:
+    """Bounded LRU of computed responses with a TTL and generation check.
+
+    Every entry records the store generation it was computed against; a
+    lookup with a different generation is a miss, so new content invalidates
+    all cached answers at once without walking the cache. The TTL bounds
+    staleness for writes this process cannot see (e.g. another server
+    writing to the same Qdrant collection). ``max_entries=0`` disables it.
+
+    Values are deep-copied on the way in and out, so callers may mutate what
+    they store or get back without corrupting the cached entry.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = MAX_ENTRIES,
+        ttl_seconds: float = TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[Hashable, float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, generation: Hashable) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            entry_generation, expires_at, value = entry
+            if _is_older(generation, entry_generation):
+                # The caller read the stores before the entry's content landed; keep the newer entry.
+                self.misses += 1
+                return None
+            if entry_generation != generation or self._clock() >= expires_at:
+                del self._entries[key]
+                self.invalidations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(value)
+
+    def put(self, key: Hashable, generation: Hashable, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        value = copy.deepcopy(value)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and _is_older(generation, entry[0]):
+                return
+            self._entries[key] = (generation, self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "capacity": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SemanticCache:
+    """Answers keyed by query embedding, served to near-duplicate questions.
+
+    Unit-normalised query vectors live in one preallocated float32 matrix, so
+    a lookup is a single matrix-vector product plus ``argmax`` regardless of
+    how many questions are cached. A hit needs cosine similarity of at least
+    ``threshold`` and the same ``scope`` (the non-query request options).
+    The whole cache is dropped when the store generation moves on; requests
+    tagged with an older generation (started before an ingest finished) miss
+    and store nothing rather than flushing the newer entries. The
+    least recently used entry is replaced once it is full. Like
+    :class:`ResultCache`, it stores and returns deep copies.
+    """
+
+    def __init__(self, max_entries: int = SEMANTIC_MAX_ENTRIES, threshold: float = SEMANTIC_THRESHOLD) -> None:
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._vectors: np.ndarray | None = None
+        self._scopes = np.zeros(max(max_entries, 0), dtype="int64")
+        self._last_used = np.zeros(max(max_entries, 0), dtype="int64")
+        self._values: List[Any] = [None] * max(max_entries, 0)
+        self._size = 0
+        self._tick = 0
+        self._generation: Hashable = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, embedding: np.ndarray, scope: Hashable, generation: Hashable) -> Any | None:
+        query = _unit(embedding)
+        with self._lock:
+            if not self._sync(generation):
+                self.misses += 1
+                return None
+            if query is None or not self._size or query.shape[0] != self._vectors.shape[1]:
+                self.misses += 1
+                return None
+            scores = self._vectors[: self._size] @ query
+            scores[self._scopes[: self._size] != hash(scope)] = -np.inf
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                self.misses += 1
+                return None
+            self._tick += 1
+            self._last_used[best] = self._tick
+            self.hits += 1
+            value = self._values[best]
+        return copy.deepcopy(value)
+
+    def put(self, embedding: np.ndarray, scope: Hashable, generation: Hashable, value: Any) -> None:
+        vector = _unit(embedding)
+        if self.max_entries <= 0 or vector is None:
+            return
+        value = copy.deepcopy(value)
+        with self._lock:
+            if not self._sync(generation):
+                return
+            if self._vectors is None or self._vectors.shape[1] != vector.shape[0]:
+                self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype="float32")
+                self._size = 0
+            if self._size < self.max_entries:
+                slot = self._size
+                self._size += 1
+            else:
+                slot = int(np.argmin(self._last_used))
+            self._tick += 1
+            self._vectors[slot] = vector
+            self._scopes[slot] = hash(scope)
+            self._last_used[slot] = self._tick
+            self._values[slot] = value
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": self._size,
+            "capacity": self.max_entries,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._drop()
+            self._generation = None
+
+    def _sync(self, generation: Hashable) -> bool:
+        """Move to ``generation`` if it is newer; returns ``False`` for an older one."""
+        if generation == self._generation:
+            return True
+        if _is_older(generation, self._generation):
+            return False
+        if self._size:
+            self.invalidations += 1
+        self._drop()
+        self._generation = generation
+        return True
+
+    def _drop(self) -> None:
+        self._size = 0
+        self._values = [None] * max(self.max_entries, 0)
+        self._last_used[:] = 0
+
+
+def _is_older(generation: Hashable, current: Hashable) -> bool:
+    """Whether ``generation`` precedes ``current``.
+
+    Generations only grow. A tuple holds one counter per store and is older
+    when no counter is ahead and at least one is behind. Generations that
+    cannot be ordered count as newer.
+    """
+    if current is None or generation == current:
+        return False
+    try:
+        if isinstance(generation, tuple) and isinstance(current, tuple):
+            return len(generation) == len(current) and all(a <= b for a, b in zip(generation, current))
+        return generation < current
+    except TypeError:
+        return False
+
+
+def _unit(embedding: np.ndarray) -> np.ndarray | None:
+    vector = np.asarray(embedding, dtype="float32").ravel()
+    norm = float(np.linalg.norm(vector))
+    if not norm:
+        return None
+    return vector / norm
+
+
+query_cache = ResultCache()
+semantic_cache = SemanticCache()
@@ -1,87 +1,115 @@
 from __future__ import annotations
 
+import hashlib
 import logging
+import os
 import re
-import unicodedata
-from typing import Any, Dict, List
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from datetime import datetime, time as day_time
+from functools import lru_cache
+from typing import Any, Callable, Dict, Generator, Hashable, Iterator, List, Tuple
 
 import numpy as np
-from transformers import pipeline
 
 from backend.ingestion.text import chunk_text
 from backend.local_stack import db as local_db
 from backend.local_stack import embedder as local_embedder
+from backend.local_stack.index import local_index
+from backend.processing import extractive, map_reduce
+from backend.services import model_loader
+from backend.services.result_cache import freeze_filters, normalize_query, query_cache, semantic_cache
+from backend.services.single_flight import SingleFlight
+from backend.utils.sanitize import sanitize_fragment as _sanitize_fragment
+from backend.utils.sanitize import sanitize_record as _sanitize_record  # noqa: F401 - kept for callers
+from backend.utils.sanitize import sanitize_text as _sanitize_output
 from backend.vector_store import qdrant_store
 
-local_db.init_db()
-
 logger = logging.getLogger("sahayak.vector_service")
 
-_summary_pipeline = None
-
-_SANITIZE_TRANSLATION = str.maketrans({
-    "\u2018": "'",
-    "\u2019": "'",
-    "\u201c": '"',
-    "\u201d": '"',
-    "\u2013": "-",
-    "\u2014": "-",
-})
-
-
-def _sanitize_output(text: str) -> str:
-    """Remove emojis/non-ASCII glyphs and normalize whitespace for API responses."""
-    if not text:
-        return ""
-
-    normalized = unicodedata.normalize("NFKC", text).translate(_SANITIZE_TRANSLATION)
-    ascii_text = normalized.encode("ascii", "ignore").decode("ascii")
-    ascii_text = ascii_text.replace("\r\n", "\n").replace("\r", "\n")
-    ascii_text = re.sub(r"[ \t]+", " ", ascii_text)
-    ascii_text = re.sub(r"\n{3,}", "\n\n", ascii_text)
-
-    cleaned_lines = []
-    previous_blank = False
-    for raw_line in ascii_text.split("\n"):
-        stripped_line = raw_line.strip()
-        if not stripped_line:
-            if cleaned_lines and not previous_blank:
-                cleaned_lines.append("")
-            previous_blank = True
-            continue
-        cleaned_lines.append(stripped_line)
-        previous_blank = False
-
-    cleaned = "\n".join(cleaned_lines).strip()
-    return cleaned
-
-
-def _sanitize_record(record: Dict[str, Any]) -> Dict[str, Any]:
-    sanitized = dict(record)
-    content = sanitized.get("content")
-    if isinstance(content, str):
-        sanitized["content"] = _sanitize_output(content)
-
-    metadata = sanitized.get("metadata")
-    if isinstance(metadata, dict):
-        cleaned_meta = {}
-        for key, value in metadata.items():
-            if isinstance(value, str):
-                cleaned_meta[key] = _sanitize_output(value)
-            else:
-                cleaned_meta[key] = value
-        sanitized["metadata"] = cleaned_meta
-    return sanitized
-
-
-def _load_summarizer():
-    global _summary_pipeline
-    if _summary_pipeline is None:
+SUMMARY_MODEL = "facebook/bart-large-cnn"
+# Loaded once (at startup by the warmup thread); a failed load backs off instead of retrying per request.
+_summarizer_loader = model_loader.register(
+    "summarizer",
+    lambda: _build_summarizer(SUMMARY_MODEL),
+    model=SUMMARY_MODEL,
+    variant="summarization",
+)
+
+# Longest wait for the next generated token of a streamed answer.
+STREAM_TOKEN_TIMEOUT = float(os.getenv("STREAM_TOKEN_TIMEOUT_SECONDS", "60"))
+NO_CONTEXT_ANSWER = "No context available yet. Please ingest content first."
+# Summary tiers: extractive (fast), single-pass BART (balanced), map-reduce BART (best).
+QUALITY_TIERS = ("fast", "balanced", "best")
+# The map-reduce "best" tier is much slower, so it is opt-in everywhere.
+DEFAULT_QUALITY = "balanced"
+
+# Per-request budget for each vector backend; slower backends are dropped from the response.
+SEARCH_DEADLINE_MS = float(os.getenv("SEARCH_BACKEND_DEADLINE_MS", "2000"))
+# Hybrid search fuses vector and BM25 rankings by reciprocal rank; each ranking
+# contributes HYBRID_CANDIDATE_FACTOR * top_k candidates.
+SEARCH_MODES = ("vector", "hybrid", "lexical")
+RRF_K = int(os.getenv("HYBRID_RRF_K", "60"))
+HYBRID_CANDIDATE_FACTOR = int(os.getenv("HYBRID_CANDIDATE_FACTOR", "3"))
+# Threads per backend; a backend whose calls still hold all of them is skipped rather than queued.
+SEARCH_BACKEND_WORKERS = int(os.getenv("SEARCH_BACKEND_WORKERS", "4"))
+
+
+class _BackendPool:
+    """Threads for one search backend that never queue work.
+
+    A timed-out call keeps running on its thread, so a hung backend ties up
+    its own workers only. Once all of them are busy, :meth:`submit` returns
+    ``None`` and the request skips that backend instead of waiting behind
+    calls that have already missed their deadline.
+    """
+
+    def __init__(self, name: str, workers: int = SEARCH_BACKEND_WORKERS) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"search-{name}")
+        self._slots = threading.BoundedSemaphore(workers)
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future | None:
+        if not self._slots.acquire(blocking=False):
+            return None
         try:
-            _summary_pipeline = pipeline("summarization", model="facebook/bart-large-cnn")
-        except Exception:
-            _summary_pipeline = None
-    return _summary_pipeline
+            future = self._executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+
+_search_pools = {name: _BackendPool(name) for name in ("qdrant", "local", "lexical")}
+
+# Identical search/RAG/summarize requests already in progress share one computation.
+single_flight = SingleFlight()
+
+# Bumped on every Qdrant ingest; the local index keeps its own generation.
+_qdrant_generation = 0
+_generation_lock = threading.Lock()
+
+def _build_summarizer(model: str):
+    # transformers (and torch) are imported only when the model is first needed.
+    from transformers import pipeline
+
+    return pipeline("summarization", model=model)
+
+
+@contextmanager
+def _use_summarizer() -> Iterator[Any]:
+    """The BART pipeline pinned against eviction for the block, or ``None`` while it cannot load."""
+    try:
+        summarizer = _summarizer_loader.acquire()
+    except Exception:
+        yield None
+        return
+    try:
+        yield summarizer
+    finally:
+        _summarizer_loader.release()
 
 
 def _use_qdrant(target: str) -> bool:
@@ -102,41 +130,279 @@ def _use_local(target: str) -> bool:
     return target == "auto"
 
 
+def build_filters(
+    source: str | None = None,
+    modality: str | None = None,
+    date_from: str | None = None,
+    date_to: str | None = None,
+) -> Dict[str, Any] | None:
+    """Turn request parameters into search filters; ISO dates become epoch-second bounds.
+
+    Raises ``ValueError`` for dates that are not ISO 8601.
+    """
+    filters: Dict[str, Any] = {}
+    if source:
+        filters["source"] = source
+    if modality:
+        filters["modality"] = modality
+    if date_from:
+        filters["created_after"] = _parse_date(date_from, day_time.min)
+    if date_to:
+        filters["created_before"] = _parse_date(date_to, day_time.max)
+    return filters or None
+
+
+def _parse_date(value: str, default_time: day_time) -> float:
+    parsed = datetime.fromisoformat(value)
+    if len(value) <= 10:
+        # Date-only bounds cover the whole day.
+        parsed = datetime.combine(parsed.date(), default_time)
+    return parsed.timestamp()
+
+
+def store_generation() -> Tuple[int, int]:
+    """Token that changes whenever content is added to either vector store."""
+    local_index.refresh()
+    return local_index.generation, _qdrant_generation
+
+
+def _bump_qdrant_generation() -> None:
+    global _qdrant_generation
+    with _generation_lock:
+        _qdrant_generation += 1
+
+
+def _cache_key(
+    kind: str,
+    query: str,
+    top_k: int,
+    target: str,
+    nprobe: int | None,
+    ef_search: int | None,
+    filters: Dict[str, Any] | None,
+    mode: str = "vector",
+    quality: str | None = None,
+) -> Hashable:
+    return kind, normalize_query(query), top_k, target, nprobe, ef_search, freeze_filters(filters), mode, quality
+
+
+def _cache_result(
+    key: Hashable,
+    generation: Tuple[int, int],
+    result: Dict[str, Any],
+    query_embedding: np.ndarray | None = None,
+) -> Dict[str, Any]:
+    # Partial results reflect a slow or failing backend, and degraded answers a model
+    # that is still loading or backing off, not the corpus; do not pin them.
+    if not result.get("partial") and not result.get("degraded"):
+        query_cache.put(key, generation, result)
+        if query_embedding is not None:
+            semantic_cache.put(query_embedding, _semantic_scope(key), generation, result)
+    return result
+
+
+def _semantic_scope(key: Hashable) -> Hashable:
+    # Everything in the exact-match key except the query text itself.
+    kind, _query, *options = key
+    return kind, *options
+
+
 def ingest_text(text: str, metadata: Dict[str, str] | None = None, target: str = "auto") -> List[Dict[str, str]]:
-    metadata = metadata or {}
     segments = chunk_text(text) or [text]
+    return ingest_segments(segments, metadata=metadata, target=target)
+
+
+def ingest_segments(
+    segments: List[str], metadata: Dict[str, str] | None = None, target: str = "auto"
+) -> List[Dict[str, str]]:
+    """Embed pre-chunked segments in one batch and write them to the selected backends."""
+    metadata = metadata or {}
+    segments = [segment for segment in segments if segment]
+    if not segments:
+        return []
+    embeddings = local_embedder.embed_texts(segments)
     records: List[Dict[str, str]] = []
-    for segment in segments:
-        embedding = local_embedder.embed_text(segment)
-        if _use_qdrant(target):
-            try:
-                record = qdrant_store.upsert_text(segment, metadata, embedding)
+    if _use_qdrant(target):
+        payload = {**metadata, "created_at": time.time()}
+        try:
+            for record in qdrant_store.upsert_many(segments, payload, embeddings):
                 record["backend"] = "qdrant"
                 records.append(record)
-            except Exception as exc:
-                logger.warning("Qdrant ingestion failed, falling back to local store: %s", exc)
-        if _use_local(target):
-            records.append(_ingest_local(segment, metadata, embedding))
+            _bump_qdrant_generation()
+        except Exception as exc:
+            logger.warning("Qdrant ingestion failed, falling back to local store: %s", exc)
+    if _use_local(target):
+        records.extend(_ingest_local(segments, metadata, embeddings))
     return records
 
 
-def _ingest_local(text: str, metadata: Dict[str, str], embedding: np.ndarray | None = None) -> Dict[str, str]:
-    embedding = embedding if embedding is not None else local_embedder.embed_text(text)
+def _ingest_local(segments: List[str], metadata: Dict[str, str], embeddings: np.ndarray) -> List[Dict[str, str]]:
     filename = metadata.get("source", "local-upload")
-    local_db.add_chunk(filename, text, embedding)
-    return {"backend": "local", "metadata": metadata, "content": text}
-
-
-def search_vectors(query: str, top_k: int = 5, target: str = "auto") -> List[Dict[str, str]]:
-    results: List[Dict[str, str]] = []
-    query_embedding = local_embedder.embed_text(query)
-    if _use_qdrant(target):
+    local_index.add_chunks(filename, segments, embeddings, modality=metadata.get("modality"))
+    return [{"backend": "local", "metadata": metadata, "content": segment} for segment in segments]
+
+
+def search_vectors(
+    query: str,
+    top_k: int = 5,
+    target: str = "auto",
+    nprobe: int | None = None,
+    ef_search: int | None = None,
+    filters: Dict[str, Any] | None = None,
+    mode: str = "vector",
+) -> List[Dict[str, str]]:
+    report = search_vectors_report(
+        query, top_k=top_k, target=target, nprobe=nprobe, ef_search=ef_search, filters=filters, mode=mode
+    )
+    return report["results"]
+
+
+def search_vectors_report(
+    query: str,
+    top_k: int = 5,
+    target: str = "auto",
+    nprobe: int | None = None,
+    ef_search: int | None = None,
+    filters: Dict[str, Any] | None = None,
+    deadline_ms: float | None = None,
+    mode: str = "vector",
+) -> Dict[str, Any]:
+    """Query the selected backends concurrently and merge their hits.
+
+    ``mode`` is ``vector`` (embedding search), ``lexical`` (BM25 over the
+    local store) or ``hybrid`` (both, fused by reciprocal rank); it raises
+    ``ValueError`` for unknown modes or lexical search without the local store.
+    Each backend gets ``deadline_ms`` (default ``SEARCH_BACKEND_DEADLINE_MS``);
+    ``backends`` maps each queried backend to ``ok``, ``timeout``, ``error``
+    or ``busy`` (skipped because earlier calls to it are still running) and
+    ``partial`` is set when any of them did not contribute. Complete
+    reports are cached until new content is ingested, and concurrent
+    identical requests share one search.
+    """
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode {mode!r}; expected one of {', '.join(SEARCH_MODES)}")
+    if mode == "lexical" and not _use_local(target):
+        raise ValueError("Lexical search needs the local store; use target=local or auto")
+    key = _cache_key("search", query, top_k, target, nprobe, ef_search, filters, mode)
+    generation = store_generation()
+    cached = query_cache.get(key, generation)
+    if cached is not None:
+        return cached
+    return single_flight.do(
+        key,
+        lambda: _search_report(
+            key, generation, query, top_k, target, nprobe, ef_search, filters, deadline_ms, mode
+        ),
+    )
+
+
+def _search_report(
+    key: Hashable,
+    generation: Tuple[int, int],
+    query: str,
+    top_k: int,
+    target: str,
+    nprobe: int | None,
+    ef_search: int | None,
+    filters: Dict[str, Any] | None,
+    deadline_ms: float | None,
+    mode: str,
+) -> Dict[str, Any]:
+    depth = top_k * HYBRID_CANDIDATE_FACTOR if mode == "hybrid" else top_k
+    futures = {}
+    if mode != "lexical":
+        query_embedding = local_embedder.embed_query(query)
+        if _use_qdrant(target):
+            futures["qdrant"] = _search_pools["qdrant"].submit(_search_qdrant, query_embedding, depth, filters=filters)
+        if _use_local(target):
+            futures["local"] = _search_pools["local"].submit(
+                _search_local, query_embedding, depth, nprobe=nprobe, ef_search=ef_search, filters=filters
+            )
+    if mode != "vector" and _use_local(target):
+        futures["lexical"] = _search_pools["lexical"].submit(_search_lexical, query, depth, filters=filters)
+    outputs, backends = _collect(futures, deadline_ms)
+    lexical_hits = outputs.pop("lexical", [])
+    results = [hit for hits in outputs.values() for hit in hits]
+    if mode == "lexical":
+        results = lexical_hits
+    elif mode == "hybrid":
+        results = _fuse_rankings([_rank_hits(results), lexical_hits])
+    report = {
+        "results": _merge_hits(results, top_k),
+        "backends": backends,
+        "partial": any(status != "ok" for status in backends.values()),
+    }
+    return _cache_result(key, generation, report)
+
+
+def search_vectors_batch(
+    queries: List[str],
+    top_k: int = 5,
+    target: str = "auto",
+    nprobe: int | None = None,
+    ef_search: int | None = None,
+    filters: Dict[str, Any] | None = None,
+    deadline_ms: float | None = None,
+) -> List[Dict[str, Any]]:
+    """Vector search for many queries at once; returns one report per query, in order.
+
+    Queries already in the result cache are answered from it. The rest are
+    embedded in one batch and sent to each backend as a single matrix query:
+    one FAISS ``search`` call and one Qdrant ``query_batch_points`` call.
+    """
+    generation = store_generation()
+    keys = [_cache_key("search", query, top_k, target, nprobe, ef_search, filters) for query in queries]
+    reports: List[Dict[str, Any] | None] = [query_cache.get(key, generation) for key in keys]
+    pending = [position for position, report in enumerate(reports) if report is None]
+    if pending:
+        embeddings = local_embedder.embed_texts([queries[position] for position in pending])
+        futures = {}
+        if _use_qdrant(target):
+            futures["qdrant"] = _search_pools["qdrant"].submit(_search_qdrant_batch, embeddings, top_k, filters=filters)
+        if _use_local(target):
+            futures["local"] = _search_pools["local"].submit(
+                _search_local_batch, embeddings, top_k, nprobe=nprobe, ef_search=ef_search, filters=filters
+            )
+        outputs, backends = _collect(futures, deadline_ms)
+        partial = any(status != "ok" for status in backends.values())
+        for row, position in enumerate(pending):
+            hits = [hit for per_query in outputs.values() for hit in per_query[row]]
+            report = {"results": _merge_hits(hits, top_k), "backends": dict(backends), "partial": partial}
+            reports[position] = _cache_result(keys[position], generation, report)
+    return [{"query": query, **report} for query, report in zip(queries, reports)]
+
+
+def _collect(
+    futures: Dict[str, Future | None], deadline_ms: float | None
+) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """Wait up to the deadline for backend futures; returns ``(outputs, backend statuses)``.
+
+    A ``None`` future marks a backend that was skipped because its pool was busy.
+    """
+    deadline = (deadline_ms if deadline_ms is not None else SEARCH_DEADLINE_MS) / 1000.0
+    wait([future for future in futures.values() if future is not None], timeout=deadline)
+    outputs: Dict[str, Any] = {}
+    backends: Dict[str, str] = {}
+    for name, future in futures.items():
+        if future is None:
+            logger.warning("%s search skipped; earlier calls to it are still running", name)
+            backends[name] = "busy"
+            continue
+        if not future.done():
+            # The call keeps its backend's thread until it returns; it cannot be interrupted.
+            logger.warning("%s search exceeded %.0f ms deadline; returning partial results", name, deadline * 1000)
+            backends[name] = "timeout"
+            continue
         try:
-            results.extend(_search_qdrant(query_embedding, top_k))
+            outputs[name] = future.result()
+            backends[name] = "ok"
         except Exception as exc:
-            logger.warning("Qdrant search failed, falling back to local store: %s", exc)
-    if _use_local(target):
-        results.extend(_search_local(query_embedding, top_k))
+            logger.warning("%s search failed: %s", name, exc)
+            backends[name] = "error"
+    return outputs, backends
+
+
+def _merge_hits(results: List[Dict[str, str]], top_k: int) -> List[Dict[str, str]]:
     # Deduplicate by id while keeping highest score
     deduped: Dict[str, Dict[str, str]] = {}
     for item in results:
@@ -144,59 +410,390 @@ def search_vectors(query: str, top_k: int = 5, target: str = "auto") -> List[Dic
         if key not in deduped or item.get("score", 0) > deduped[key].get("score", 0):
             deduped[key] = item
     sorted_hits = sorted(deduped.values(), key=lambda r: r.get("score", 0), reverse=True)
-    sanitized_hits = [_sanitize_record(hit) for hit in sorted_hits[:top_k]]
-    return sanitized_hits
+    # Backends return content sanitized at ingest, so hits are served as-is.
+    return sorted_hits[:top_k]
+
+
+def _rank_hits(hits: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    deduped: Dict[str, Dict[str, str]] = {}
+    for hit in sorted(hits, key=lambda r: r.get("score", 0), reverse=True):
+        deduped.setdefault(hit.get("id") or f"hit-{len(deduped)}", hit)
+    return list(deduped.values())
+
+
+def _fuse_rankings(rankings: List[List[Dict[str, str]]], k: int = RRF_K) -> List[Dict[str, str]]:
+    """Reciprocal rank fusion: each hit scores ``sum(1 / (k + rank))`` over the rankings it appears in."""
+    fused: Dict[str, Dict[str, str]] = {}
+    for ranking in rankings:
+        for rank, hit in enumerate(ranking, start=1):
+            key = hit.get("id") or f"hit-{len(fused)}"
+            if key not in fused:
+                fused[key] = {**hit, "score": 0.0}
+            fused[key]["score"] += 1.0 / (k + rank)
+    return list(fused.values())
 
 
-def _search_qdrant(query_embedding: np.ndarray, top_k: int) -> List[Dict[str, str]]:
-    hits = qdrant_store.search(query_embedding, top_k)
+@lru_cache(maxsize=4096)
+def _clean_label(value: str | None) -> str:
+    # Filenames repeat across hits; sanitize each distinct one once.
+    return _sanitize_output(value or "")
+
+
+def _search_qdrant(
+    query_embedding: np.ndarray, top_k: int, filters: Dict[str, Any] | None = None
+) -> List[Dict[str, str]]:
+    hits = qdrant_store.search(query_embedding, top_k, filters=filters)
     for hit in hits:
         hit.setdefault("backend", "qdrant")
     return hits
 
 
-def _search_local(query_embedding: np.ndarray, top_k: int) -> List[Dict[str, str]]:
-    index, texts = local_db.build_faiss_index()
-    if index.ntotal == 0:
-        return []
-    query_vec = np.array([query_embedding], dtype="float32")
-    distances, indices = index.search(query_vec, top_k)
+def _search_qdrant_batch(
+    query_embeddings: np.ndarray, top_k: int, filters: Dict[str, Any] | None = None
+) -> List[List[Dict[str, str]]]:
+    batches = qdrant_store.search_batch(query_embeddings, top_k, filters=filters)
+    for hits in batches:
+        for hit in hits:
+            hit.setdefault("backend", "qdrant")
+    return batches
+
+
+def _search_local(
+    query_embedding: np.ndarray,
+    top_k: int,
+    nprobe: int | None = None,
+    ef_search: int | None = None,
+    filters: Dict[str, Any] | None = None,
+) -> List[Dict[str, str]]:
+    return _search_local_batch(
+        np.atleast_2d(query_embedding), top_k, nprobe=nprobe, ef_search=ef_search, filters=filters
+    )[0]
+
+
+def _search_local_batch(
+    query_embeddings: np.ndarray,
+    top_k: int,
+    nprobe: int | None = None,
+    ef_search: int | None = None,
+    filters: Dict[str, Any] | None = None,
+) -> List[List[Dict[str, str]]]:
+    """One FAISS search over the whole query matrix and one chunk lookup for every hit."""
+    distances, row_ids = local_index.search(
+        query_embeddings, top_k, nprobe=nprobe, ef_search=ef_search, filters=filters
+    )
+    if not row_ids.size:
+        return [[] for _ in range(len(row_ids))]
+    chunks = local_db.get_chunks_by_ids(np.unique(row_ids[row_ids >= 0]).tolist(), clean=True)
+    batches: List[List[Dict[str, str]]] = []
+    for query_distances, query_row_ids in zip(distances, row_ids):
+        hits: List[Dict[str, str]] = []
+        for distance, row_id in zip(query_distances, query_row_ids):
+            row_id_int = int(row_id)
+            if row_id_int not in chunks:
+                continue
+            filename, text = chunks[row_id_int]
+            score = float(1 / (1 + distance))
+            hits.append({
+                "id": f"local-{row_id_int}",
+                "score": score,
+                "metadata": {"source": "local", "chunk": row_id_int, "filename": _clean_label(filename)},
+                "content": text,
+            })
+        batches.append(hits)
+    return batches
+
+
+def _search_lexical(query: str, top_k: int, filters: Dict[str, Any] | None = None) -> List[Dict[str, str]]:
+    scored = local_db.lexical_search(query, top_k, filters=filters)
+    chunks = local_db.get_chunks_by_ids([row_id for row_id, _ in scored], clean=True)
     hits: List[Dict[str, str]] = []
-    for distance, idx in zip(distances[0], indices[0]):
-        idx_int = int(idx)
-        if idx_int >= len(texts):
+    for row_id, score in scored:
+        if row_id not in chunks:
             continue
-        score = float(1 / (1 + distance))
+        filename, text = chunks[row_id]
         hits.append({
-            "id": f"local-{idx_int}",
+            "id": f"local-{row_id}",
             "score": score,
-            "metadata": {"source": "local", "chunk": idx_int},
-            "content": texts[idx_int],
+            "metadata": {"source": "local", "chunk": row_id, "filename": _clean_label(filename)},
+            "content": text,
         })
     return hits
 
 
-def rag_answer(query: str, top_k: int = 5, target: str = "auto") -> Dict[str, str]:
-    hits = search_vectors(query, top_k=top_k, target=target)
+def rag_answer(
+    query: str,
+    top_k: int = 5,
+    target: str = "auto",
+    nprobe: int | None = None,
+    ef_search: int | None = None,
+    filters: Dict[str, Any] | None = None,
+    quality: str = DEFAULT_QUALITY,
+) -> Dict[str, str]:
+    _check_quality(quality)
+    key = _cache_key("rag", query, top_k, target, nprobe, ef_search, filters, quality=quality)
+    generation = store_generation()
+    cached = query_cache.get(key, generation)
+    if cached is not None:
+        return cached
+    return single_flight.do(
+        key, lambda: _rag_answer(key, generation, query, top_k, target, nprobe, ef_search, filters, quality)
+    )
+
+
+def _rag_answer(
+    key: Hashable,
+    generation: Tuple[int, int],
+    query: str,
+    top_k: int,
+    target: str,
+    nprobe: int | None,
+    ef_search: int | None,
+    filters: Dict[str, Any] | None,
+    quality: str,
+) -> Dict[str, str]:
+    # Rephrasings of an answered question reuse its answer; the embedding is
+    # cached, so the search below does not pay for it twice.
+    query_embedding = local_embedder.embed_query(query)
+    cached = semantic_cache.get(query_embedding, _semantic_scope(key), generation)
+    if cached is not None:
+        return cached
+    report = search_vectors_report(
+        query, top_k=top_k, target=target, nprobe=nprobe, ef_search=ef_search, filters=filters
+    )
+    hits = report["results"]
+    context, prompt = _rag_prompt(query, hits)
+    if not context:
+        return _cache_result(key, generation, {
+            "answer": NO_CONTEXT_ANSWER,
+            "sources": [],
+            "backends": report["backends"],
+            "partial": report["partial"],
+        }, query_embedding)
+    # The extractive tier ranks retrieved sentences, so the question is left out.
+    synthesized, degraded = _summarize_text(context if quality == "fast" else prompt, quality=quality)
+    return _cache_result(key, generation, {
+        "answer": synthesized,
+        "context": context,
+        "sources": hits,
+        "backends": report["backends"],
+        "partial": report["partial"],
+        "degraded": degraded,
+    }, query_embedding)
+
+
+def _rag_prompt(query: str, hits: List[Dict[str, str]]) -> Tuple[str, str]:
+    """Return ``(context, summarizer prompt)``; the context is empty when nothing was retrieved.
+
+    Hit content is already sanitized and stripped, so joining it needs no second pass.
+    """
     context = "\n\n".join(hit.get("content", "") for hit in hits if hit.get("content"))
-    sanitized_context = _sanitize_output(context)
-    sanitized_query = _sanitize_output(query)
-    if not sanitized_context:
-        return {"answer": "No context available yet. Please ingest content first.", "sources": []}
-    synthesized = summarize_text(f"{sanitized_context}\n\nQuestion: {sanitized_query}")
-    return {"answer": synthesized, "context": sanitized_context, "sources": hits}
+    return context, f"{context}\n\nQuestion: {_sanitize_output(query)}"
+
+
+def stream_rag_answer(
+    query: str,
+    top_k: int = 5,
+    target: str = "auto",
+    nprobe: int | None = None,
+    ef_search: int | None = None,
+    filters: Dict[str, Any] | None = None,
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield ``(event, data)`` pairs for a streamed RAG answer.
+
+    ``sources`` is sent as soon as retrieval finishes, followed by ``token``
+    events as the answer is generated and a final ``done`` carrying the whole
+    answer. Cached answers are replayed as a single token. Streamed answers
+    are cached under their own ``stream`` tier, since greedy streaming output
+    differs from the beam-searched answers of ``rag_answer``.
+    """
+    # Streaming decodes greedily; "balanced" uses beam search, so the two never share cache entries.
+    key = _cache_key("rag", query, top_k, target, nprobe, ef_search, filters, quality="stream")
+    generation = store_generation()
+    query_embedding = local_embedder.embed_query(query)
+    cached = query_cache.get(key, generation) or semantic_cache.get(
+        query_embedding, _semantic_scope(key), generation
+    )
+    if cached is not None:
+        yield "sources", {field: cached[field] for field in ("sources", "backends", "partial")}
+        yield "token", {"text": cached["answer"]}
+        yield "done", {"answer": cached["answer"]}
+        return
+    report = search_vectors_report(
+        query, top_k=top_k, target=target, nprobe=nprobe, ef_search=ef_search, filters=filters
+    )
+    hits = report["results"]
+    context, prompt = _rag_prompt(query, hits)
+    yield "sources", {
+        "sources": hits if context else [],
+        "backends": report["backends"],
+        "partial": report["partial"],
+    }
+    if not context:
+        result = {
+            "answer": NO_CONTEXT_ANSWER,
+            "sources": [],
+            "backends": report["backends"],
+            "partial": report["partial"],
+        }
+        yield "token", {"text": NO_CONTEXT_ANSWER}
+    else:
+        pieces = []
+        summary = stream_summary(prompt)
+        while True:
+            try:
+                piece = next(summary)
+            except StopIteration as finished:
+                degraded = bool(finished.value)
+                break
+            pieces.append(piece)
+            yield "token", {"text": piece}
+        result = {
+            "answer": _sanitize_output("".join(pieces)),
+            "context": context,
+            "sources": hits,
+            "backends": report["backends"],
+            "partial": report["partial"],
+            "degraded": degraded,
+        }
+    # An empty answer means generation produced nothing usable; never serve it from the cache.
+    if result["answer"]:
+        _cache_result(key, generation, result, query_embedding)
+    yield "done", {"answer": result["answer"]}
+
+
+def summarize_text(
+    text: str,
+    max_length: int = 160,
+    quality: str = DEFAULT_QUALITY,
+    budget_seconds: float | None = None,
+) -> str:
+    """Summarize ``text`` at one of the ``QUALITY_TIERS``.
+
+    ``fast`` picks the most central sentences by embedding similarity (no
+    generation), ``balanced`` (the default) runs BART once over the first 1024
+    characters, and the opt-in ``best`` covers the whole input with map-reduce,
+    reducing for at most ``budget_seconds`` (default ``SUMMARY_BUDGET_SECONDS``).
+    Without the BART pipeline the generative tiers fall back to the first
+    sentences.
+    """
+    return _summarize_text(text, max_length, quality, budget_seconds)[0]
+
+
+def _summarize_text(
+    text: str,
+    max_length: int = 160,
+    quality: str = DEFAULT_QUALITY,
+    budget_seconds: float | None = None,
+) -> Tuple[str, bool]:
+    """``(summary, degraded)``; ``degraded`` is true when the sentence fallback stood in for BART."""
+    _check_quality(quality)
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    key = ("summarize", digest, max_length, quality, budget_seconds)
+    return single_flight.do(key, lambda: _summarize(text, max_length, quality, budget_seconds))
+
+
+def _check_quality(quality: str) -> None:
+    if quality not in QUALITY_TIERS:
+        raise ValueError(f"Unknown quality {quality!r}; expected one of {', '.join(QUALITY_TIERS)}")
+
+
+def stream_summary(text: str, max_length: int = 160) -> Generator[str, None, bool]:
+    """Yield the summary of ``text`` piece by piece as it is generated.
+
+    With the BART pipeline loaded, pieces come from ``TextIteratorStreamer``
+    while ``generate`` runs on a worker thread; the streamer cannot follow
+    beam search, so streamed summaries decode greedily. A failed ``generate``
+    is re-raised once the pieces produced so far are yielded, and closing the
+    generator stops generation. Without the model the sentence fallback is
+    yielded one sentence at a time, and the generator returns ``True``.
+    """
+    snippet = text.strip()
+    if not snippet:
+        return False
+    with _use_summarizer() as summarizer:
+        if summarizer is None:
+            fallback = _sanitize_output(".".join(snippet.split(".")[:3]).strip())
+            for sentence in re.findall(r"[^.!?]+[.!?]*\s*", fallback):
+                yield sentence
+            return True
+        yield from _stream_generate(summarizer, snippet, max_length)
+    return False
+
+
+def _stream_generate(summarizer: Any, snippet: str, max_length: int) -> Iterator[str]:
+    from transformers import StoppingCriteria, StoppingCriteriaList, TextIteratorStreamer
 
+    class _Cancelled(StoppingCriteria):
+        def __call__(self, input_ids, scores, **kwargs) -> bool:
+            return cancelled.is_set()
 
-def summarize_text(text: str, max_length: int = 160) -> str:
-    summarizer = _load_summarizer()
+    tokenizer = summarizer.tokenizer
+    inputs = tokenizer(snippet[:1024], truncation=True, return_tensors="pt")
+    streamer = TextIteratorStreamer(tokenizer, skip_special_tokens=True, timeout=STREAM_TOKEN_TIMEOUT)
+    # Set when the consumer stops reading (client disconnect), so generate stops early.
+    cancelled = threading.Event()
+    failures: List[Exception] = []
+
+    def generate() -> None:
+        try:
+            summarizer.model.generate(
+                **inputs,
+                streamer=streamer,
+                max_length=max_length,
+                min_length=60,
+                num_beams=1,
+                do_sample=False,
+                stopping_criteria=StoppingCriteriaList([_Cancelled()]),
+            )
+        except Exception as exc:
+            logger.warning("Streamed summarization failed: %s", exc)
+            failures.append(exc)
+            streamer.end()
+
+    worker = threading.Thread(target=generate, name="summary-stream", daemon=True)
+    worker.start()
+    try:
+        for piece in streamer:
+            cleaned = _sanitize_fragment(piece)
+            if cleaned:
+                yield cleaned
+    finally:
+        cancelled.set()
+        # The caller's pin on the model must outlast generate; it stops at the next token.
+        worker.join(STREAM_TOKEN_TIMEOUT)
+    if failures:
+        raise failures[0]
+
+
+def _summarize(
+    text: str, max_length: int, quality: str = DEFAULT_QUALITY, budget_seconds: float | None = None
+) -> Tuple[str, bool]:
     snippet = text.strip()
     if not snippet:
-        return ""
-    if summarizer:
+        return "", False
+    if quality == "fast":
+        return _sanitize_output(extractive.summarize(snippet, local_embedder.embed_texts)), False
+    with _use_summarizer() as summarizer:
+        raw_summary = _generate_summary(summarizer, snippet, max_length, quality, budget_seconds)
+    return _sanitize_output(raw_summary), summarizer is None
+
+
+def _generate_summary(
+    summarizer: Any, snippet: str, max_length: int, quality: str, budget_seconds: float | None
+) -> str:
+    if summarizer and quality == "best":
+        raw_summary = map_reduce.summarize(
+            summarizer,
+            snippet,
+            max_length=max_length,
+            min_length=60,
+            budget_seconds=budget_seconds if budget_seconds is not None else map_reduce.BUDGET_SECONDS,
+        )
+    elif summarizer:
         result = summarizer(snippet[:1024], max_length=max_length, min_length=60, do_sample=False)
         raw_summary = result[0]["summary_text"]
     # Fallback: return first sentences
     else:
         sentences = snippet.split(".")
         raw_summary = ".".join(sentences[:3]).strip()
-    return _sanitize_output(raw_summary)
+    return raw_summary
@@ -0,0 +1,48 @@
+"""Server startup phases, shared by the app's lifespan hook and the startup profiler.
+
+Only the SQLite schema check blocks: the first request needs the tables, and
+once a database is migrated the check takes about a millisecond. Qdrant
+connects and models load on background threads, so a cold worker serves
+requests straight away (``auto`` requests use the local store until Qdrant
+answers, and ``/ready`` reports when the models are loaded).
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import Dict
+
+from backend.local_stack import db as local_db
+from backend.services import executors, ingest_jobs, model_loader
+from backend.utils.file_utils import temp_files
+from backend.vector_store import qdrant_store
+
+logger = logging.getLogger("sahayak.startup")
+
+# Seconds spent in each phase of the last run().
+timings: Dict[str, float] = {}
+
+
+def run(warmup: bool = True) -> Dict[str, float]:
+    timings.clear()
+    _timed("init_db", local_db.init_db)
+    _timed("tmp_sweep", temp_files.sweep)
+    _timed("qdrant_connect_start", qdrant_store.start)
+    _timed("ingest_jobs_start", ingest_jobs.queue.start)
+    if warmup:
+        _timed("model_warmup_start", model_loader.warmup)
+    logger.info("Startup finished in %.1f ms", sum(timings.values()) * 1000)
+    return dict(timings)
+
+
+def shutdown() -> None:
+    ingest_jobs.queue.stop()
+    executors.shutdown()
+    qdrant_store.close()
+
+
+def _timed(name: str, fn) -> None:
+    started = time.perf_counter()
+    fn()
+    timings[name] = time.perf_counter() - started
@@ -0,0 +1,98 @@
+"""Report where API server startup time goes.
+
+Imports ``backend.main`` in a fresh interpreter under ``python -X importtime``
+and breaks the import down by package and by ``backend`` module, then runs
+the startup phases (see ``backend.startup``) and times the first request.
+
+Usage::
+
+    python -m backend.startup_profile [--top 15] [--no-warmup]
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def profile_imports(module: str = "backend.main") -> List[Tuple[str, int, int, int]]:
+    """``[(module, self_us, cumulative_us, depth)]`` for importing ``module`` in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def by_package(rows: List[Tuple[str, int, int, int]]) -> Dict[str, int]:
+    """Self time summed per top-level package, in microseconds."""
+    totals: Dict[str, int] = defaultdict(int)
+    for name, self_us, _cumulative, _depth in rows:
+        totals[name.split(".")[0]] += self_us
+    return dict(totals)
+
+
+def time_startup(warmup: bool) -> Tuple[float, Dict[str, float], float]:
+    """``(import seconds, startup phase seconds, first request seconds)`` in this process."""
+    started = time.perf_counter()
+    from backend.main import app
+    imported = time.perf_counter() - started
+
+    from fastapi.testclient import TestClient
+
+    from backend import startup
+
+    phases = startup.run(warmup=warmup)
+    started = time.perf_counter()
+    TestClient(app).get("/health")
+    first_request = time.perf_counter() - started
+    startup.shutdown()
+    return imported, phases, first_request
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=15, help="rows per table")
+    parser.add_argument("--no-warmup", action="store_true", help="skip the background model warmup")
+    args = parser.parse_args()
+
+    rows = profile_imports()
+    total_us = next((cumulative for name, _self_us, cumulative, _depth in rows if name == "backend.main"), 0)
+    print(f"import backend.main: {total_us / 1000:.0f} ms (fresh interpreter, -X importtime)\n")
+
+    print("Self time by package")
+    for package, self_us in sorted(by_package(rows).items(), key=lambda item: -item[1])[: args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {package}")
+
+    print("\nCumulative time by backend module")
+    backend_rows = [row for row in rows if row[0].startswith("backend.")]
+    for name, _self_us, cumulative_us, _depth in sorted(backend_rows, key=lambda row: -row[2])[: args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    imported, phases, first_request = time_startup(warmup=not args.no_warmup)
+    print("\nStartup (this process)")
+    print(f"  {imported * 1000:8.1f} ms  import backend.main")
+    for phase, seconds in phases.items():
+        print(f"  {seconds * 1000:8.1f} ms  {phase}")
+    print(f"  {first_request * 1000:8.1f} ms  first request (GET /health)")
+    total = imported + sum(phases.values()) + first_request
+    print(f"  {total * 1000:8.1f} ms  total until the first response")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import unittest
+
+from backend.vector_store.circuit_breaker import CircuitBreaker
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=3, clock=lambda: 42.0)
+        self.assertFalse(breaker.record_failure("timeout"))
+        self.assertFalse(breaker.record_failure("timeout"))
+        self.assertTrue(breaker.record_failure("timeout"))
+
+        self.assertTrue(breaker.is_open)
+        self.assertEqual(breaker.status()["opened_at"], 42.0)
+        self.assertEqual(breaker.status()["last_error"], "timeout")
+        self.assertFalse(breaker.record_failure("timeout"))
+        self.assertEqual(breaker.trips, 1)
+
+    def test_success_resets_the_count(self):
+        breaker = CircuitBreaker(failure_threshold=2)
+        breaker.record_failure()
+        breaker.record_success()
+        self.assertFalse(breaker.record_failure())
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_trip_and_recover(self):
+        breaker = CircuitBreaker(failure_threshold=5)
+        self.assertTrue(breaker.trip("connection refused"))
+        self.assertFalse(breaker.trip())
+        self.assertTrue(breaker.is_open)
+
+        breaker.record_success()
+        self.assertEqual(breaker.status()["state"], "closed")
+        self.assertEqual(breaker.status()["consecutive_failures"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import threading
+import unittest
+
+import numpy as np
+
+from backend.local_stack.batcher import EmbeddingBatcher
+
+
+class TestEmbeddingBatcher(unittest.TestCase):
+    def test_concurrent_requests_share_a_batch(self):
+        calls = []
+
+        def encode(texts):
+            calls.append(list(texts))
+            return np.array([[len(text)] for text in texts], dtype=np.float32)
+
+        batcher = EmbeddingBatcher(encode, max_batch_size=8, max_wait_ms=200)
+        texts = ["a" * n for n in range(1, 7)]
+        results = {}
+        start = threading.Barrier(len(texts))
+
+        def worker(text):
+            start.wait()
+            results[text] = batcher.embed(text, timeout=5)
+
+        threads = [threading.Thread(target=worker, args=(text,)) for text in texts]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for text in texts:
+            self.assertEqual(float(results[text][0]), len(text))
+        self.assertLess(len(calls), len(texts))
+        self.assertEqual(batcher.stats()["items"], len(texts))
+
+    def test_respects_max_batch_size(self):
+        calls = []
+
+        def encode(texts):
+            calls.append(len(texts))
+            return np.zeros((len(texts), 1), dtype=np.float32)
+
+        batcher = EmbeddingBatcher(encode, max_batch_size=2, max_wait_ms=50)
+        futures = [batcher.submit(str(i)) for i in range(5)]
+        for future in futures:
+            future.result(timeout=5)
+
+        self.assertTrue(all(size <= 2 for size in calls))
+
+    def test_errors_reach_every_caller(self):
+        def encode(texts):
+            raise RuntimeError("model unavailable")
+
+        batcher = EmbeddingBatcher(encode, max_wait_ms=0)
+        with self.assertRaises(RuntimeError):
+            batcher.embed("query", timeout=5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+from backend.local_stack import embedding_cache
+from backend.local_stack.embedding_cache import EmbeddingCache
+
+
+class TestEmbeddingCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.disk_path = Path(self.tmp_dir.name) / "embedding_cache.db"
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_miss_then_memory_hit(self):
+        cache = EmbeddingCache(memory_entries=4, disk_path=None)
+        self.assertEqual(cache.get_many("model", ["hello"]), [None])
+
+        cache.put_many("model", ["hello"], [np.ones(3)])
+        (vector,) = cache.get_many("model", ["hello"])
+
+        np.testing.assert_array_equal(vector, np.ones(3, dtype=np.float32))
+        self.assertEqual(cache.stats()["memory_hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_keys_include_model_name(self):
+        cache = EmbeddingCache(disk_path=None)
+        cache.put_many("model-a", ["hello"], [np.ones(3)])
+        self.assertEqual(cache.get_many("model-b", ["hello"]), [None])
+
+    def test_memory_tier_evicts_least_recently_used(self):
+        cache = EmbeddingCache(memory_entries=2, disk_path=None)
+        cache.put_many("model", ["a", "b"], [np.zeros(2), np.ones(2)])
+        cache.get_many("model", ["a"])
+        cache.put_many("model", ["c"], [np.full(2, 2.0)])
+
+        a, b, c = cache.get_many("model", ["a", "b", "c"])
+
+        self.assertIsNotNone(a)
+        self.assertIsNone(b)
+        self.assertIsNotNone(c)
+
+    def test_disk_tier_survives_restart(self):
+        first = EmbeddingCache(disk_path=self.disk_path)
+        first.put_many("model", ["persisted"], [np.arange(4)])
+
+        second = EmbeddingCache(disk_path=self.disk_path)
+        (vector,) = second.get_many("model", ["persisted"])
+
+        np.testing.assert_array_equal(vector, np.arange(4, dtype=np.float32))
+        self.assertEqual(second.stats()["disk_hits"], 1)
+        second.get_many("model", ["persisted"])
+        self.assertEqual(second.stats()["memory_hits"], 1)
+
+
+    def test_returned_vectors_can_be_modified_in_place(self):
+        cache = EmbeddingCache(disk_path=self.disk_path)
+        cache.put_many("model", ["hello"], [np.ones(3)])
+        (vector,) = cache.get_many("model", ["hello"])
+        vector /= 2
+
+        (again,) = cache.get_many("model", ["hello"])
+        np.testing.assert_array_equal(again, np.ones(3, dtype=np.float32))
+
+    def test_disk_tier_evicts_least_recently_used(self):
+        with mock.patch.object(embedding_cache, "_TRIM_EVERY", 1):
+            cache = EmbeddingCache(memory_entries=0, disk_path=self.disk_path, disk_entries=2)
+            cache.put_many("model", ["a"], [np.zeros(2)])
+            cache.put_many("model", ["b"], [np.ones(2)])
+            # Reading "a" makes "b" the least recently used entry on disk.
+            cache.get_many("model", ["a"])
+            cache.put_many("model", ["c"], [np.full(2, 2.0)])
+
+            a, b, c = cache.get_many("model", ["a", "b", "c"])
+
+        self.assertIsNotNone(a)
+        self.assertIsNone(b)
+        self.assertIsNotNone(c)
+
+
+if __name__ == "__main__":
+    unittest.main()
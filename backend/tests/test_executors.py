@@ -0,0 +1,95 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest import mock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.ingestion.pdf import _normalize_whitespace
+from backend.routers import ingestion
+from backend.services import executors
+from backend.services.executors import BoundedExecutor
+
+
+class TestBoundedExecutor(unittest.TestCase):
+    def test_event_loop_keeps_running_during_blocking_work(self):
+        pool = BoundedExecutor("test", lambda: ThreadPoolExecutor(max_workers=1), 1)
+        self.addCleanup(pool.shutdown)
+
+        async def scenario():
+            ticks = 0
+
+            async def heartbeat():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+
+            beat = asyncio.create_task(heartbeat())
+            result = await pool.run(time.sleep, 0.3)
+            beat.cancel()
+            return result, ticks
+
+        result, ticks = asyncio.run(scenario())
+        self.assertIsNone(result)
+        self.assertGreater(ticks, 10)
+        self.assertEqual(pool.stats()["completed"], 1)
+        self.assertEqual(pool.stats()["pending"], 0)
+
+    def test_process_pool_runs_picklable_work(self):
+        pool = BoundedExecutor(
+            "test", lambda: ProcessPoolExecutor(max_workers=1), 1
+        )
+        self.addCleanup(pool.shutdown)
+        text = asyncio.run(pool.run(_normalize_whitespace, "a  b\n\n\n\nc"))
+        self.assertEqual(text, "a b\nc")
+
+    def test_failures_are_counted_and_raised(self):
+        pool = BoundedExecutor("test", lambda: ThreadPoolExecutor(max_workers=1), 1)
+        self.addCleanup(pool.shutdown)
+        with self.assertRaises(ZeroDivisionError):
+            asyncio.run(pool.run(divmod, 1, 0))
+        self.assertEqual(pool.stats()["failed"], 1)
+
+
+class TestIngestionRoutes(unittest.TestCase):
+    def setUp(self):
+        app = FastAPI()
+        app.include_router(ingestion.router, prefix="/ingest")
+        self.client = TestClient(app)
+
+    def test_text_ingest_runs_on_the_model_pool(self):
+        threads = []
+
+        def ingest_text(text, metadata=None, target="auto"):
+            threads.append(threading.current_thread().name)
+            return [{"id": "local-1"}]
+
+        with mock.patch.object(ingestion.vector_service, "ingest_text", side_effect=ingest_text):
+            response = self.client.post("/ingest/text", data={"text": "Photosynthesis makes sugar."})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["records"], [{"id": "local-1"}])
+        self.assertTrue(threads[0].startswith("ingest-model"))
+
+    def test_pdf_extraction_goes_to_the_extraction_pool(self):
+        calls = []
+
+        async def run_extraction(fn, *args, **kwargs):
+            calls.append(fn)
+            return "Extracted text."
+
+        with mock.patch.object(executors, "run_extraction", side_effect=run_extraction), \
+                mock.patch.object(ingestion.vector_service, "ingest_text", return_value=[]):
+            response = self.client.post("/ingest/pdf", files={"file": ("a.pdf", b"%PDF-1.4", "application/pdf")})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["text_length"], len("Extracted text."))
+        self.assertEqual(calls, [ingestion.extract_pdf_text])
+
+
+if __name__ == "__main__":
+    unittest.main()
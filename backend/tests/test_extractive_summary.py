@@ -0,0 +1,93 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.processing import extractive
+from backend.routers import summarize
+from backend.services import vector_service
+
+TOPICS = {"plants": [1.0, 0.0, 0.0], "water": [0.9, 0.1, 0.0], "cars": [0.0, 0.0, 1.0]}
+
+
+def embed(sentences):
+    """Topic-word embedding: each sentence points at the topics it mentions, plus a direction of its own."""
+    rows = np.zeros((len(sentences), 3 + len(sentences)), dtype=np.float32)
+    for row, sentence in enumerate(sentences):
+        for word, direction in TOPICS.items():
+            if word in sentence:
+                rows[row, :3] += direction
+        rows[row, 3 + row] = 1.0
+    return rows
+
+
+TEXT = (
+    "Green plants take in water through their roots. "
+    "Cars were parked outside the school today. "
+    "The plants move water up to their leaves. "
+    "Leaves of plants lose water to the air. "
+    "ok. "
+    "Plants need water to make their food."
+)
+
+
+class TestExtractive(unittest.TestCase):
+    def test_split_drops_fragments(self):
+        sentences = extractive.split_sentences(TEXT)
+        self.assertEqual(len(sentences), 5)
+        self.assertNotIn("ok.", sentences)
+
+    def test_off_topic_sentence_is_left_out(self):
+        for method in extractive.METHODS:
+            with self.subTest(method=method):
+                summary = extractive.summarize(TEXT, embed, sentences=2, method=method)
+                self.assertNotIn("Cars", summary)
+                self.assertEqual(len(extractive.split_sentences(summary)), 2)
+
+    def test_picks_keep_document_order_and_skip_duplicates(self):
+        embeddings = np.array([[1, 0], [1, 0], [0.6, 0.8], [0, 1]], dtype=np.float32)
+        scores = np.array([0.9, 0.8, 0.7, 0.1])
+        self.assertEqual(extractive.select(embeddings, scores, 2), [0, 2])
+
+    def test_textrank_scores_form_a_distribution(self):
+        scores = extractive.rank(embed(extractive.split_sentences(TEXT)), "textrank")
+        self.assertAlmostEqual(float(scores.sum()), 1.0, places=4)
+        self.assertEqual(int(np.argmin(scores)), 1)
+
+    def test_short_input_is_returned_whole(self):
+        calls = []
+        summary = extractive.summarize("Plants need water to grow.", lambda s: calls.append(s), sentences=3)
+        self.assertEqual(summary, "Plants need water to grow.")
+        self.assertEqual(calls, [])
+
+    def test_unknown_method_is_rejected(self):
+        with self.assertRaises(ValueError):
+            extractive.rank(np.ones((2, 3)), "lexrank")
+
+
+class TestSummaryQuality(unittest.TestCase):
+    def test_fast_tier_skips_the_generator(self):
+        with mock.patch.object(vector_service.local_embedder, "embed_texts", side_effect=embed), \
+                mock.patch.object(vector_service, "_use_summarizer", side_effect=AssertionError("loaded BART")):
+            summary = vector_service.summarize_text(TEXT, quality="fast")
+        self.assertNotIn("Cars", summary)
+
+    def test_unknown_quality_is_rejected(self):
+        with self.assertRaises(ValueError):
+            vector_service.summarize_text(TEXT, quality="ultra")
+
+    def test_route_and_service_default_to_balanced(self):
+        app = FastAPI()
+        app.include_router(summarize.router, prefix="/summaries")
+        with mock.patch.object(vector_service, "_summarize_text", return_value=("summary", False)) as summarize_text:
+            response = TestClient(app).post("/summaries/text", data={"text": TEXT})
+            vector_service.summarize_text(TEXT)
+        self.assertEqual(response.json(), {"summary": "summary"})
+        self.assertEqual([call.args[2] for call in summarize_text.call_args_list], ["balanced", "balanced"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import asyncio
+import hashlib
+import io
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from fastapi import FastAPI, UploadFile
+from fastapi.testclient import TestClient
+
+from backend.routers import ingestion
+from backend.utils.file_utils import TempFiles, UploadTooLarge, stream_upload, unique_tmp_path
+
+
+class ChunkCountingFile(io.BytesIO):
+    def __init__(self, data):
+        super().__init__(data)
+        self.reads = []
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.reads.append(len(chunk))
+        return chunk
+
+
+class TestStreamUpload(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+
+    def test_streams_in_chunks_and_hashes(self):
+        data = os.urandom(10_000)
+        source = ChunkCountingFile(data)
+        upload = UploadFile(source, filename="clip.mp4")
+        stored = asyncio.run(stream_upload(upload, self.tmp / "out.mp4", chunk_bytes=4096))
+
+        self.assertEqual(stored.path.read_bytes(), data)
+        self.assertEqual(stored.size, len(data))
+        self.assertEqual(stored.sha256, hashlib.sha256(data).hexdigest())
+        self.assertLessEqual(max(source.reads), 4096)
+
+    def test_oversized_upload_stops_early_and_leaves_nothing(self):
+        source = ChunkCountingFile(b"x" * 100_000)
+        upload = UploadFile(source, filename="big.bin")
+        with self.assertRaises(UploadTooLarge):
+            asyncio.run(stream_upload(upload, self.tmp / "big.bin", max_bytes=10_000, chunk_bytes=4096))
+        self.assertFalse((self.tmp / "big.bin").exists())
+        self.assertLess(sum(source.reads), 20_000)
+
+    def test_declared_size_is_checked_before_reading(self):
+        source = ChunkCountingFile(b"x" * 100)
+        upload = UploadFile(source, filename="big.bin", size=50_000)
+        with self.assertRaises(UploadTooLarge):
+            asyncio.run(stream_upload(upload, self.tmp / "big.bin", max_bytes=10_000))
+        self.assertEqual(source.reads, [])
+
+    def test_unique_paths_keep_the_extension(self):
+        first, second = unique_tmp_path("lecture.mp4", self.tmp), unique_tmp_path("lecture.mp4", self.tmp)
+        self.assertNotEqual(first, second)
+        self.assertEqual(first.suffix, ".mp4")
+        self.assertEqual(unique_tmp_path("../../etc/passwd", self.tmp).parent, self.tmp)
+
+
+class TestTempFiles(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        self.now = time.time()
+        self.files = TempFiles(self.tmp, max_age_seconds=3600, sweep_seconds=600, clock=lambda: self.now)
+
+    def _old_file(self, name):
+        path = self.tmp / name
+        path.write_bytes(b"stale")
+        os.utime(path, (self.now - 7200, self.now - 7200))
+        return path
+
+    def test_release_deletes_and_untracks(self):
+        stored = asyncio.run(self.files.receive(UploadFile(io.BytesIO(b"abc"), filename="a.wav")))
+        self.assertTrue(stored.path.exists())
+        self.assertEqual(self.files.stats()["active"], 1)
+        self.files.release(stored.path)
+        self.assertFalse(stored.path.exists())
+        self.assertEqual(self.files.stats()["active"], 0)
+
+    def test_sweep_removes_only_abandoned_files(self):
+        abandoned = self._old_file("abandoned.mp4")
+        held = self.files.path("held.mp4")
+        held.write_bytes(b"in use")
+        os.utime(held, (self.now - 7200, self.now - 7200))
+        fresh = self.tmp / "fresh.mp4"
+        fresh.write_bytes(b"new")
+
+        self.assertEqual(self.files.sweep(), 1)
+        self.assertFalse(abandoned.exists())
+        self.assertTrue(held.exists())
+        self.assertTrue(fresh.exists())
+
+    def test_uploads_trigger_a_sweep_at_most_every_interval(self):
+        self._old_file("one.bin")
+        asyncio.run(self.files.receive(UploadFile(io.BytesIO(b"a"), filename="a.bin")))
+        self.assertEqual(self.files.removed, 1)
+        self._old_file("two.bin")
+        asyncio.run(self.files.receive(UploadFile(io.BytesIO(b"b"), filename="b.bin")))
+        self.assertEqual(self.files.removed, 1)
+        self.now += 601
+        asyncio.run(self.files.receive(UploadFile(io.BytesIO(b"c"), filename="c.bin")))
+        self.assertEqual(self.files.removed, 2)
+
+
+class TestUploadRoutes(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        patcher = mock.patch.object(ingestion, "temp_files", TempFiles(self.tmp))
+        self.files = patcher.start()
+        self.addCleanup(patcher.stop)
+        app = FastAPI()
+        app.include_router(ingestion.router, prefix="/ingest")
+        self.client = TestClient(app)
+
+    def test_audio_upload_is_hashed_and_cleaned_up(self):
+        seen = []
+
+        def transcribe(path):
+            seen.append(Path(path))
+            self.assertTrue(Path(path).exists())
+            return "hello"
+
+        data = b"RIFF fake wav"
+        with mock.patch.object(ingestion, "transcribe_audio", side_effect=transcribe), \
+                mock.patch.object(ingestion.vector_service, "ingest_text", return_value=[]):
+            response = self.client.post("/ingest/audio", files={"file": ("talk.wav", data, "audio/wav")})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["sha256"], hashlib.sha256(data).hexdigest())
+        self.assertEqual(seen[0].parent, self.tmp)
+        self.assertFalse(seen[0].exists())
+        self.assertEqual(list(self.tmp.iterdir()), [])
+
+    def test_oversized_upload_is_413(self):
+        self.files.max_bytes = 10
+        response = self.client.post("/ingest/audio", files={"file": ("talk.wav", b"x" * 100, "audio/wav")})
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(list(self.tmp.iterdir()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
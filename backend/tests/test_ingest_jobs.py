@@ -0,0 +1,201 @@
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.ingestion import pdf
+from backend.routers import ingestion
+from backend.services import executors, ingest_jobs, vector_service
+from backend.services.ingest_jobs import IngestJobQueue
+
+
+def fake_ingest_segments(segments, metadata=None, target="auto"):
+    return [{"backend": "local", "id": str(index)} for index, _ in enumerate(segments)]
+
+
+class TestIngestJobQueue(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        self.queue = self._queue()
+        # Run extraction on threads so the patched extractors are the ones called.
+        patcher = mock.patch.object(executors, "extract_pool", executors.model_pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _upload(self, name):
+        path = self.tmp / name
+        path.write_bytes(b"%PDF")
+        return path
+
+    def _queue(self, **kwargs):
+        return IngestJobQueue(self.tmp / "jobs.db", self.tmp / "files", workers=1, **kwargs)
+
+    def test_pdf_job_runs_every_stage(self):
+        job_id = self.queue.submit("pdf", source="notes.pdf", upload=self._upload("notes.pdf"))
+        self.assertEqual(self.queue.get(job_id)["status"], ingest_jobs.QUEUED)
+        self.assertEqual(self.queue.get(job_id)["stage"], "extract")
+        self.assertTrue((self.tmp / "files" / job_id / "notes.pdf").exists())
+        self.assertFalse((self.tmp / "notes.pdf").exists())
+
+        with mock.patch.object(pdf, "extract_pdf_text", return_value="word " * 1200) as extract, \
+                mock.patch.object(vector_service, "ingest_segments", side_effect=fake_ingest_segments):
+            self.assertTrue(self.queue.run_next())
+        extract.assert_called_once()
+
+        job = self.queue.get(job_id)
+        self.assertEqual(job["status"], ingest_jobs.DONE)
+        self.assertEqual(job["progress"], 1.0)
+        self.assertIsNone(job["stage"])
+        self.assertEqual(job["result"]["chunks"], 3)
+        self.assertEqual(job["result"]["records"], {"local": 3})
+        self.assertFalse((self.tmp / "files" / job_id).exists())
+        self.assertFalse(self.queue.run_next())
+
+    def test_restart_resumes_after_the_last_finished_stage(self):
+        job_id = self.queue.submit("pdf", source="notes.pdf", upload=self._upload("notes.pdf"))
+        self.queue._claim()
+        # Simulate a crash after extraction and the first indexed batch.
+        self.queue._save(
+            job_id,
+            stage_index=1,
+            progress=0.5,
+            artifacts={"text": "word " * 1200, "indexed": 2, "records": {"local": 2}},
+        )
+
+        # The crashed process stopped renewing its lease; here it has expired at once.
+        restarted = self._queue(batch_size=2, lease_seconds=0)
+        self.assertEqual(restarted.recover(), 1)
+        with mock.patch.object(pdf, "extract_pdf_text") as extract, \
+                mock.patch.object(vector_service, "ingest_segments", side_effect=fake_ingest_segments) as ingest:
+            self.assertTrue(restarted.run_next())
+        extract.assert_not_called()
+        self.assertEqual(len(ingest.call_args.args[0]), 1)
+
+        job = restarted.get(job_id)
+        self.assertEqual(job["status"], ingest_jobs.DONE)
+        self.assertEqual(job["attempts"], 2)
+        self.assertEqual(job["result"]["records"], {"local": 3})
+
+    def test_job_interrupted_too_often_is_failed(self):
+        queue = self._queue(max_attempts=1, lease_seconds=0)
+        job_id = queue.submit("text", source="manual", text="some text")
+        queue._claim()
+        self.assertEqual(queue.recover(), 0)
+        job = queue.get(job_id)
+        self.assertEqual(job["status"], ingest_jobs.FAILED)
+        self.assertIn("interrupted", job["error"])
+
+    def test_sibling_processes_never_claim_the_same_job(self):
+        first, second = self._queue(), self._queue()
+        job_id = first.submit("text", source="manual", text="some text")
+
+        self.assertEqual(first._claim()["id"], job_id)
+        self.assertIsNone(second._claim())
+        self.assertEqual(first.get(job_id)["attempts"], 1)
+
+    def test_running_jobs_with_a_live_lease_are_not_recovered(self):
+        owner, sibling = self._queue(), self._queue(lease_seconds=60)
+        job_id = owner.submit("text", source="manual", text="some text")
+        owner._claim()
+
+        # A sibling process starting up must leave the job alone.
+        self.assertEqual(sibling.recover(), 0)
+        self.assertEqual(sibling.get(job_id)["status"], ingest_jobs.RUNNING)
+        self.assertIsNone(sibling._claim())
+
+    def test_owner_stops_after_its_lease_is_taken_over(self):
+        owner = self._queue()
+        job_id = owner.submit("text", source="manual", text="some text")
+        row = owner._claim()
+        successor = self._queue(lease_seconds=0)
+        successor.recover()
+        self.assertEqual(successor._claim()["id"], job_id)
+
+        with mock.patch.object(vector_service, "ingest_segments", side_effect=fake_ingest_segments):
+            owner._run(row)
+        job = successor.get(job_id)
+        self.assertEqual(job["status"], ingest_jobs.RUNNING)
+        self.assertEqual(job["attempts"], 2)
+
+    def test_stage_error_fails_the_job(self):
+        job_id = self.queue.submit("pdf", source="blank.pdf", upload=self._upload("blank.pdf"))
+        with mock.patch.object(pdf, "extract_pdf_text", return_value="  "):
+            self.queue.run_next()
+        job = self.queue.get(job_id)
+        self.assertEqual(job["status"], ingest_jobs.FAILED)
+        self.assertEqual(job["stage"], "extract")
+        self.assertIn("No text extracted", job["error"])
+
+    def test_unknown_kind_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.queue.submit("spreadsheet", source="x.xlsx")
+
+
+class TestIngestJobRoutes(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.queue = IngestJobQueue(Path(tmp.name) / "jobs.db", Path(tmp.name) / "files", workers=1)
+        patcher = mock.patch.object(ingest_jobs, "queue", self.queue)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.queue.stop)
+        app = FastAPI()
+        app.include_router(ingestion.router, prefix="/ingest")
+        self.client = TestClient(app)
+
+    def test_background_upload_returns_job_and_reports_progress(self):
+        response = self.client.post(
+            "/ingest/text", params={"background": "true"}, data={"text": "a short note to index"}
+        )
+        self.assertEqual(response.status_code, 202)
+        body = response.json()
+        self.assertEqual(body["status"], ingest_jobs.QUEUED)
+        self.assertEqual(body["status_url"], f"/ingest/jobs/{body['job_id']}")
+
+        with mock.patch.object(vector_service, "ingest_segments", side_effect=fake_ingest_segments):
+            self.queue.start()
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline:
+                job = self.client.get(body["status_url"]).json()
+                if job["status"] == ingest_jobs.DONE:
+                    break
+                time.sleep(0.02)
+        self.assertEqual(job["status"], ingest_jobs.DONE)
+        self.assertEqual(job["result"], {"text_length": 21, "chunks": 1, "records": {"local": 1}})
+
+    def test_background_file_is_written_into_the_job_directory(self):
+        response = self.client.post(
+            "/ingest/pdf", params={"background": "true"}, files={"file": ("notes.pdf", b"%PDF", "application/pdf")}
+        )
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()["job_id"]
+        self.assertEqual((self.queue.files_dir / job_id / "notes.pdf").read_bytes(), b"%PDF")
+        self.assertEqual(self.queue.get(job_id)["status"], ingest_jobs.QUEUED)
+
+    def test_oversized_background_upload_leaves_no_job_directory(self):
+        with mock.patch.object(ingestion.temp_files, "max_bytes", 2):
+            response = self.client.post(
+                "/ingest/pdf", params={"background": "true"}, files={"file": ("notes.pdf", b"%PDF", "application/pdf")}
+            )
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(list(self.queue.files_dir.iterdir()), [])
+
+    def test_unknown_job_is_404(self):
+        self.assertEqual(self.client.get("/ingest/jobs/missing").status_code, 404)
+
+    def test_job_rows_are_json(self):
+        job_id = self.queue.submit("url", source="https://example.com", url="https://example.com")
+        row = self.queue._connection().execute("SELECT artifacts FROM ingest_jobs WHERE id = ?", (job_id,)).fetchone()
+        self.assertEqual(json.loads(row["artifacts"]), {"url": "https://example.com"})
+
+
+if __name__ == "__main__":
+    unittest.main()
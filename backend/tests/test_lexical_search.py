@@ -0,0 +1,129 @@
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+from backend.local_stack import db as local_db
+from backend.local_stack import lexical
+from backend.local_stack.lexical import tokenize
+from backend.services import vector_service
+
+
+class TestLexicalIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp_dir.name) / "pdf_memory.db"
+        self.db_patch = mock.patch.object(local_db, "DB_PATH", self.db_path)
+        self.db_patch.start()
+        local_db.init_db()
+        self.rng = np.random.default_rng(13)
+
+    def tearDown(self):
+        self.db_patch.stop()
+        self.tmp_dir.cleanup()
+
+    def _add(self, filename, texts, modality=None):
+        vectors = self.rng.random((len(texts), local_db.EMBED_DIM), dtype=np.float32)
+        return local_db.add_chunks(filename, texts, vectors, modality=modality)
+
+    def test_tokenize_keeps_identifiers_and_their_parts(self):
+        self.assertEqual(
+            tokenize("The GROUP_CONCAT() function, in MySQL 8!"),
+            ["group_concat", "group", "concat", "function", "mysql", "8"],
+        )
+
+    def test_exact_terms_rank_first(self):
+        ids = self._add(
+            "MySQL_Master_Notes_Complete.pdf",
+            [
+                "Use GROUP_CONCAT to join values from a group into one string.",
+                "Indexes speed up lookups on large tables.",
+                "A join combines rows from two tables on a related column.",
+            ],
+        )
+        hits = local_db.lexical_search("group_concat", top_k=3)
+        self.assertEqual(hits[0][0], ids[0])
+        self.assertEqual(len(hits), 1)
+        self.assertEqual(local_db.lexical_search("quantum entanglement", top_k=3), [])
+
+    def test_filters_restrict_postings(self):
+        pdf_id, = self._add("notes.pdf", ["primary key constraint"], modality="pdf")
+        audio_id, = self._add("lecture.mp3", ["primary key explained"], modality="audio")
+
+        self.assertEqual([row for row, _ in local_db.lexical_search("primary key", 5, {"modality": "audio"})], [audio_id])
+        self.assertEqual([row for row, _ in local_db.lexical_search("primary key", 5, {"source": ["notes.pdf"]})], [pdf_id])
+
+    def test_existing_rows_are_backfilled(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DROP TABLE lexical_postings")
+        conn.execute("DROP TABLE lexical_docs")
+        conn.execute("DROP TABLE lexical_stats")
+        conn.execute("INSERT INTO pdfs (filename, text_chunk) VALUES ('old.pdf', 'normalization removes redundancy')")
+        conn.commit()
+        conn.close()
+
+        local_db.init_db()
+
+        self.assertEqual(len(local_db.lexical_search("normalization", top_k=5)), 1)
+
+    def test_reindexing_rows_leaves_the_stats_unchanged(self):
+        texts = ["normalization removes redundancy", "a primary key identifies each row"]
+        ids = self._add("notes.pdf", texts)
+        conn = sqlite3.connect(self.db_path)
+        stats = "SELECT documents, total_length FROM lexical_stats WHERE id = 1"
+        before = conn.execute(stats).fetchone()
+
+        lexical.index_rows(conn.cursor(), ids, texts)
+        lexical.index_rows(conn.cursor(), [ids[0], ids[0]], texts[:1] * 2)
+        conn.commit()
+
+        self.assertEqual(conn.execute(stats).fetchone(), before)
+        conn.close()
+
+
+class TestHybridSearch(unittest.TestCase):
+    def setUp(self):
+        patches = [
+            mock.patch.object(vector_service.local_embedder, "embed_query", return_value=np.zeros(4, dtype=np.float32)),
+            mock.patch.object(vector_service, "_use_qdrant", return_value=False),
+            mock.patch.object(vector_service, "store_generation", return_value=(0, 0)),
+            mock.patch.object(vector_service, "_search_local", return_value=[
+                {"id": "local-1", "score": 0.9, "metadata": {}, "content": "semantic match"},
+                {"id": "local-2", "score": 0.8, "metadata": {}, "content": "both match"},
+            ]),
+            mock.patch.object(vector_service, "_search_lexical", return_value=[
+                {"id": "local-2", "score": 7.5, "metadata": {}, "content": "both match"},
+                {"id": "local-3", "score": 3.1, "metadata": {}, "content": "keyword match"},
+            ]),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        vector_service.query_cache.clear()
+
+    def test_hybrid_fuses_by_reciprocal_rank(self):
+        report = vector_service.search_vectors_report("GROUP_CONCAT", top_k=3, target="local", mode="hybrid")
+
+        self.assertEqual([hit["id"] for hit in report["results"]], ["local-2", "local-1", "local-3"])
+        self.assertEqual(report["backends"], {"local": "ok", "lexical": "ok"})
+
+    def test_lexical_and_vector_modes(self):
+        lexical = vector_service.search_vectors_report("GROUP_CONCAT", top_k=3, target="local", mode="lexical")
+        vector = vector_service.search_vectors_report("GROUP_CONCAT", top_k=3, target="local")
+
+        self.assertEqual([hit["id"] for hit in lexical["results"]], ["local-2", "local-3"])
+        self.assertEqual(list(lexical["backends"]), ["lexical"])
+        self.assertEqual([hit["id"] for hit in vector["results"]], ["local-1", "local-2"])
+
+    def test_invalid_modes_are_rejected(self):
+        with self.assertRaises(ValueError):
+            vector_service.search_vectors_report("query", mode="fuzzy")
+        with self.assertRaises(ValueError):
+            vector_service.search_vectors_report("query", target="qdrant", mode="lexical")
+
+
+if __name__ == "__main__":
+    unittest.main()
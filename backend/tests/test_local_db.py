@@ -0,0 +1,89 @@
+import pickle
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+from backend.local_stack import db as local_db
+
+
+class TestLocalEmbeddingStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp_dir.name) / "pdf_memory.db"
+        self.db_patch = mock.patch.object(local_db, "DB_PATH", self.db_path)
+        self.db_patch.start()
+        self.rng = np.random.default_rng(3)
+
+    def tearDown(self):
+        self.db_patch.stop()
+        self.tmp_dir.cleanup()
+
+    def _create_legacy_db(self, vectors):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            "CREATE TABLE pdfs (id INTEGER PRIMARY KEY AUTOINCREMENT, filename TEXT, text_chunk TEXT, embedding BLOB)"
+        )
+        conn.executemany(
+            "INSERT INTO pdfs (filename, text_chunk, embedding) VALUES (?, ?, ?)",
+            [("legacy.pdf", f"chunk {i}", pickle.dumps(vec)) for i, vec in enumerate(vectors)],
+        )
+        conn.commit()
+        conn.close()
+
+    def test_new_rows_are_raw_float32(self):
+        local_db.init_db()
+        vector = self.rng.random(local_db.EMBED_DIM, dtype=np.float32)
+        local_db.add_chunk("doc.pdf", "chunk", vector)
+
+        conn = sqlite3.connect(self.db_path)
+        (blob,) = conn.execute("SELECT embedding FROM pdfs").fetchone()
+        conn.close()
+
+        self.assertEqual(len(blob), local_db.EMBEDDING_BYTES)
+        np.testing.assert_array_equal(np.frombuffer(blob, dtype="<f4"), vector)
+
+    def test_init_db_migrates_pickled_embeddings_in_place(self):
+        vectors = [self.rng.random(local_db.EMBED_DIM, dtype=np.float32) for _ in range(3)]
+        self._create_legacy_db(vectors)
+
+        local_db.init_db()
+        texts, embeddings = local_db.get_all_chunks()
+
+        self.assertEqual(texts, ["chunk 0", "chunk 1", "chunk 2"])
+        np.testing.assert_array_equal(embeddings, np.stack(vectors))
+        self.assertEqual(local_db.migrate_embeddings(self.db_path), 0)
+
+    def test_sanitized_text_is_stored_at_ingest(self):
+        local_db.init_db()
+        vector = self.rng.random(local_db.EMBED_DIM, dtype=np.float32)
+        row_id = local_db.add_chunk("doc.pdf", "  \u201cQuoted\u201d   text \U0001F680 ", vector)
+
+        self.assertEqual(local_db.get_chunks_by_ids([row_id], clean=True)[row_id], ("doc.pdf", '"Quoted" text'))
+        self.assertEqual(local_db.get_chunks_by_ids([row_id])[row_id][1], "  \u201cQuoted\u201d   text \U0001F680 ")
+
+    def test_init_db_backfills_clean_chunks(self):
+        vectors = [self.rng.random(local_db.EMBED_DIM, dtype=np.float32) for _ in range(2)]
+        self._create_legacy_db(vectors)
+
+        local_db.init_db()
+
+        conn = sqlite3.connect(self.db_path)
+        cleaned = [row[0] for row in conn.execute("SELECT clean_chunk FROM pdfs ORDER BY id")]
+        (version,) = conn.execute("PRAGMA user_version").fetchone()
+        conn.close()
+        self.assertEqual(cleaned, ["chunk 0", "chunk 1"])
+        self.assertEqual(version, local_db.SCHEMA_VERSION)
+        self.assertEqual(local_db.migrate(self.db_path), {"embeddings": 0, "clean_chunks": 0})
+
+    def test_decode_handles_unmigrated_rows(self):
+        vector = self.rng.random(local_db.EMBED_DIM, dtype=np.float32)
+        decoded = local_db.decode_embeddings([pickle.dumps(vector), local_db.encode_embedding(vector)])
+        np.testing.assert_array_equal(decoded, np.stack([vector, vector]))
+
+
+if __name__ == "__main__":
+    unittest.main()
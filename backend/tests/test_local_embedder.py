@@ -0,0 +1,63 @@
+import unittest
+from contextlib import nullcontext
+from unittest import mock
+
+import numpy as np
+
+from backend.local_stack import embedder as local_embedder
+from backend.local_stack.embedding_cache import EmbeddingCache
+
+
+class _LengthModel:
+    """Fake SentenceTransformer that embeds a text as ``[len(text)] * dim``."""
+
+    dim = 4
+
+    def __init__(self):
+        self.batches = []
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, show_progress_bar=False):
+        if isinstance(texts, str):
+            return np.full(self.dim, len(texts), dtype=np.float32)
+        self.batches.append(list(texts))
+        return np.array([[len(text)] * self.dim for text in texts], dtype=np.float32)
+
+
+class TestEmbedTexts(unittest.TestCase):
+    def setUp(self):
+        self.model = _LengthModel()
+        self.model_patch = mock.patch.object(local_embedder, "use_model", side_effect=lambda: nullcontext(self.model))
+        self.model_patch.start()
+        self.cache_patch = mock.patch.object(local_embedder, "embedding_cache", EmbeddingCache(disk_path=None))
+        self.cache_patch.start()
+
+    def tearDown(self):
+        self.cache_patch.stop()
+        self.model_patch.stop()
+
+    def test_returns_rows_in_input_order(self):
+        texts = ["bb", "a", "dddd", "ccc"]
+        embeddings = local_embedder.embed_texts(texts)
+
+        self.assertEqual(embeddings.dtype, np.float32)
+        self.assertEqual(embeddings.shape, (4, 4))
+        np.testing.assert_array_equal(embeddings[:, 0], [2, 1, 4, 3])
+
+    def test_encodes_longest_first_in_one_call(self):
+        local_embedder.embed_texts(["bb", "a", "dddd"])
+        self.assertEqual(self.model.batches, [["dddd", "bb", "a"]])
+
+    def test_cached_texts_skip_the_model(self):
+        local_embedder.embed_texts(["bb", "a"])
+        local_embedder.embed_texts(["a", "ccc", "bb", "ccc"])
+        self.assertEqual(self.model.batches, [["bb", "a"], ["ccc"]])
+
+    def test_empty_input(self):
+        self.assertEqual(local_embedder.embed_texts([]).shape, (0, 4))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+from backend.local_stack import db as local_db
+from backend.local_stack import index as local_index
+from backend.local_stack.index import LocalIndex
+
+
+class TestLocalIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_patch = mock.patch.object(local_db, "DB_PATH", Path(self.tmp_dir.name) / "pdf_memory.db")
+        self.db_patch.start()
+        local_db.init_db()
+        self.index = LocalIndex(dim=local_db.EMBED_DIM, poll_interval=0.0)
+        self.rng = np.random.default_rng(7)
+
+    def tearDown(self):
+        self.db_patch.stop()
+        self.tmp_dir.cleanup()
+
+    def _vector(self):
+        return self.rng.random(local_db.EMBED_DIM, dtype=np.float32)
+
+    def _vectors(self, count):
+        return self.rng.random((count, local_db.EMBED_DIM), dtype=np.float32)
+
+    def test_add_chunk_is_searchable_without_reload(self):
+        vectors = [self._vector() for _ in range(3)]
+        row_ids = [self.index.add_chunk("doc.pdf", f"chunk {i}", vec) for i, vec in enumerate(vectors)]
+
+        with mock.patch.object(local_db, "get_rows_after", side_effect=AssertionError("rescanned")):
+            _, hits = self.index.search(vectors[1], top_k=1)
+
+        self.assertEqual(int(hits[0][0]), row_ids[1])
+        self.assertEqual(self.index.ntotal, 3)
+
+    def test_picks_up_rows_from_other_writers(self):
+        self.index.add_chunk("doc.pdf", "first", self._vector())
+        external = self._vector()
+        external_id = local_db.add_chunk("other.pdf", "written elsewhere", external)
+
+        _, hits = self.index.search(external, top_k=1)
+
+        self.assertEqual(int(hits[0][0]), external_id)
+        self.assertEqual(self.index.ntotal, 2)
+
+    def test_generation_tracks_appends(self):
+        start = self.index.generation
+        self.index.add_chunk("doc.pdf", "chunk", self._vector())
+        self.assertGreater(self.index.generation, start)
+
+    def test_promotes_to_ann_index_past_threshold(self):
+        for index_type in ("hnsw", "ivf_flat", "ivf_pq"):
+            with self.subTest(index_type=index_type):
+                local_db.init_db()
+                index = LocalIndex(poll_interval=0.0, index_type=index_type, train_threshold=400)
+                vectors = self.rng.random((400, local_db.EMBED_DIM), dtype=np.float32)
+                row_ids = index.add_chunks("doc.pdf", [f"chunk {i}" for i in range(400)], vectors)
+                index.wait_for_rebuild()
+
+                self.assertEqual(index.status()["active_type"], index_type)
+                _, hits = index.search(vectors[5], top_k=3, nprobe=64, ef_search=128)
+                self.assertIn(row_ids[5], hits[0].tolist())
+
+    def test_build_runs_outside_the_lock_and_keeps_later_appends(self):
+        index = LocalIndex(poll_interval=0.0, index_type="ivf_flat", train_threshold=400)
+        started, release = threading.Event(), threading.Event()
+        build_index = local_index.build_index
+
+        def slow_build(*args, **kwargs):
+            started.set()
+            release.wait(5)
+            return build_index(*args, **kwargs)
+
+        with mock.patch.object(local_index, "build_index", side_effect=slow_build):
+            index.add_chunks("a.pdf", [f"a {i}" for i in range(400)], self._vectors(400))
+            self.assertTrue(started.wait(5))
+            # Searches and appends carry on against the flat index while training runs.
+            late = self._vector()
+            late_id = index.add_chunk("b.pdf", "added during the build", late)
+            _, hits = index.search(late, top_k=1)
+            self.assertEqual(int(hits[0][0]), late_id)
+            self.assertEqual(index.status()["active_type"], "flat")
+            release.set()
+            index.wait_for_rebuild()
+
+        self.assertEqual(index.status()["active_type"], "ivf_flat")
+        self.assertEqual(index.ntotal, 401)
+        _, hits = index.search(late, top_k=1, nprobe=64)
+        self.assertEqual(int(hits[0][0]), late_id)
+
+    def test_ivf_is_retrained_as_the_corpus_grows(self):
+        index = LocalIndex(poll_interval=0.0, index_type="ivf_flat", train_threshold=400, retrain_growth=4)
+        index.add_chunks("a.pdf", [f"a {i}" for i in range(400)], self._vectors(400))
+        index.wait_for_rebuild()
+        first = index.status()
+        self.assertEqual((first["trained_size"], first["nlist"]), (400, local_index.default_nlist(400)))
+
+        index.add_chunks("b.pdf", [f"b {i}" for i in range(1200)], self._vectors(1200))
+        index.wait_for_rebuild()
+        second = index.status()
+        self.assertEqual(second["trained_size"], 1600)
+        self.assertGreater(second["nlist"], first["nlist"])
+        self.assertEqual(index.ntotal, 1600)
+
+    def test_filters_restrict_candidates_before_search(self):
+        shared = self._vector()
+        pdf_id = self.index.add_chunk("notes.pdf", "from the pdf", shared, modality="pdf")
+        audio_id = self.index.add_chunk("lecture.mp3", "from the audio", shared, modality="audio")
+
+        _, by_source = self.index.search(shared, top_k=5, filters={"source": "lecture.mp3"})
+        _, by_modality = self.index.search(shared, top_k=5, filters={"modality": ["pdf"]})
+        _, missing = self.index.search(shared, top_k=5, filters={"source": "unknown.pdf"})
+        _, future = self.index.search(shared, top_k=5, filters={"created_after": 4102444800})
+
+        self.assertEqual(by_source[0].tolist(), [audio_id])
+        self.assertEqual(by_modality[0].tolist(), [pdf_id])
+        self.assertEqual(missing.shape, (1, 0))
+        self.assertEqual(future.shape, (1, 0))
+
+    def test_filters_apply_to_ann_indexes(self):
+        index = LocalIndex(poll_interval=0.0, index_type="hnsw", train_threshold=50)
+        vectors = self.rng.random((60, local_db.EMBED_DIM), dtype=np.float32)
+        index.add_chunks("a.pdf", [f"a {i}" for i in range(30)], vectors[:30])
+        b_ids = index.add_chunks("b.pdf", [f"b {i}" for i in range(30)], vectors[30:])
+        index.wait_for_rebuild()
+
+        _, hits = index.search(vectors[0], top_k=5, filters={"source": "b.pdf"})
+
+        self.assertEqual(index.status()["active_type"], "hnsw")
+        self.assertTrue(set(hits[0].tolist()) <= set(b_ids))
+
+    def test_rejects_unknown_index_type(self):
+        with self.assertRaises(ValueError):
+            LocalIndex(index_type="annoy")
+
+    def test_empty_store_returns_no_hits(self):
+        distances, hits = self.index.search(self._vector(), top_k=5)
+        self.assertEqual(hits.shape, (1, 0))
+        self.assertEqual(distances.shape, (1, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+
+from backend.processing import map_reduce
+
+
+class WordTokenizer:
+    """Whitespace tokenizer standing in for the BART tokenizer."""
+
+    model_max_length = 1024
+
+    def __call__(self, text, add_special_tokens=True):
+        return {"input_ids": text.split()}
+
+    def decode(self, token_ids, skip_special_tokens=True):
+        return " ".join(token_ids)
+
+
+class FakeSummarizer:
+    """Pipeline stand-in: 'summarizes' each input to its first ``keep`` words and records calls."""
+
+    def __init__(self, keep=3):
+        self.tokenizer = WordTokenizer()
+        self.keep = keep
+        self.calls = []
+
+    def __call__(self, texts, **kwargs):
+        self.calls.append((list(texts), kwargs))
+        return [{"summary_text": " ".join(text.split()[: self.keep])} for text in texts]
+
+
+class TestMapReduceSummarize(unittest.TestCase):
+    def test_short_input_is_one_call(self):
+        summarizer = FakeSummarizer()
+        summary = map_reduce.summarize(summarizer, "one two three four five", chunk_tokens=10)
+        self.assertEqual(summary, "one two three")
+        self.assertEqual(len(summarizer.calls), 1)
+
+    def test_map_covers_every_window_in_one_batched_call(self):
+        summarizer = FakeSummarizer(keep=1)
+        words = [f"w{i}" for i in range(40)]
+        map_reduce.summarize(summarizer, " ".join(words), chunk_tokens=10, batch_size=4, budget_seconds=None)
+        mapped, kwargs = summarizer.calls[0]
+        self.assertEqual(len(mapped), 4)
+        self.assertEqual(" ".join(mapped).split(), words)
+        self.assertEqual(kwargs["batch_size"], 4)
+        self.assertTrue(kwargs["truncation"])
+
+    def test_reduces_until_one_window(self):
+        summarizer = FakeSummarizer(keep=2)
+        text = " ".join(f"w{i}" for i in range(100))
+        summary = map_reduce.summarize(summarizer, text, chunk_tokens=10, budget_seconds=None)
+        # 10 windows -> 20 words -> 2 windows -> 4 words -> final single call.
+        self.assertEqual([len(texts) for texts, _ in summarizer.calls], [10, 2, 1])
+        self.assertEqual(summary, "w0 w1")
+
+    def test_spent_budget_returns_partials(self):
+        summarizer = FakeSummarizer(keep=2)
+        ticks = iter([0.0, 5.0])
+        text = " ".join(f"w{i}" for i in range(100))
+        summary = map_reduce.summarize(
+            summarizer, text, chunk_tokens=10, budget_seconds=1.0, clock=lambda: next(ticks)
+        )
+        self.assertEqual(len(summarizer.calls), 1)
+        self.assertEqual(len(summary.split("\n")), 10)
+
+    def test_stops_when_summaries_do_not_shrink(self):
+        summarizer = FakeSummarizer(keep=50)
+        text = " ".join(f"w{i}" for i in range(30))
+        summary = map_reduce.summarize(summarizer, text, chunk_tokens=10, budget_seconds=None)
+        self.assertEqual(len(summarizer.calls), 1)
+        self.assertEqual(summary.split(), text.split())
+
+    def test_window_respects_model_limit(self):
+        tokenizer = WordTokenizer()
+        self.assertEqual(map_reduce.window_tokens(tokenizer, 0), 1022)
+        self.assertEqual(map_reduce.window_tokens(tokenizer, 5000), 1022)
+        self.assertEqual(map_reduce.window_tokens(tokenizer, 256), 256)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,203 @@
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import torch
+
+from backend.ingestion import audio
+from backend.local_stack import embedder as local_embedder
+from backend.services import model_loader
+from backend.services.model_loader import ModelLoader, ModelRegistry, ModelUnavailable
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestModelLoader(unittest.TestCase):
+    def test_concurrent_callers_share_one_load(self):
+        calls = []
+
+        def load():
+            calls.append(1)
+            time.sleep(0.1)
+            return "model"
+
+        loader = ModelLoader("slow", load)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(loader.get())) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, ["model"] * 4)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(loader.status()["state"], model_loader.READY)
+
+    def test_failures_back_off_exponentially(self):
+        clock = FakeClock()
+        attempts = []
+
+        def load():
+            attempts.append(clock.now)
+            raise OSError("no network")
+
+        loader = ModelLoader("broken", load, retry_seconds=10, max_retry_seconds=15, clock=clock)
+        with self.assertRaises(OSError):
+            loader.get()
+        for now in (0, 5, 9.9):
+            clock.now = now
+            with self.assertRaises(ModelUnavailable):
+                loader.get()
+        self.assertEqual(len(attempts), 1)
+        self.assertEqual(loader.status()["error"], "no network")
+
+        clock.now = 10
+        with self.assertRaises(OSError):
+            loader.get()
+        clock.now = 24  # second delay is capped at 15s
+        with self.assertRaises(ModelUnavailable):
+            loader.get()
+        clock.now = 25
+        with self.assertRaises(OSError):
+            loader.get()
+        self.assertEqual(attempts, [0, 10, 25])
+
+    def test_recovers_after_a_failure(self):
+        clock = FakeClock()
+        outcomes = iter([OSError("down"), "model"])
+
+        def load():
+            outcome = next(outcomes)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        loader = ModelLoader("flaky", load, retry_seconds=1, clock=clock)
+        with self.assertRaises(OSError):
+            loader.get()
+        clock.now = 1
+        self.assertEqual(loader.get(), "model")
+        self.assertNotIn("error", loader.status())
+
+
+class TestModelRegistry(unittest.TestCase):
+    def test_same_key_shares_one_loader(self):
+        registry = ModelRegistry()
+        first = registry.register("embedder", lambda: "a", model="MiniLM", variant="st")
+        second = registry.register("rag-embedder", lambda: "b", model="MiniLM", variant="st")
+        other_device = registry.register("gpu-embedder", lambda: "c", model="MiniLM", variant="st", device="cuda")
+
+        self.assertIs(first, second)
+        self.assertEqual(second.get(), "a")
+        self.assertIsNot(first, other_device)
+        self.assertEqual(set(registry.status()), {"embedder", "rag-embedder", "gpu-embedder"})
+
+    def test_idle_models_are_evicted_least_recently_used_first(self):
+        mib = 2**20
+        registry = ModelRegistry(budget_bytes=int(2.5 * mib))
+        loaders = {
+            name: registry.register(name, lambda: torch.nn.Linear(512, 512, bias=False))  # 1 MiB of float32
+            for name in ("a", "b", "c")
+        }
+        loaders["a"].get()
+        loaders["b"].get()
+        loaders["a"].get()  # b is now the least recently used
+        loaders["c"].get()
+
+        self.assertEqual(
+            [name for name, loader in loaders.items() if loader.is_ready], ["a", "c"]
+        )
+        self.assertEqual(registry.memory()["evictions"], 1)
+        self.assertEqual(registry.memory()["resident_mb"], 2.0)
+        loaders["b"].get()  # reloads on demand
+        self.assertEqual(loaders["b"].loads, 2)
+
+    def test_pinned_models_are_not_evicted(self):
+        registry = ModelRegistry(budget_bytes=2**20)
+        first = registry.register("first", lambda: torch.nn.Linear(512, 512, bias=False))
+        second = registry.register("second", lambda: torch.nn.Linear(512, 512, bias=False))
+        with first.use():
+            second.get()
+            self.assertTrue(first.is_ready)
+            self.assertEqual(first.status()["refs"], 1)
+            self.assertFalse(first.unload())
+        self.assertTrue(first.unload())
+
+    def test_failed_acquire_does_not_leave_a_pin(self):
+        loader = ModelLoader("broken", mock.Mock(side_effect=OSError("missing")))
+        with self.assertRaises(OSError):
+            loader.acquire()
+        self.assertEqual(loader.refs, 0)
+
+    def test_embedder_is_pinned_while_encoding(self):
+        registry = ModelRegistry()
+        loader = registry.register("test-embedder", lambda: model)
+        model = mock.Mock()
+        model.encode.side_effect = lambda texts, **kwargs: (
+            self.assertFalse(loader.unload()) or np.ones((len(texts), 4), dtype="float32")
+        )
+        with mock.patch.object(local_embedder, "_loader", loader), \
+                mock.patch.object(local_embedder.embedding_cache, "get_many", side_effect=lambda m, t: [None] * len(t)), \
+                mock.patch.object(local_embedder.embedding_cache, "put_many"):
+            local_embedder.embed_texts(["a", "b"])
+        self.assertEqual(loader.refs, 0)
+        self.assertTrue(loader.unload())
+
+    def test_whisper_loads_the_requested_size(self):
+        loaded = []
+
+        def load_model(size):
+            loaded.append(size)
+            return mock.Mock(transcribe=mock.Mock(return_value={"text": f" {size} "}))
+
+        with tempfile.TemporaryDirectory() as tmp, mock.patch("whisper.load_model", load_model):
+            clip = Path(tmp) / "clip.wav"
+            clip.write_bytes(b"")
+            self.assertEqual(audio.transcribe_audio(clip, model_size="test-tiny"), "test-tiny")
+            self.assertEqual(audio.transcribe_audio(clip, model_size="test-small"), "test-small")
+            self.assertEqual(audio.transcribe_audio(clip, model_size="test-tiny"), "test-tiny")
+        self.assertEqual(loaded, ["test-tiny", "test-small"])
+
+
+class TestWarmup(unittest.TestCase):
+    def test_readiness_waits_for_warmup_models(self):
+        release = threading.Event()
+        model_loader.register("test-warm", lambda: release.wait(5) and "model")
+        model_loader.register("test-broken", lambda: (_ for _ in ()).throw(OSError("missing")))
+
+        thread = model_loader.warmup(["test-warm", "test-broken", "test-unknown"])
+        self.assertFalse(model_loader.readiness()["ready"])
+        release.set()
+        thread.join(5)
+
+        readiness = model_loader.readiness()
+        self.assertFalse(readiness["ready"])
+        self.assertEqual(readiness["waiting"], ["test-broken", "test-unknown"])
+        self.assertEqual(readiness["models"]["test-warm"]["state"], model_loader.READY)
+        self.assertEqual(readiness["models"]["test-broken"]["state"], model_loader.FAILED)
+
+        model_loader.warmup(["test-warm"]).join(5)
+        self.assertTrue(model_loader.readiness()["ready"])
+
+    def test_evicted_warmup_model_stays_ready(self):
+        loader = model_loader.register("test-evictable", lambda: "model")
+        model_loader.warmup(["test-evictable"]).join(5)
+        self.assertTrue(loader.unload())
+
+        readiness = model_loader.readiness()
+        self.assertTrue(readiness["ready"])
+        self.assertEqual(readiness["models"]["test-evictable"]["state"], model_loader.EVICTED)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import PointStruct
+
+from backend.vector_store.qdrant_store import QdrantStore
+
+
+class TestQdrantStore(unittest.TestCase):
+    def setUp(self):
+        self.client = QdrantClient(":memory:")
+        self.store = QdrantStore(client=self.client)
+        self.rng = np.random.default_rng(11)
+
+    def _vector(self):
+        return self.rng.random(self.store.vector_dim, dtype=np.float32)
+
+    def test_creates_payload_indexes(self):
+        client = mock.Mock(wraps=QdrantClient(":memory:"))
+        QdrantStore(client=client)
+        indexed = {call.kwargs["field_name"] for call in client.create_payload_index.call_args_list}
+        self.assertEqual(indexed, {"source", "modality", "created_at"})
+
+    def test_probe_never_drops_an_existing_collection(self):
+        client = mock.Mock(wraps=QdrantClient(":memory:"))
+        store = QdrantStore(client=client)
+        store.upsert_text("kept", {"source": "notes.pdf"}, self._vector())
+        client.get_collection.side_effect = TimeoutError("qdrant flapping")
+
+        self.assertFalse(store._probe())
+        client.get_collection.side_effect = None
+        self.assertEqual(client.count(store.collection_name).count, 1)
+        self.assertEqual(client.create_collection.call_count, 1)
+        client.recreate_collection.assert_not_called()
+
+    def test_filters_are_pushed_down(self):
+        shared = self._vector()
+        self.store.upsert_text("pdf text", {"source": "notes.pdf", "modality": "pdf", "created_at": 100.0}, shared)
+        self.store.upsert_text("audio text", {"source": "talk.mp3", "modality": "audio", "created_at": 200.0}, shared)
+
+        by_modality = self.store.search(shared, top_k=5, filters={"modality": "audio"})
+        by_sources = self.store.search(shared, top_k=5, filters={"source": ["notes.pdf", "other.pdf"]})
+        by_date = self.store.search(shared, top_k=5, filters={"created_after": 150.0})
+
+        self.assertEqual([hit["content"] for hit in by_modality], ["audio text"])
+        self.assertEqual([hit["content"] for hit in by_sources], ["pdf text"])
+        self.assertEqual([hit["content"] for hit in by_date], ["audio text"])
+        self.assertEqual(len(self.store.search(shared, top_k=5)), 2)
+
+    def test_search_batch_returns_hits_per_query(self):
+        vectors = self.rng.random((3, self.store.vector_dim), dtype=np.float32)
+        self.store.upsert_many(["zero", "one", "two"], {"source": "doc.pdf"}, vectors)
+
+        batches = self.store.search_batch(vectors[[2, 0]], top_k=1)
+
+        self.assertEqual([[hit["content"] for hit in hits] for hits in batches], [["two"], ["zero"]])
+        self.assertEqual(self.store.search_batch(np.zeros((0, self.store.vector_dim)), top_k=1), [])
+
+    def test_upsert_many_sends_batches(self):
+        client = mock.Mock(wraps=QdrantClient(":memory:"))
+        store = QdrantStore(client=client)
+        vectors = self.rng.random((5, store.vector_dim), dtype=np.float32)
+
+        records = store.upsert_many([f"chunk {i}" for i in range(5)], {"source": "doc.pdf"}, vectors, batch_size=2)
+
+        self.assertEqual(client.upsert.call_count, 3)
+        self.assertEqual(client.count(store.collection_name).count, 5)
+        self.assertEqual([record["content"] for record in records], [f"chunk {i}" for i in range(5)])
+        self.assertEqual(len({record["id"] for record in records}), 5)
+
+    def test_upsert_many_parallel_without_wait(self):
+        vectors = self.rng.random((7, self.store.vector_dim), dtype=np.float32)
+        self.store.upsert_many([str(i) for i in range(7)], {}, vectors, batch_size=3, wait=False, parallel=3)
+        self.assertEqual(self.client.count(self.store.collection_name).count, 7)
+
+    def test_breaker_fails_fast_and_recovers(self):
+        client = mock.Mock(wraps=QdrantClient(":memory:"))
+        store = QdrantStore(client=client, failure_threshold=2, probe_interval=0.05)
+        self.addCleanup(store.close)
+        client.query_points.side_effect = ConnectionError("qdrant down")
+        client.get_collections.side_effect = ConnectionError("qdrant down")
+
+        for _ in range(2):
+            with self.assertRaises(ConnectionError):
+                store.search(self._vector(), top_k=1)
+        self.assertFalse(store.is_available)
+        self.assertEqual(store.status()["breaker"]["state"], "open")
+        with self.assertRaisesRegex(RuntimeError, "not available"):
+            store.search(self._vector(), top_k=1)
+        self.assertEqual(client.query_points.call_count, 2)
+
+        client.query_points.side_effect = None
+        client.get_collections.side_effect = None
+        deadline = time.monotonic() + 2.0
+        while not store.is_available and time.monotonic() < deadline:
+            time.sleep(0.02)
+        self.assertTrue(store.is_available)
+        self.assertEqual(store.search(self._vector(), top_k=1), [])
+
+    def test_hits_are_served_from_sanitized_payload(self):
+        vector = self._vector()
+        self.store.upsert_text("  \u201cSmart\u201d   quotes \U0001F600", {"source": "caf\u00e9.pdf"}, vector)
+
+        with mock.patch("backend.vector_store.qdrant_store.sanitize_fields", side_effect=AssertionError("per hit")):
+            hit = self.store.search(vector, top_k=1)[0]
+
+        self.assertEqual(hit["content"], '"Smart" quotes')
+        self.assertEqual(hit["metadata"]["source"], "caf.pdf")
+        self.assertNotIn("_clean", hit["metadata"])
+
+    def test_legacy_points_are_backfilled(self):
+        vector = self._vector()
+        self.client.upsert(
+            self.store.collection_name,
+            points=[PointStruct(id=1, vector=vector.tolist(), payload={"content": "old \u2013 point  "})],
+        )
+
+        self.assertEqual(self.store.search(vector, top_k=1)[0]["content"], "old - point")
+        self.assertEqual(self.store.backfill_clean_payloads(), 1)
+        self.assertEqual(self.store.backfill_clean_payloads(), 0)
+        payload = self.client.retrieve(self.store.collection_name, [1])[0].payload
+        self.assertEqual(payload["_clean"]["content"], "old - point")
+
+    def test_build_filter_without_conditions(self):
+        self.assertIsNone(QdrantStore.build_filter(None))
+        self.assertIsNone(QdrantStore.build_filter({"unrelated": "x"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import json
+import threading
+import unittest
+from contextlib import nullcontext
+from unittest import mock
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.routers import search
+from backend.services import vector_service
+
+
+class FakeTokenizer:
+    def __call__(self, text, **kwargs):
+        return {}
+
+
+class FakeSummarizer:
+    def __init__(self, generate):
+        self.tokenizer = FakeTokenizer()
+        self.model = mock.Mock(generate=generate)
+
+
+class TestStreamingRag(unittest.TestCase):
+    def setUp(self):
+        report = {
+            "results": [{"id": "local-1", "score": 0.9, "metadata": {}, "content": "Osmosis moves water. It needs a membrane. It is passive. Extra."}],
+            "backends": {"local": "ok"},
+            "partial": False,
+        }
+        patches = [
+            mock.patch.object(vector_service.local_embedder, "embed_query", return_value=np.ones(4, dtype=np.float32)),
+            mock.patch.object(vector_service, "store_generation", return_value=(0, 0)),
+            mock.patch.object(vector_service, "search_vectors_report", return_value=report),
+            mock.patch.object(vector_service, "_use_summarizer", return_value=nullcontext(None)),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        vector_service.query_cache.clear()
+        vector_service.semantic_cache.clear()
+
+    def test_sources_arrive_before_tokens(self):
+        events = list(vector_service.stream_rag_answer("What is osmosis?"))
+        names = [name for name, _ in events]
+
+        self.assertEqual(names[0], "sources")
+        self.assertEqual(names[-1], "done")
+        self.assertGreater(names.count("token"), 1)
+        streamed = "".join(data["text"] for name, data in events if name == "token")
+        self.assertEqual(vector_service._sanitize_output(streamed), events[-1][1]["answer"])
+        self.assertEqual(events[0][1]["sources"][0]["id"], "local-1")
+
+    def test_streamed_answers_are_cached_apart_from_beam_searched_ones(self):
+        def generate(streamer, **kwargs):
+            for piece in ("Water crosses ", "a membrane by osmosis."):
+                streamer.on_finalized_text(piece)
+            streamer.end()
+
+        self._with_summarizer(generate)
+        streamed = list(vector_service.stream_rag_answer("What is osmosis?"))[-1][1]["answer"]
+        self.assertEqual(streamed, "Water crosses a membrane by osmosis.")
+        with mock.patch.object(vector_service, "stream_summary", side_effect=AssertionError("recomputed")):
+            replayed = list(vector_service.stream_rag_answer("What is osmosis?"))
+        self.assertEqual(replayed[-1], ("done", {"answer": streamed}))
+
+        # quality=balanced decodes with beam search, so it must not reuse the greedy answer.
+        with mock.patch.object(
+            vector_service, "_summarize_text", return_value=("Osmosis moves water.", False)
+        ) as summarize:
+            self.assertEqual(vector_service.rag_answer("What is osmosis?")["answer"], "Osmosis moves water.")
+        summarize.assert_called_once()
+
+    def test_fallback_answers_are_not_cached(self):
+        answer = vector_service.rag_answer("What is osmosis?")
+        self.assertTrue(answer["degraded"])
+        events = list(vector_service.stream_rag_answer("What is osmosis?"))
+        self.assertEqual(events[-1][0], "done")
+
+        self.assertEqual(vector_service.query_cache.stats()["entries"], 0)
+        self.assertEqual(vector_service.semantic_cache.stats()["entries"], 0)
+
+    def test_endpoint_emits_server_sent_events(self):
+        app = FastAPI()
+        app.include_router(search.router, prefix="/search")
+        response = TestClient(app).post("/search/rag/stream", data={"query": "What is osmosis?"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+        blocks = [block for block in response.text.split("\n\n") if block]
+        self.assertTrue(blocks[0].startswith("event: sources\n"))
+        self.assertTrue(blocks[-1].startswith("event: done\n"))
+        self.assertIn("answer", json.loads(blocks[-1].split("data: ", 1)[1]))
+
+    def _with_summarizer(self, generate):
+        patcher = mock.patch.object(vector_service, "_use_summarizer", return_value=nullcontext(FakeSummarizer(generate)))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_failed_generation_is_reported_and_not_cached(self):
+        def generate(streamer, **kwargs):
+            raise RuntimeError("CUDA out of memory")
+
+        self._with_summarizer(generate)
+        with self.assertRaisesRegex(RuntimeError, "out of memory"):
+            list(vector_service.stream_rag_answer("What is osmosis?"))
+        self.assertEqual(vector_service.query_cache.stats()["entries"], 0)
+        self.assertEqual(vector_service.semantic_cache.stats()["entries"], 0)
+
+    def test_closing_the_stream_stops_generation(self):
+        stopped = threading.Event()
+
+        def generate(streamer, stopping_criteria, **kwargs):
+            streamer.on_finalized_text("Osmosis moves water. ")
+            for _ in range(500):
+                if stopping_criteria[0](None, None):
+                    stopped.set()
+                    break
+                threading.Event().wait(0.01)
+            streamer.end()
+
+        self._with_summarizer(generate)
+        events = vector_service.stream_rag_answer("What is osmosis?")
+        self.assertEqual(next(events)[0], "sources")
+        self.assertEqual(next(events)[0], "token")
+        events.close()
+        self.assertTrue(stopped.wait(2))
+        self.assertEqual(vector_service.query_cache.stats()["entries"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from backend.services import vector_service
+from backend.services.result_cache import ResultCache, SemanticCache, freeze_filters, normalize_query
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.cache = ResultCache(max_entries=2, ttl_seconds=10, clock=lambda: self.now)
+
+    def test_generation_change_invalidates(self):
+        self.cache.put("q", 1, {"answer": "a"})
+        self.assertEqual(self.cache.get("q", 1), {"answer": "a"})
+        self.assertIsNone(self.cache.get("q", 2))
+        self.assertEqual(self.cache.stats()["invalidations"], 1)
+
+    def test_entries_expire(self):
+        self.cache.put("q", 1, "value")
+        self.now = 10.0
+        self.assertIsNone(self.cache.get("q", 1))
+
+    def test_least_recently_used_is_evicted(self):
+        self.cache.put("a", 1, "A")
+        self.cache.put("b", 1, "B")
+        self.cache.get("a", 1)
+        self.cache.put("c", 1, "C")
+        self.assertIsNone(self.cache.get("b", 1))
+        self.assertEqual(self.cache.get("a", 1), "A")
+
+    def test_callers_cannot_mutate_cached_values(self):
+        stored = {"answer": "a", "sources": [{"id": "1"}]}
+        self.cache.put("q", 1, stored)
+        stored["sources"].clear()
+        self.cache.get("q", 1)["sources"][0]["id"] = "changed"
+        self.assertEqual(self.cache.get("q", 1), {"answer": "a", "sources": [{"id": "1"}]})
+
+    def test_older_generation_neither_evicts_nor_overwrites(self):
+        self.cache.put("q", (1, 0), "new")
+        self.assertIsNone(self.cache.get("q", (0, 0)))
+        self.cache.put("q", (0, 0), "stale")
+        self.assertEqual(self.cache.get("q", (1, 0)), "new")
+
+    def test_key_normalization(self):
+        self.assertEqual(normalize_query("  What is   Photosynthesis? "), "what is photosynthesis?")
+        self.assertEqual(
+            freeze_filters({"source": ["b.pdf", "a.pdf"], "modality": "pdf"}),
+            freeze_filters({"modality": "pdf", "source": ["a.pdf", "b.pdf"]}),
+        )
+
+
+class TestSemanticCache(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(5)
+        self.cache = SemanticCache(max_entries=3, threshold=0.9)
+
+    def _vector(self):
+        return self.rng.standard_normal(32).astype(np.float32)
+
+    def test_near_duplicate_hits_and_distant_query_misses(self):
+        asked = self._vector()
+        self.cache.put(asked, "scope", 1, "answer")
+
+        self.assertEqual(self.cache.get(asked + 0.01 * self._vector(), "scope", 1), "answer")
+        self.assertIsNone(self.cache.get(self._vector(), "scope", 1))
+
+    def test_scope_and_generation_must_match(self):
+        asked = self._vector()
+        self.cache.put(asked, "top_k=5", 1, "answer")
+
+        self.assertIsNone(self.cache.get(asked, "top_k=3", 1))
+        self.assertIsNone(self.cache.get(asked, "top_k=5", 2))
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    def test_callers_cannot_mutate_cached_values(self):
+        asked = self._vector()
+        self.cache.put(asked, "scope", 1, {"sources": [{"id": "1"}]})
+        self.cache.get(asked, "scope", 1)["sources"].append({"id": "injected"})
+        self.assertEqual(self.cache.get(asked, "scope", 1), {"sources": [{"id": "1"}]})
+
+    def test_requests_from_an_older_generation_keep_newer_entries(self):
+        asked = self._vector()
+        self.cache.put(asked, "scope", (1, 0), "new answer")
+
+        # A request that read the stores before the ingest finished.
+        self.assertIsNone(self.cache.get(asked, "scope", (0, 0)))
+        self.cache.put(self._vector(), "scope", (0, 0), "stale answer")
+
+        self.assertEqual(self.cache.get(asked, "scope", (1, 0)), "new answer")
+        self.assertEqual(self.cache.stats()["entries"], 1)
+        self.assertEqual(self.cache.stats()["invalidations"], 0)
+        self.assertIsNone(self.cache.get(asked, "scope", (1, 1)))
+
+    def test_least_recently_used_is_replaced(self):
+        vectors = [self._vector() for _ in range(4)]
+        for position, vector in enumerate(vectors[:3]):
+            self.cache.put(vector, "scope", 1, position)
+        self.cache.get(vectors[0], "scope", 1)
+        self.cache.put(vectors[3], "scope", 1, 3)
+
+        self.assertIsNone(self.cache.get(vectors[1], "scope", 1))
+        self.assertEqual(self.cache.get(vectors[0], "scope", 1), 0)
+        self.assertEqual(self.cache.get(vectors[3], "scope", 1), 3)
+
+
+class TestCachedRagAnswer(unittest.TestCase):
+    def setUp(self):
+        self.generation = [0, 0]
+        patches = [
+            mock.patch.object(vector_service.local_embedder, "embed_query", return_value=np.zeros(4, dtype=np.float32)),
+            mock.patch.object(vector_service, "_use_qdrant", return_value=False),
+            mock.patch.object(vector_service, "_use_local", return_value=True),
+            mock.patch.object(vector_service, "store_generation", side_effect=lambda: tuple(self.generation)),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.search = mock.patch.object(
+            vector_service,
+            "_search_local",
+            return_value=[{"id": "local-1", "score": 0.9, "metadata": {}, "content": "Plants make food."}],
+        ).start()
+        self.summarize = mock.patch.object(
+            vector_service, "_summarize_text", return_value=("They photosynthesize.", False)
+        ).start()
+        self.addCleanup(mock.patch.stopall)
+        vector_service.query_cache.clear()
+        vector_service.semantic_cache.clear()
+
+    def test_repeat_question_is_served_from_cache(self):
+        first = vector_service.rag_answer("How do plants eat?")
+        second = vector_service.rag_answer("how do  plants eat?")
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.summarize.call_count, 1)
+        self.assertEqual(self.search.call_count, 1)
+
+    def test_new_content_invalidates(self):
+        vector_service.rag_answer("How do plants eat?")
+        self.generation[0] += 1
+        vector_service.rag_answer("How do plants eat?")
+        self.assertEqual(self.summarize.call_count, 2)
+
+    def test_options_are_part_of_the_key(self):
+        vector_service.rag_answer("How do plants eat?", top_k=3)
+        vector_service.rag_answer("How do plants eat?", top_k=3, filters={"modality": "pdf"})
+        self.assertEqual(self.summarize.call_count, 2)
+
+    def test_rephrased_question_reuses_answer(self):
+        base = np.ones(8, dtype=np.float32)
+        vectors = {
+            "How do plants eat?": base,
+            "How do plants get food?": base + 0.05,
+            "Who wrote Hamlet?": -base,
+        }
+        with mock.patch.object(vector_service.local_embedder, "embed_query", side_effect=vectors.__getitem__):
+            first = vector_service.rag_answer("How do plants eat?")
+            rephrased = vector_service.rag_answer("How do plants get food?")
+            vector_service.rag_answer("Who wrote Hamlet?")
+
+        self.assertEqual(rephrased, first)
+        self.assertEqual(self.summarize.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
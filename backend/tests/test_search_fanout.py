@@ -0,0 +1,154 @@
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+from backend.local_stack import db as local_db
+from backend.services import vector_service
+
+
+def _hit(hit_id, score, backend):
+    return {"id": hit_id, "score": score, "metadata": {}, "content": f"{backend} content", "backend": backend}
+
+
+class TestSearchFanOut(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.db_patch = mock.patch.object(local_db, "DB_PATH", Path(cls.tmp_dir.name) / "pdf_memory.db")
+        cls.db_patch.start()
+        # The server prepares the database at startup; keep that out of the timings below.
+        local_db.ensure_db()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.db_patch.stop()
+        cls.tmp_dir.cleanup()
+
+    def setUp(self):
+        patches = [
+            mock.patch.object(vector_service.local_embedder, "embed_query", return_value=np.zeros(4, dtype=np.float32)),
+            mock.patch.object(vector_service, "_use_qdrant", return_value=True),
+            mock.patch.object(vector_service, "_use_local", return_value=True),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        vector_service.query_cache.clear()
+
+    def _patch_backends(self, qdrant, local):
+        for name, side_effect in (("_search_qdrant", qdrant), ("_search_local", local)):
+            patcher = mock.patch.object(vector_service, name, side_effect=side_effect)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_backends_are_queried_concurrently(self):
+        def slow(hit_id, backend):
+            def search(*args, **kwargs):
+                time.sleep(0.3)
+                return [_hit(hit_id, 0.5, backend)]
+            return search
+
+        self._patch_backends(slow("q-1", "qdrant"), slow("local-1", "local"))
+        started = time.perf_counter()
+        report = vector_service.search_vectors_report("query", top_k=5, deadline_ms=2000)
+        elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 0.55)
+        self.assertEqual(report["backends"], {"qdrant": "ok", "local": "ok"})
+        self.assertFalse(report["partial"])
+        self.assertEqual({hit["id"] for hit in report["results"]}, {"q-1", "local-1"})
+
+    def test_slow_backend_is_dropped_at_deadline(self):
+        def stalled(*args, **kwargs):
+            time.sleep(1.0)
+            return [_hit("q-1", 0.9, "qdrant")]
+
+        self._patch_backends(stalled, lambda *args, **kwargs: [_hit("local-1", 0.4, "local")])
+        started = time.perf_counter()
+        report = vector_service.search_vectors_report("query", top_k=5, deadline_ms=100)
+
+        self.assertLess(time.perf_counter() - started, 0.6)
+        self.assertEqual(report["backends"], {"qdrant": "timeout", "local": "ok"})
+        self.assertTrue(report["partial"])
+        self.assertEqual([hit["id"] for hit in report["results"]], ["local-1"])
+
+    def test_stalled_backend_cannot_starve_the_other(self):
+        pools = {name: vector_service._BackendPool(name, workers=1) for name in ("qdrant", "local", "lexical")}
+        patcher = mock.patch.object(vector_service, "_search_pools", pools)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        hung = threading.Event()
+        self.addCleanup(hung.set)
+
+        def stalled(*args, **kwargs):
+            hung.wait(5)
+            return []
+
+        self._patch_backends(stalled, lambda *args, **kwargs: [_hit("local-1", 0.4, "local")])
+        first = vector_service.search_vectors_report("first query", top_k=5, deadline_ms=50)
+        self.assertEqual(first["backends"], {"qdrant": "timeout", "local": "ok"})
+
+        # Qdrant's only thread is still stuck, so it is skipped instead of queued.
+        started = time.perf_counter()
+        reports = [vector_service.search_vectors_report(f"query {i}", top_k=5, deadline_ms=50) for i in range(3)]
+        self.assertLess(time.perf_counter() - started, 0.1)
+        for report in reports:
+            self.assertEqual(report["backends"], {"qdrant": "busy", "local": "ok"})
+            self.assertEqual([hit["id"] for hit in report["results"]], ["local-1"])
+
+    def test_failing_backend_is_reported(self):
+        def broken(*args, **kwargs):
+            raise ConnectionError("qdrant down")
+
+        self._patch_backends(broken, lambda *args, **kwargs: [_hit("local-1", 0.4, "local")])
+        report = vector_service.search_vectors_report("query", top_k=5)
+
+        self.assertEqual(report["backends"]["qdrant"], "error")
+        self.assertEqual(len(report["results"]), 1)
+
+
+class TestSearchBatch(unittest.TestCase):
+    def setUp(self):
+        vector_service.query_cache.clear()
+        self.embed = mock.patch.object(
+            vector_service.local_embedder, "embed_texts", side_effect=lambda texts: np.ones((len(texts), 4), np.float32)
+        ).start()
+        self.addCleanup(mock.patch.stopall)
+        mock.patch.object(vector_service, "_use_qdrant", return_value=False).start()
+        mock.patch.object(vector_service, "_use_local", return_value=True).start()
+        # The shared index would otherwise poll whatever database earlier tests left behind.
+        mock.patch.object(vector_service, "store_generation", return_value=(0, 0)).start()
+        self.search = mock.patch.object(
+            vector_service.local_index,
+            "search",
+            return_value=(np.array([[0.0, 1.0], [0.5, -1.0]], np.float32), np.array([[1, 2], [2, -1]])),
+        ).start()
+        mock.patch.object(
+            vector_service.local_db, "get_chunks_by_ids", return_value={1: ("a.pdf", "first"), 2: ("b.pdf", "second")}
+        ).start()
+
+    def test_one_matrix_search_for_all_queries(self):
+        reports = vector_service.search_vectors_batch(["q one", "q two"], top_k=2)
+
+        self.search.assert_called_once()
+        self.assertEqual(self.search.call_args.args[0].shape, (2, 4))
+        self.assertEqual([report["query"] for report in reports], ["q one", "q two"])
+        self.assertEqual([hit["id"] for hit in reports[0]["results"]], ["local-1", "local-2"])
+        self.assertEqual([hit["id"] for hit in reports[1]["results"]], ["local-2"])
+        self.assertEqual(reports[1]["backends"], {"local": "ok"})
+
+    def test_cached_queries_are_not_searched_again(self):
+        vector_service.search_vectors_batch(["q one"], top_k=2)
+        vector_service.search_vectors_batch(["q one", "q two"], top_k=2)
+
+        self.assertEqual(self.embed.call_args_list[-1].args[0], ["q two"])
+        self.assertEqual(self.search.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import numpy as np
+
+from backend.services import vector_service
+from backend.services.single_flight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_callers_share_one_execution(self):
+        flight = SingleFlight()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.2)
+            return "result"
+
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            results = list(pool.map(lambda _: flight.do("key", slow), range(5)))
+
+        self.assertEqual(results, ["result"] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flight.stats(), {"in_flight": 0, "executions": 1, "coalesced": 4})
+
+    def test_waiters_receive_the_leaders_exception(self):
+        flight = SingleFlight()
+        started = threading.Event()
+
+        def failing():
+            started.set()
+            time.sleep(0.1)
+            raise ValueError("boom")
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            leader = pool.submit(flight.do, "key", failing)
+            started.wait()
+            follower = pool.submit(flight.do, "key", failing)
+            for future in (leader, follower):
+                with self.assertRaises(ValueError):
+                    future.result()
+
+    def test_callers_get_independent_results(self):
+        flight = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+
+        def slow():
+            started.set()
+            release.wait(5)
+            return {"sources": [{"id": "1"}]}
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            leader = pool.submit(flight.do, "key", slow)
+            started.wait()
+            follower = pool.submit(flight.do, "key", slow)
+            while flight.stats()["coalesced"] < 1:
+                time.sleep(0.01)
+            release.set()
+            mine = leader.result()
+            mine["sources"].clear()
+            theirs = follower.result()
+
+        self.assertEqual(theirs, {"sources": [{"id": "1"}]})
+        self.assertIsNot(theirs, mine)
+
+    def test_finished_calls_are_not_remembered(self):
+        flight = SingleFlight()
+        self.assertEqual(flight.do("key", lambda: 1), 1)
+        self.assertEqual(flight.do("key", lambda: 2), 2)
+        self.assertEqual(flight.stats()["coalesced"], 0)
+
+
+class TestCoalescedRagAnswer(unittest.TestCase):
+    def test_identical_questions_run_one_pipeline(self):
+        summarize = mock.Mock(side_effect=lambda *args, **kwargs: time.sleep(0.2) or ("answer", False))
+        patches = [
+            mock.patch.object(vector_service.local_embedder, "embed_query", return_value=np.zeros(4, dtype=np.float32)),
+            mock.patch.object(vector_service, "_use_qdrant", return_value=False),
+            mock.patch.object(vector_service, "_use_local", return_value=True),
+            mock.patch.object(vector_service, "store_generation", return_value=(0, 0)),
+            mock.patch.object(
+                vector_service,
+                "_search_local",
+                return_value=[{"id": "local-1", "score": 0.9, "metadata": {}, "content": "context"}],
+            ),
+            mock.patch.object(vector_service, "_summarize_text", summarize),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        vector_service.query_cache.clear()
+        vector_service.semantic_cache.clear()
+        before = vector_service.single_flight.stats()["coalesced"]
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            answers = list(pool.map(lambda _: vector_service.rag_answer("What is osmosis?"), range(4)))
+
+        self.assertEqual({answer["answer"] for answer in answers}, {"answer"})
+        self.assertEqual(summarize.call_count, 1)
+        self.assertEqual(vector_service.single_flight.stats()["coalesced"] - before, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import subprocess
+import sys
+import time
+import unittest
+from unittest import mock
+
+from backend import startup_profile
+from backend.vector_store.qdrant_store import QdrantStore
+
+HEAVY_MODULES = ("torch", "transformers", "sentence_transformers", "whisper", "moviepy", "qdrant_client", "fitz")
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_importing_the_app_skips_heavy_dependencies(self):
+        code = (
+            "import sys, backend.main; "
+            f"print('loaded:' + ','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        self.assertIn("loaded:\n", result.stdout)
+
+
+class TestQdrantStartup(unittest.TestCase):
+    def test_start_does_not_wait_for_qdrant(self):
+        store = QdrantStore(connect=False)
+        self.assertFalse(store.is_available)
+
+        def slow_connect():
+            time.sleep(0.3)
+
+        with mock.patch.object(store, "connect", side_effect=slow_connect) as connect:
+            started = time.perf_counter()
+            thread = store.start()
+            self.assertLess(time.perf_counter() - started, 0.1)
+            self.assertIs(store.start(), thread)
+            thread.join(2)
+        connect.assert_called_once()
+
+    def test_lazy_store_connects_on_first_use(self):
+        store = QdrantStore(connect=False, lazy=True)
+        with mock.patch.object(store, "connect", wraps=store.connect) as connect, \
+                mock.patch.object(store, "_connect") as blocking_connect:
+            store.is_available
+            store.is_available
+        connect.assert_called_once()
+        blocking_connect.assert_called_once()
+
+    def test_lazy_store_leaves_connecting_to_start(self):
+        store = QdrantStore(connect=False, lazy=True)
+        with mock.patch.object(store, "connect") as connect:
+            store.start().join(2)
+            self.assertFalse(store.is_available)
+        connect.assert_called_once()
+
+
+class TestStartupProfile(unittest.TestCase):
+    def test_package_totals_use_self_time(self):
+        rows = [("numpy.core", 30, 30, 2), ("numpy", 10, 40, 1), ("backend.main", 5, 45, 0)]
+        self.assertEqual(startup_profile.by_package(rows), {"numpy": 40, "backend": 5})
+
+    def test_parses_importtime_output(self):
+        rows = startup_profile.profile_imports("json")
+        names = [row[0] for row in rows]
+        self.assertIn("json", names)
+        self.assertTrue(all(row[2] >= row[1] for row in rows))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,14 +1,40 @@
+import hashlib
+import os
+import shutil
+import threading
+import time
+import uuid
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Callable, Dict, Set
 
 TMP_DIR = Path.home() / ".sahayak_ai" / "tmp"
 TMP_DIR.mkdir(parents=True, exist_ok=True)
 
+# Largest accepted upload; bigger requests are refused before their body is read when they send Content-Length.
+MAX_UPLOAD_BYTES = int(float(os.getenv("UPLOAD_MAX_MB", "1024")) * 2**20)
+CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_KB", "1024")) * 1024
+# Temp files nobody holds that are older than this are left over from crashed or abandoned requests.
+TMP_MAX_AGE_SECONDS = float(os.getenv("TMP_MAX_AGE_HOURS", "24")) * 3600
+TMP_SWEEP_SECONDS = float(os.getenv("TMP_SWEEP_MINUTES", "10")) * 60
+
+
+class UploadTooLarge(ValueError):
+    """Raised once an upload passes the size limit; the partial file is already deleted."""
+
+
+@dataclass
+class StoredUpload:
+    path: Path
+    filename: str
+    size: int
+    sha256: str
+
 
 def save_upload_to_tmp(upload_file, suffix: str = "") -> Path:
-    filename = upload_file.filename or "upload.bin"
-    target = TMP_DIR / f"{filename}{suffix}"
+    target = unique_tmp_path(f"{upload_file.filename or 'upload.bin'}{suffix}")
     with open(target, "wb") as buffer:
-        buffer.write(upload_file.file.read())
+        shutil.copyfileobj(upload_file.file, buffer, CHUNK_BYTES)
     upload_file.file.seek(0)
     return target
 
@@ -21,3 +47,124 @@ def write_bytes(path: Path, data: bytes) -> Path:
 
 def get_tmp_path(name: str) -> Path:
     return TMP_DIR / name
+
+
+def unique_tmp_path(name: str, directory: Path = TMP_DIR) -> Path:
+    """A path in ``directory`` that no other request will get, keeping ``name``'s extension for the decoders."""
+    return directory / f"{uuid.uuid4().hex}_{Path(name).name or 'upload.bin'}"
+
+
+async def stream_upload(
+    upload_file, path: Path, max_bytes: int = MAX_UPLOAD_BYTES, chunk_bytes: int = CHUNK_BYTES
+) -> StoredUpload:
+    """Copy an ``UploadFile`` to ``path`` chunk by chunk, hashing it on the way.
+
+    At most one chunk is held in memory. The copy stops, and the partial file
+    is removed, as soon as the upload is known to exceed ``max_bytes``. Note
+    that Starlette has already spooled the whole request body to its own temp
+    file by then: only a Content-Length over the limit (checked by the app's
+    middleware) refuses a request before its body is received.
+    """
+    filename = upload_file.filename or "upload.bin"
+    if upload_file.size is not None and upload_file.size > max_bytes:
+        raise UploadTooLarge(_too_large(filename, max_bytes))
+    digest = hashlib.sha256()
+    size = 0
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        with open(path, "wb") as buffer:
+            while chunk := await upload_file.read(chunk_bytes):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(_too_large(filename, max_bytes))
+                digest.update(chunk)
+                buffer.write(chunk)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return StoredUpload(path=path, filename=filename, size=size, sha256=digest.hexdigest())
+
+
+def _too_large(filename: str, max_bytes: int) -> str:
+    return f"{filename} is larger than the {max_bytes / 2**20:.0f} MB upload limit"
+
+
+class TempFiles:
+    """Temp files held by in-flight requests, and cleanup of everything else.
+
+    Requests take paths from :meth:`path` or :meth:`receive` and give them
+    back with :meth:`release`, which deletes them. Files in ``directory``
+    that no request holds and that are older than ``max_age_seconds`` were
+    abandoned (the process died, or an old code path never cleaned up);
+    :meth:`sweep` removes them at startup and then at most every
+    ``sweep_seconds`` as new uploads arrive.
+    """
+
+    def __init__(
+        self,
+        directory: Path = TMP_DIR,
+        max_age_seconds: float = TMP_MAX_AGE_SECONDS,
+        sweep_seconds: float = TMP_SWEEP_SECONDS,
+        max_bytes: int = MAX_UPLOAD_BYTES,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_age_seconds = max_age_seconds
+        self.sweep_seconds = sweep_seconds
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._active: Set[Path] = set()
+        self._last_sweep = float("-inf")
+        self.removed = 0
+
+    def path(self, name: str) -> Path:
+        path = unique_tmp_path(name, self.directory)
+        with self._lock:
+            self._active.add(path)
+        return path
+
+    async def receive(self, upload_file) -> StoredUpload:
+        """Stream ``upload_file`` to a new held temp file; release ``.path`` when done with it."""
+        self.maybe_sweep()
+        path = self.path(upload_file.filename or "upload.bin")
+        try:
+            return await stream_upload(upload_file, path, max_bytes=self.max_bytes)
+        except BaseException:
+            self.release(path)
+            raise
+
+    def release(self, *paths: Path | str) -> None:
+        for path in paths:
+            path = Path(path)
+            with self._lock:
+                self._active.discard(path)
+            path.unlink(missing_ok=True)
+
+    def sweep(self, max_age_seconds: float | None = None) -> int:
+        """Delete unheld files older than ``max_age_seconds``; returns how many were removed."""
+        cutoff = self._clock() - (self.max_age_seconds if max_age_seconds is None else max_age_seconds)
+        with self._lock:
+            self._last_sweep = self._clock()
+            active = set(self._active)
+        removed = 0
+        for entry in os.scandir(self.directory) if self.directory.exists() else ():
+            path = Path(entry.path)
+            try:
+                if entry.is_file() and path not in active and entry.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        self.removed += removed
+        return removed
+
+    def maybe_sweep(self) -> None:
+        if self._clock() - self._last_sweep >= self.sweep_seconds:
+            self.sweep()
+
+    def stats(self) -> Dict[str, object]:
+        return {"directory": str(self.directory), "active": len(self._active), "removed": self.removed}
+
+
+temp_files = TempFiles()
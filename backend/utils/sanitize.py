@@ -0,0 +1,69 @@
+"""Text clean-up applied to everything the API returns.
+
+Stored chunks are sanitized once at ingest (see ``db.add_chunks`` and
+``QdrantStore.upsert_many``); the helpers here are also used for query text,
+generated answers and rows written before that was the case.
+"""
+
+import re
+import unicodedata
+from typing import Any, Dict, Mapping
+
+_SANITIZE_TRANSLATION = str.maketrans({
+    "\u2018": "'",
+    "\u2019": "'",
+    "\u201c": '"',
+    "\u201d": '"',
+    "\u2013": "-",
+    "\u2014": "-",
+})
+
+
+def sanitize_text(text: str) -> str:
+    """Remove emojis/non-ASCII glyphs and normalize whitespace for API responses."""
+    if not text:
+        return ""
+
+    normalized = unicodedata.normalize("NFKC", text).translate(_SANITIZE_TRANSLATION)
+    ascii_text = normalized.encode("ascii", "ignore").decode("ascii")
+    ascii_text = ascii_text.replace("\r\n", "\n").replace("\r", "\n")
+    ascii_text = re.sub(r"[ \t]+", " ", ascii_text)
+    ascii_text = re.sub(r"\n{3,}", "\n\n", ascii_text)
+
+    cleaned_lines = []
+    previous_blank = False
+    for raw_line in ascii_text.split("\n"):
+        stripped_line = raw_line.strip()
+        if not stripped_line:
+            if cleaned_lines and not previous_blank:
+                cleaned_lines.append("")
+            previous_blank = True
+            continue
+        cleaned_lines.append(stripped_line)
+        previous_blank = False
+
+    cleaned = "\n".join(cleaned_lines).strip()
+    return cleaned
+
+
+def sanitize_fragment(text: str) -> str:
+    """Glyph-level part of ``sanitize_text`` for streamed pieces, whose spacing must survive."""
+    normalized = unicodedata.normalize("NFKC", text).translate(_SANITIZE_TRANSLATION)
+    return normalized.encode("ascii", "ignore").decode("ascii")
+
+
+def sanitize_fields(fields: Mapping[str, Any]) -> Dict[str, Any]:
+    """Copy of ``fields`` with every string value passed through ``sanitize_text``."""
+    return {key: sanitize_text(value) if isinstance(value, str) else value for key, value in fields.items()}
+
+
+def sanitize_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    sanitized = dict(record)
+    content = sanitized.get("content")
+    if isinstance(content, str):
+        sanitized["content"] = sanitize_text(content)
+
+    metadata = sanitized.get("metadata")
+    if isinstance(metadata, dict):
+        sanitized["metadata"] = sanitize_fields(metadata)
+    return sanitized
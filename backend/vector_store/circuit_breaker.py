@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    The breaker opens after ``failure_threshold`` failures in a row and stays
+    open until :meth:`record_success` is called, which the owner does once a
+    background health probe succeeds. While open, callers should fail fast
+    instead of paying a network timeout.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+
+    def __init__(self, failure_threshold: int = 3, clock: Callable[[], float] = time.time) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at: float | None = None
+        self._last_error: str | None = None
+        self.trips = 0
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        return self._state == self.OPEN
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._consecutive_failures = 0
+            self._opened_at = None
+
+    def record_failure(self, error: BaseException | str | None = None) -> bool:
+        """Count a failure; returns ``True`` when this call opened the breaker."""
+        with self._lock:
+            self._consecutive_failures += 1
+            if error is not None:
+                self._last_error = str(error)
+            if self._state == self.CLOSED and self._consecutive_failures >= self.failure_threshold:
+                self._trip()
+                return True
+            return False
+
+    def trip(self, error: BaseException | str | None = None) -> bool:
+        """Open immediately (e.g. the initial connection failed); returns ``True`` if it was closed."""
+        with self._lock:
+            if error is not None:
+                self._last_error = str(error)
+            if self._state == self.OPEN:
+                return False
+            self._trip()
+            return True
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "state": self._state,
+            "consecutive_failures": self._consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "opened_at": self._opened_at,
+            "last_error": self._last_error,
+            "trips": self.trips,
+        }
+
+    def _trip(self) -> None:
+        self._state = self.OPEN
+        self._opened_at = self._clock()
+        self.trips += 1
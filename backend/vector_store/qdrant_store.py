@@ -2,38 +2,93 @@ from __future__ import annotations
 
 import logging
 import os
+import threading
 import uuid
-from typing import Any, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Sequence
 
 import numpy as np
 
-try:
-    from qdrant_client import QdrantClient
-    from qdrant_client.http import models as qmodels
-except ImportError:  # pragma: no cover - optional dependency
-    QdrantClient = None  # type: ignore
-    qmodels = None  # type: ignore
+from backend.utils.sanitize import sanitize_fields
+from backend.vector_store.circuit_breaker import CircuitBreaker
+
+# qdrant-client takes about a second to import, so it is loaded by
+# _import_client() when a store first connects rather than with this module.
+QdrantClient = None
+qmodels = None
+UnexpectedResponse = None
+_import_lock = threading.Lock()
 
 
 logger = logging.getLogger("sahayak.qdrant")
 
+# Payload fields that search filters push down to Qdrant; each gets a payload index.
+KEYWORD_FIELDS = ("source", "modality")
+FLOAT_FIELDS = ("created_at",)
+# Sanitized copies of a point's string payload fields, written at ingest so
+# search hits are served without per-hit clean-up.
+CLEAN_PAYLOAD_KEY = "_clean"
+
+UPSERT_BATCH_SIZE = int(os.getenv("QDRANT_UPSERT_BATCH_SIZE", "256"))
+UPSERT_PARALLEL = int(os.getenv("QDRANT_UPSERT_PARALLEL", "2"))
+UPSERT_WAIT = os.getenv("QDRANT_UPSERT_WAIT", "true").lower() not in ("0", "false", "no")
+
+TIMEOUT_SECONDS = float(os.getenv("QDRANT_TIMEOUT", "5.0"))
+FAILURE_THRESHOLD = int(os.getenv("QDRANT_FAILURE_THRESHOLD", "3"))
+PROBE_INTERVAL_SECONDS = float(os.getenv("QDRANT_PROBE_INTERVAL", "10"))
+
 
 class QdrantStore:
-    def __init__(self) -> None:
+    """Qdrant-backed vector store guarded by a circuit breaker.
+
+    Consecutive connection failures open the breaker; while it is open the
+    store reports itself unavailable so callers fall back immediately, and a
+    background thread probes Qdrant every ``probe_interval`` seconds until it
+    answers again. A server that is down at startup is picked up the same way.
+    With ``connect=False`` nothing happens until :meth:`start` (background)
+    or :meth:`connect` (blocking) is called; until then the store is
+    unavailable and ``auto`` requests use the local store. ``lazy=True``
+    instead connects (blocking) the first time availability is checked, unless
+    one of those was called first.
+    """
+
+    def __init__(
+        self,
+        client: QdrantClient | None = None,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        probe_interval: float = PROBE_INTERVAL_SECONDS,
+        connect: bool = True,
+        lazy: bool = False,
+    ) -> None:
         self.url = os.getenv("QDRANT_URL", "http://localhost:6333")
         self.api_key = os.getenv("QDRANT_API_KEY")
         self.collection_name = os.getenv("QDRANT_COLLECTION", "sahayak_ai_vectors")
         self.vector_dim = int(os.getenv("QDRANT_VECTOR_DIM", "384"))
+        self.probe_interval = probe_interval
         self._client: QdrantClient | None = None
-        self._available = False
-        if QdrantClient is None:
-            logger.warning("qdrant-client is not installed; remote vector store disabled.")
+        self._breaker = CircuitBreaker(failure_threshold)
+        self._probe_lock = threading.Lock()
+        self._probe_thread: threading.Thread | None = None
+        self._stop_probe = threading.Event()
+        self._connect_thread: threading.Thread | None = None
+        self._lazy = lazy
+        self._connect_attempted = False
+        self._connect_lock = threading.Lock()
+        if client is not None:
+            # Pre-built client, e.g. QdrantClient(":memory:") in tests.
+            _import_client()
+            self._client = client
+            self._ensure_collection()
             return
-        self._connect()
+        if connect:
+            self.connect()
 
     @property
     def is_available(self) -> bool:
-        return self._available and self._client is not None
+        if self._lazy and not self._connect_attempted:
+            self._connect_on_first_use()
+        return self._client is not None and not self._breaker.is_open
 
     def status(self) -> Dict[str, Any]:
         return {
@@ -41,76 +96,322 @@ class QdrantStore:
             "url": self.url,
             "collection": self.collection_name,
             "vector_dim": self.vector_dim,
+            "breaker": self._breaker.status(),
+            "probe_interval": self.probe_interval,
         }
 
+    def close(self) -> None:
+        """Stop the background probe, if one is running."""
+        self._stop_probe.set()
+        thread = self._probe_thread
+        if thread is not None:
+            thread.join(timeout=self.probe_interval + 1.0)
+
+    def connect(self) -> None:
+        """Connect now, blocking for up to ``QDRANT_TIMEOUT``; failures hand over to the probe."""
+        self._connect_attempted = True
+        if not _import_client():
+            logger.warning("qdrant-client is not installed; remote vector store disabled.")
+            return
+        self._connect()
+
+    def start(self) -> threading.Thread:
+        """Connect on a background thread so server startup does not wait for Qdrant."""
+        self._connect_attempted = True
+        with self._probe_lock:
+            if self._connect_thread is None:
+                self._connect_thread = threading.Thread(target=self.connect, name="qdrant-connect", daemon=True)
+                self._connect_thread.start()
+            return self._connect_thread
+
+    def _connect_on_first_use(self) -> None:
+        with self._connect_lock:
+            if not self._connect_attempted:
+                self.connect()
+
+    def _build_client(self) -> QdrantClient:
+        return QdrantClient(url=self.url, api_key=self.api_key or None, timeout=TIMEOUT_SECONDS)
+
     def _connect(self) -> None:
         try:
-            self._client = QdrantClient(url=self.url, api_key=self.api_key or None, timeout=5.0)
-            self._available = True
+            self._client = self._build_client()
             self._ensure_collection()
         except Exception as exc:  # pragma: no cover - connectivity
-            logger.warning("Unable to reach Qdrant at %s: %s", self.url, exc)
+            logger.warning(
+                "Unable to reach Qdrant at %s: %s; retrying every %.0fs in the background",
+                self.url,
+                exc,
+                self.probe_interval,
+            )
             self._client = None
-            self._available = False
+            if self._breaker.trip(exc):
+                self._start_probe()
+
+    @contextmanager
+    def _guard(self) -> Iterator[QdrantClient]:
+        """Fail fast while the breaker is open and feed call outcomes back into it."""
+        if not self.is_available:
+            raise RuntimeError("Qdrant client is not available")
+        try:
+            yield self._client
+        except Exception as exc:
+            if _is_outage(exc) and self._breaker.record_failure(exc):
+                logger.warning("Qdrant circuit opened after repeated failures: %s", exc)
+                self._start_probe()
+            raise
+        else:
+            self._breaker.record_success()
+
+    def _start_probe(self) -> None:
+        with self._probe_lock:
+            if self._probe_thread is not None and self._probe_thread.is_alive():
+                return
+            self._stop_probe.clear()
+            self._probe_thread = threading.Thread(target=self._probe_loop, name="qdrant-probe", daemon=True)
+            self._probe_thread.start()
+
+    def _probe_loop(self) -> None:
+        while self._breaker.is_open and not self._stop_probe.wait(self.probe_interval):
+            if self._probe():
+                self._breaker.record_success()
+                logger.info("Qdrant at %s is reachable again; circuit closed", self.url)
+                return
+
+    def _probe(self) -> bool:
+        try:
+            client = self._client or self._build_client()
+            client.get_collections()
+            self._client = client
+            self._ensure_collection()
+            return True
+        except Exception as exc:
+            logger.debug("Qdrant probe failed: %s", exc)
+            return False
 
     def _ensure_collection(self) -> None:
         if not self._client:
             return
-        try:
-            self._client.get_collection(self.collection_name)
-        except Exception:
+        # Only a collection that is really missing is created; any other error (e.g. a
+        # timeout while Qdrant is flapping) propagates, so existing data is never dropped.
+        if self._client.collection_exists(self.collection_name):
+            info = self._client.get_collection(self.collection_name)
+            indexed = set((info.payload_schema or {}).keys())
+        else:
             vectors_config = qmodels.VectorParams(size=self.vector_dim, distance=qmodels.Distance.COSINE)
-            self._client.recreate_collection(collection_name=self.collection_name, vectors_config=vectors_config)
+            self._client.create_collection(collection_name=self.collection_name, vectors_config=vectors_config)
+            indexed = set()
+        self._ensure_payload_indexes(indexed)
+
+    def _ensure_payload_indexes(self, indexed: set) -> None:
+        schemas = {field: qmodels.PayloadSchemaType.KEYWORD for field in KEYWORD_FIELDS}
+        schemas.update({field: qmodels.PayloadSchemaType.FLOAT for field in FLOAT_FIELDS})
+        for field, schema in schemas.items():
+            if field in indexed:
+                continue
+            try:
+                self._client.create_payload_index(
+                    collection_name=self.collection_name,
+                    field_name=field,
+                    field_schema=schema,
+                )
+            except Exception as exc:  # pragma: no cover - connectivity
+                logger.warning("Unable to create Qdrant payload index on %s: %s", field, exc)
+
+    @staticmethod
+    def build_filter(filters: Dict[str, Any] | None):
+        """Translate search filters into a native Qdrant ``Filter`` (or ``None``)."""
+        if not filters:
+            return None
+        conditions = []
+        for field in KEYWORD_FIELDS:
+            wanted = filters.get(field)
+            if wanted is None:
+                continue
+            if isinstance(wanted, str):
+                match = qmodels.MatchValue(value=wanted)
+            else:
+                match = qmodels.MatchAny(any=list(wanted))
+            conditions.append(qmodels.FieldCondition(key=field, match=match))
+        created_after = filters.get("created_after")
+        created_before = filters.get("created_before")
+        if created_after is not None or created_before is not None:
+            conditions.append(
+                qmodels.FieldCondition(
+                    key="created_at",
+                    range=qmodels.Range(gte=created_after, lte=created_before),
+                )
+            )
+        return qmodels.Filter(must=conditions) if conditions else None
 
     def upsert_text(self, text: str, metadata: Dict[str, Any], embedding: np.ndarray) -> Dict[str, Any]:
-        if not self._client:
-            raise RuntimeError("Qdrant client is not available")
-        vector = embedding.tolist() if isinstance(embedding, np.ndarray) else embedding
-        payload = {**metadata, "content": text}
-        point_id = uuid.uuid4().hex
-        point = qmodels.PointStruct(id=point_id, vector=vector, payload=payload)
-        self._client.upsert(collection_name=self.collection_name, points=[point])
-        return {"id": point_id, "metadata": metadata, "content": text}
+        return self.upsert_many([text], metadata, [embedding], wait=True)[0]
 
-    def search(self, embedding: np.ndarray, top_k: int = 5) -> List[Dict[str, Any]]:
-        if not self._client:
-            raise RuntimeError("Qdrant client is not available")
+    def upsert_many(
+        self,
+        texts: Sequence[str],
+        metadata: Dict[str, Any],
+        embeddings: Sequence[np.ndarray] | np.ndarray,
+        batch_size: int = UPSERT_BATCH_SIZE,
+        wait: bool = UPSERT_WAIT,
+        parallel: int = UPSERT_PARALLEL,
+    ) -> List[Dict[str, Any]]:
+        """Upsert many texts sharing ``metadata`` in batches of ``batch_size`` points.
+
+        With ``parallel > 1`` batches are sent concurrently; ``wait=False``
+        returns once Qdrant has accepted each batch rather than indexed it.
+        """
+        vectors = np.asarray(embeddings, dtype="float32").tolist()
+        points = []
+        records: List[Dict[str, Any]] = []
+        for text, vector in zip(texts, vectors):
+            point_id = uuid.uuid4().hex
+            payload = {**metadata, "content": text}
+            payload[CLEAN_PAYLOAD_KEY] = _clean_payload(payload)
+            points.append(qmodels.PointStruct(id=point_id, vector=vector, payload=payload))
+            records.append({"id": point_id, "metadata": metadata, "content": text})
+        batch_size = max(1, batch_size)
+        batches = [points[start : start + batch_size] for start in range(0, len(points), batch_size)]
+
+        with self._guard() as client:
+
+            def send(batch: List[Any]) -> None:
+                client.upsert(collection_name=self.collection_name, points=batch, wait=wait)
+
+            if parallel > 1 and len(batches) > 1:
+                with ThreadPoolExecutor(max_workers=min(parallel, len(batches))) as pool:
+                    list(pool.map(send, batches))
+            else:
+                for batch in batches:
+                    send(batch)
+        return records
+
+    def search(
+        self,
+        embedding: np.ndarray,
+        top_k: int = 5,
+        filters: Dict[str, Any] | None = None,
+    ) -> List[Dict[str, Any]]:
         vector = embedding.tolist() if isinstance(embedding, np.ndarray) else embedding
-        results = self._client.search(
-            collection_name=self.collection_name,
-            query_vector=vector,
-            limit=top_k,
-            with_payload=True,
-        )
-        hits: List[Dict[str, Any]] = []
-        for hit in results:
-            payload = hit.payload or {}
-            hits.append(
-                {
-                    "id": str(hit.id),
-                    "score": float(hit.score or 0.0),
-                    "metadata": payload,
-                    "content": payload.get("content", ""),
-                }
+        with self._guard() as client:
+            response = client.query_points(
+                collection_name=self.collection_name,
+                query=vector,
+                query_filter=self.build_filter(filters),
+                limit=top_k,
+                with_payload=True,
             )
-        return hits
+        return [self._to_hit(point) for point in response.points]
+
+    def search_batch(
+        self,
+        embeddings: Sequence[np.ndarray] | np.ndarray,
+        top_k: int = 5,
+        filters: Dict[str, Any] | None = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """Run one query per embedding in a single ``query_batch_points`` round trip."""
+        query_filter = self.build_filter(filters)
+        requests = [
+            qmodels.QueryRequest(query=vector, filter=query_filter, limit=top_k, with_payload=True)
+            for vector in np.asarray(embeddings, dtype="float32").tolist()
+        ]
+        if not requests:
+            return []
+        with self._guard() as client:
+            responses = client.query_batch_points(collection_name=self.collection_name, requests=requests)
+        return [[self._to_hit(point) for point in response.points] for response in responses]
+
+    @staticmethod
+    def _to_hit(point: Any) -> Dict[str, Any]:
+        """Search hit with sanitized content and metadata, precomputed at ingest where available."""
+        payload = dict(point.payload or {})
+        clean = payload.pop(CLEAN_PAYLOAD_KEY, None)
+        metadata = {**payload, **clean} if clean is not None else sanitize_fields(payload)
+        return {
+            "id": str(point.id),
+            "score": float(point.score or 0.0),
+            "metadata": metadata,
+            "content": metadata.get("content", ""),
+        }
+
+    def backfill_clean_payloads(self, batch_size: int = UPSERT_BATCH_SIZE) -> int:
+        """Add sanitized payload copies to points written before they were stored; returns the count."""
+        missing = qmodels.Filter(
+            must=[qmodels.IsEmptyCondition(is_empty=qmodels.PayloadField(key=CLEAN_PAYLOAD_KEY))]
+        )
+        updated = 0
+        offset = None
+        with self._guard() as client:
+            while True:
+                points, offset = client.scroll(
+                    collection_name=self.collection_name,
+                    scroll_filter=missing,
+                    limit=batch_size,
+                    offset=offset,
+                    with_payload=True,
+                )
+                if points:
+                    operations = [
+                        qmodels.SetPayloadOperation(
+                            set_payload=qmodels.SetPayload(
+                                payload={CLEAN_PAYLOAD_KEY: _clean_payload(point.payload or {})},
+                                points=[point.id],
+                            )
+                        )
+                        for point in points
+                    ]
+                    client.batch_update_points(collection_name=self.collection_name, update_operations=operations)
+                    updated += len(points)
+                if offset is None:
+                    return updated
 
     def recent_payloads(self, limit: int = 10) -> List[Dict[str, Any]]:
-        if not self._client:
+        if not self.is_available:
             return []
         try:
-            points, _ = self._client.scroll(
-                collection_name=self.collection_name,
-                limit=limit,
-                with_payload=True,
-            )
-            return [point.payload or {} for point in points]
+            with self._guard() as client:
+                points, _ = client.scroll(
+                    collection_name=self.collection_name,
+                    limit=limit,
+                    with_payload=True,
+                )
+            return [
+                {key: value for key, value in (point.payload or {}).items() if key != CLEAN_PAYLOAD_KEY}
+                for point in points
+            ]
         except Exception:
             return []
 
 
+def _clean_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    fields = {key: value for key, value in payload.items() if isinstance(value, str)}
+    return sanitize_fields(fields)
+
+
+def _is_outage(exc: BaseException) -> bool:
+    """Client errors (4xx) mean Qdrant answered, so they do not count against the breaker."""
+    if UnexpectedResponse is not None and isinstance(exc, UnexpectedResponse):
+        return exc.status_code is None or exc.status_code >= 500
+    return True
+
+
+def _import_client() -> bool:
+    global QdrantClient, qmodels, UnexpectedResponse
+    with _import_lock:
+        if QdrantClient is None:
+            try:
+                from qdrant_client import QdrantClient as client_class
+                from qdrant_client.http import models
+                from qdrant_client.http.exceptions import UnexpectedResponse as unexpected_response
+            except ImportError:  # pragma: no cover - optional dependency
+                return False
+            qmodels, UnexpectedResponse, QdrantClient = models, unexpected_response, client_class
+    return True
+
+
 def _build_store() -> QdrantStore:
-    return QdrantStore()
+    # The API server connects in the background from its startup hook (see
+    # backend.startup); scripts and other apps connect on first use.
+    return QdrantStore(connect=False, lazy=True)
 
 
 qdrant_store = _build_store()